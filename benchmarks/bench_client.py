@@ -0,0 +1,119 @@
+"""
+Times the client against the local mock server in `mock_server.py` so runs are reproducible without an appliance:
+client startup (with and without `fast_start`), `_ipf_pager` (serial and parallel), `fetch_all`, `Table.compare`,
+intent loading and configuration download. Each benchmark is run `--repeat` times and the minimum and median are
+reported.
+
+Save a run and compare a later one to it, benchmarks whose median is more than `--threshold` slower are reported as
+regressions and the script exits with status 1:
+
+    python benchmarks/bench_client.py --rows 50000 --latency 0.005 --save before.json
+    python benchmarks/bench_client.py --rows 50000 --latency 0.005 --baseline before.json --threshold 0.2
+"""
+import argparse
+import json
+import logging
+import sys
+import tempfile
+from statistics import median
+from time import perf_counter
+
+from mock_server import MockIPFabric
+
+from ipfabric import IPFClient
+from ipfabric.tools import DeviceConfigs
+
+INTERFACES = "tables/inventory/interfaces"
+
+
+def benchmarks(srv: MockIPFabric, configs: int, cache_dir: str) -> dict:
+    ipf = IPFClient(base_url=srv.url, token="token")
+    payload = dict(columns=["id", "sn", "hostname", "intName", "l1", "l2"], snapshot=ipf.snapshot_id)
+    device_configs = DeviceConfigs(ipf)
+
+    def intents():
+        ipf.intent.load_intent()
+        for intent in ipf.intent.intent_checks:
+            ipf.intent.get_all_results(intent)
+
+    def download():
+        for cfg in [c[0] for c in device_configs.get_all_configurations().values()][:configs]:
+            device_configs.get_text_config(cfg)
+
+    return {
+        "startup": lambda: IPFClient(base_url=srv.url, token="token"),
+        "startup fast_start": lambda: IPFClient(base_url=srv.url, token="token", cache_dir=cache_dir, fast_start=True),
+        "_ipf_pager": lambda: ipf._ipf_pager(INTERFACES, dict(payload)),
+        "_ipf_pager parallel": lambda: ipf._ipf_pager(INTERFACES, dict(payload), parallel=True),
+        "fetch_all": lambda: ipf.fetch_all(INTERFACES, columns=payload["columns"]),
+        "Table.compare": lambda: ipf.inventory.interfaces.compare(
+            snapshot_id=srv.snapshot_ids[1], unique_keys=["sn", "intName"], mode="keyed"
+        ),
+        "intents": intents,
+        "configs": download,
+    }
+
+
+def run(func, repeat: int) -> list:
+    times = list()
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return times
+
+
+def regressions(results: dict, baseline: dict, threshold: float) -> dict:
+    return {
+        name: (baseline[name]["median"], result["median"])
+        for name, result in results.items()
+        if name in baseline and result["median"] > baseline[name]["median"] * (1 + threshold)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="Rows of each table per snapshot")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--row-latency", type=float, default=0.0, help="Seconds added per row returned")
+    parser.add_argument("--configs", type=int, default=50, help="Configurations downloaded by the configs benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", help="Names of the benchmarks to run")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file of a previous run to report regressions against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown of the median reported as regression")
+    args = parser.parse_args()
+    logging.getLogger("ipfabric").setLevel(logging.ERROR)
+
+    results = dict()
+    with MockIPFabric(
+        rows=args.rows, latency=args.latency, row_latency=args.row_latency
+    ) as srv, tempfile.TemporaryDirectory() as cache_dir:
+        for name, func in benchmarks(srv, args.configs, cache_dir).items():
+            if args.only and name not in args.only:
+                continue
+            func()  # warm up the mock server caches
+            requests = srv.requests
+            times = run(func, args.repeat)
+            results[name] = dict(
+                min=min(times), median=median(times), requests=(srv.requests - requests) // args.repeat
+            )
+
+    print(f"{args.rows:,} rows, {args.latency}s latency, {args.row_latency}s per row, {args.repeat} runs")
+    print(f"{'':<20} {'min':>9} {'median':>9} {'requests':>9}")
+    for name, result in results.items():
+        print(f"{name:<20} {result['min']:>8.3f}s {result['median']:>8.3f}s {result['requests']:>9}")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(dict(args=vars(args), results=results), f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = regressions(results, json.load(f)["results"], args.threshold)
+        for name, (before, after) in slower.items():
+            print(f"REGRESSION {name}: {before:.3f}s -> {after:.3f}s ({after / before - 1:+.0%})")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
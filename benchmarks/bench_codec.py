@@ -0,0 +1,95 @@
+"""
+Compares the JSON codecs used to decode table pages and encode payloads.
+
+Pages recorded from an IP Fabric instance (IPF_URL/IPF_TOKEN) are saved as raw JSON responses of 1000 rows:
+
+    python benchmarks/bench_codec.py --record pages/
+    python benchmarks/bench_codec.py --pages pages/
+
+Without --pages synthetic pages shaped like the tables in `ipfabric.codec.ROW_TYPES` are used.
+"""
+import argparse
+import json
+import random
+from pathlib import Path
+from time import perf_counter
+
+import httpx
+
+from ipfabric.codec import CODECS, ROW_TYPES, get_codec, page_decoder, row_struct
+
+VALUES = {
+    "vlan": lambda r, i: r.randint(1, 4094),
+    "vlanId": lambda r, i: r.randint(1, 4094),
+    "uptime": lambda r, i: r.randint(0, 10**7),
+    "mtu": lambda r, i: r.choice([1500, 9000, 9216]),
+    "memoryUtilization": lambda r, i: r.random() * 100,
+    "edge": lambda r, i: r.random() < 0.3,
+    "proxy": lambda r, i: r.random() < 0.1,
+    "siteName": lambda r, i: f"site-{i % 300}",
+    "mac": lambda r, i: f"{r.getrandbits(48):012x}",
+}
+
+
+def synthetic_page(url: str, rows: int = 1000, seed: int = 0) -> bytes:
+    rand = random.Random(seed)
+    data = [{c: VALUES.get(c, lambda r, n: f"{c}-{n % 1000}")(rand, i) for c in ROW_TYPES[url]} for i in range(rows)]
+    return json.dumps({"data": data, "_meta": {"count": rows * 100, "size": rows}}).encode()
+
+
+def record(directory: Path):
+    from ipfabric import IPFClient
+
+    directory.mkdir(parents=True, exist_ok=True)
+    ipf = IPFClient(json_codec="json")
+    for url in ROW_TYPES:
+        payload = dict(columns=ipf.get_columns(url), snapshot=ipf.snapshot_id, pagination=dict(limit=1000, start=0))
+        res = ipf.post(url, json=payload)
+        res.raise_for_status()
+        directory.joinpath(url.replace("/", "_") + ".json").write_bytes(res.content)
+        print(f"Recorded {url}")
+
+
+def best(func, repeat: int) -> float:
+    times = list()
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=Path, help="Directory of recorded pages")
+    parser.add_argument("--record", type=Path, help="Record pages from IP Fabric into this directory")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    if args.record:
+        return record(args.record)
+
+    if args.pages:
+        pages = {p.stem.replace("_", "/", 2): p.read_bytes() for p in sorted(args.pages.glob("*.json"))}
+    else:
+        pages = {url: synthetic_page(url) for url in ROW_TYPES}
+    codecs = [name for name, (_, module) in CODECS.items() if module is not None]
+
+    print(f"{'table':<28} {'KiB':>6} " + " ".join(f"{n + ' load':>13} {n + ' dump':>13}" for n in codecs), end="")
+    print(f" {'structs':>13}" if "msgspec" in codecs else "")
+    for url, content in pages.items():
+        page = json.loads(content)
+        response = httpx.Response(200, content=content, headers={"Content-Type": "application/json"})
+        print(f"{url:<28} {len(content) / 1024:>6.0f}", end="")
+        stdlib = best(response.json, args.repeat)
+        for name in codecs:
+            codec = get_codec(name)
+            load = stdlib if name == "json" else best(lambda: codec.loads(content), args.repeat)
+            print(f" {load:>11.2f}ms {best(lambda: codec.dumps(page), args.repeat):>11.2f}ms", end="")
+        if "msgspec" in codecs:
+            decoder = page_decoder(row_struct(url, list(page["data"][0]) if page["data"] else list()))
+            print(f" {best(lambda: decoder.decode(content), args.repeat):>11.2f}ms", end="")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Compares the row fingerprinting engines used by `Table.compare` on synthetic tables.
+
+DeepHash is only run on a sample of the rows as hashing a full table takes minutes, its time is extrapolated.
+
+    python benchmarks/bench_compare_hash.py --rows 1000000 --sample 20000
+"""
+import argparse
+import random
+from time import perf_counter
+
+from ipfabric.diff import hash_rows
+
+
+def synthetic_table(rows: int, seed: int = 0) -> list:
+    rand = random.Random(seed)
+    return [
+        {
+            "hostname": f"device-{i}",
+            "siteName": f"site-{i % 500}",
+            "vendor": rand.choice(["cisco", "arista", "juniper", "paloalto"]),
+            "uptime": rand.randint(0, 10**7),
+            "loginIp": f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+            "sn": f"SN{i:010d}",
+            "ip": [f"192.168.{i & 255}.{j}" for j in range(rand.randint(0, 3))],
+            "attrs": {"role": rand.choice(["core", "access"]), "tags": ["a", "b"]},
+        }
+        for i in range(rows)
+    ]
+
+
+def timed(func, *args, **kwargs) -> float:
+    start = perf_counter()
+    func(*args, **kwargs)
+    return perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--sample", type=int, default=20_000, help="Rows hashed by the DeepHash engine")
+    args = parser.parse_args()
+
+    data = synthetic_table(args.rows)
+    sample = data[: args.sample]
+    results = dict()
+    for unique_keys in [None, ["sn"]]:
+        tuple_time = timed(hash_rows, data, unique_keys, "tuple")
+        deephash_time = timed(hash_rows, sample, unique_keys, "deephash") * args.rows / len(sample)
+        results["all columns" if unique_keys is None else "unique_keys"] = (tuple_time, deephash_time)
+
+    print(f"{args.rows:,} rows (deephash extrapolated from {len(sample):,} rows)")
+    print(f"{'':<12} {'tuple':>10} {'deephash':>10} {'speedup':>8}")
+    for name, (tuple_time, deephash_time) in results.items():
+        print(f"{name:<12} {tuple_time:>9.2f}s {deephash_time:>9.2f}s {deephash_time / tuple_time:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
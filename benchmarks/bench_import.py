@@ -0,0 +1,81 @@
+"""
+Measures the import time of the package with `python -X importtime` in fresh interpreters and lists the slowest
+modules (self time, median over the runs) so import-time regressions show up in review.
+
+Save a run and compare a later one to it, imports whose median total is more than `--threshold` slower are reported
+as regressions and the script exits with status 1:
+
+    python benchmarks/bench_import.py --save before.json
+    python benchmarks/bench_import.py --modules ipfabric "ipfabric.tools:DeviceConfigs" --baseline before.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from statistics import median
+
+
+def import_times(statement: str) -> dict:
+    """Runs the import statement in a new interpreter and returns {module: (self us, cumulative us)}"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True
+    )
+    times = dict()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        times[module.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def statement(target: str) -> str:
+    """'package' or 'package:name' to `import package` or `from package import name`"""
+    module, _, name = target.partition(":")
+    return f"from {module} import {name}" if name else f"import {module}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=["ipfabric", "ipfabric.tools:DeviceConfigs"])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules listed")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file of a previous run to report regressions against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown of the median reported as regression")
+    args = parser.parse_args()
+
+    results = dict()
+    for target in args.modules:
+        totals, modules = list(), defaultdict(list)
+        for _ in range(args.repeat):
+            times = import_times(statement(target))
+            totals.append(sum(t[0] for t in times.values()) / 10**6)
+            for module, (self_us, _) in times.items():
+                modules[module].append(self_us / 10**6)
+        slowest = sorted(((median(t), m) for m, t in modules.items()), reverse=True)[: args.top]
+        results[target] = dict(median=median(totals), min=min(totals), modules=len(modules))
+        print(f"{statement(target)}: {median(totals):.3f}s median, {min(totals):.3f}s min, {len(modules)} modules")
+        for seconds, module in slowest:
+            print(f"    {seconds * 1000:>8.1f}ms {module}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(dict(args=vars(args), results=results), f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        slower = {
+            name: (baseline[name]["median"], result["median"])
+            for name, result in results.items()
+            if name in baseline and result["median"] > baseline[name]["median"] * (1 + args.threshold)
+        }
+        for name, (before, after) in slower.items():
+            print(f"REGRESSION {name}: {before:.3f}s -> {after:.3f}s ({after / before - 1:+.0%})")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""
+Local stand-in for an IP Fabric appliance used by the benchmarks, serves synthetic data over HTTP:
+
+    GET  api/version, users/me, snapshots, snapshots/{id}/settings, reports, reports/groups
+    GET  tables/management/configuration/download
+    POST tables/management/snapshots and any tables/* endpoint with columns, filters, sort and pagination
+
+Every table has `rows` rows per snapshot; consecutive snapshots change about 1% of the rows and the newest snapshot
+has 0.5% more rows so `Table.compare` finds differences. Each request waits `latency` seconds plus `row_latency`
+seconds per row returned to simulate the server.
+
+    python benchmarks/mock_server.py --rows 100000 --latency 0.02
+"""
+import argparse
+import json
+import random
+import socket
+import threading
+import uuid
+import zlib
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep
+from urllib.parse import urlparse, parse_qs
+
+from ipfabric.filters import query_rows
+
+API_VERSION = "v6.0"
+RELEASE_VERSION = "6.0.0+1"
+TS_START = 1672531200000
+DEVICE_INTERFACES = 48
+
+TABLE_COLUMNS = {
+    "tables/inventory/devices": [
+        "id",
+        "sn",
+        "hostname",
+        "siteName",
+        "vendor",
+        "platform",
+        "model",
+        "version",
+        "uptime",
+        "taskKey",
+        "loginIp",
+        "memoryUtilization",
+    ],
+    "tables/inventory/interfaces": [
+        "id",
+        "sn",
+        "hostname",
+        "intName",
+        "siteName",
+        "l1",
+        "l2",
+        "dscr",
+        "mac",
+        "speed",
+        "mtu",
+        "primaryIp",
+    ],
+    "tables/management/configuration": ["id", "sn", "hostname", "lastChangeAt", "lastCheckAt", "status", "hash"],
+}
+DEFAULT_COLUMNS = ["id", "sn", "hostname", "siteName", "name", "state", "value"]
+SNAPSHOT_SETTINGS = {"disabledPostDiscoveryActions": []}
+USER = {
+    "id": "1",
+    "username": "admin",
+    "email": "admin@ipfabric.io",
+    "isLocal": True,
+    "active": True,
+    "ldapId": None,
+    "timezone": "UTC",
+    "roleIds": ["admin"],
+}
+
+
+def _value(column: str, i: int, rand: random.Random, per_device: int):
+    device = i // per_device
+    if column == "id":
+        return str(i)
+    if column == "sn":
+        return f"SN{device:08d}"
+    if column == "hostname":
+        return f"device-{device}"
+    if column == "siteName":
+        return f"site-{device % 300}"
+    if column == "intName":
+        return f"Eth1/{i % per_device}"
+    if column == "taskKey":
+        return str(uuid.UUID(int=i, version=4))
+    if column in {"uptime", "speed", "value"}:
+        return rand.randint(0, 10**7)
+    if column == "mtu":
+        return rand.choice([1500, 9000, 9216])
+    if column == "memoryUtilization":
+        return round(rand.random() * 100, 2)
+    if column in {"loginIp", "primaryIp"}:
+        return f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+    if column == "mac":
+        return f"{rand.getrandbits(48):012x}"
+    if column in {"l1", "l2", "state", "status"}:
+        return rand.choice(["up", "down"])
+    if column in {"lastChangeAt", "lastCheckAt"}:
+        return TS_START + i * 1000
+    if column == "hash":
+        return f"{zlib.crc32(str(i).encode()):08x}{i:024x}"
+    return f"{column}-{rand.randint(0, 999)}"
+
+
+class MockIPFabric:
+    """HTTP server in a background thread, use as a context manager or call `start` and `stop`"""
+
+    def __init__(
+        self,
+        rows: int = 10000,
+        snapshots: int = 2,
+        intents: int = 20,
+        config_size: int = 20000,
+        latency: float = 0.0,
+        row_latency: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 0,
+    ):
+        self.rows, self.intents, self.config_size = rows, intents, config_size
+        self.latency, self.row_latency, self.seed = latency, row_latency, seed
+        self.requests = 0
+        rand = random.Random(seed)
+        self.snapshot_ids = [str(uuid.UUID(int=rand.getrandbits(128), version=4)) for _ in range(snapshots)]
+        self._tables: "OrderedDict[tuple, list]" = OrderedDict()
+        self._queries: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockIPFabric":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # Synthetic data
+
+    def snapshot_rows(self) -> list:
+        rows = list()
+        for n, snapshot_id in enumerate(self.snapshot_ids):
+            end = TS_START + (len(self.snapshot_ids) - n) * 86400000
+            rows.append(
+                dict(
+                    id=snapshot_id,
+                    status="done",
+                    finishStatus="done",
+                    loadedSize=10**8,
+                    unloadedSize=10**7,
+                    name=f"snapshot-{n}",
+                    note=None,
+                    sites=[f"site-{s}" for s in range(3)],
+                    fromArchive=False,
+                    loading=False,
+                    locked=n == 0,
+                    deviceAddedCount=0,
+                    deviceRemovedCount=0,
+                    interfaceActiveCount=self.rows,
+                    interfaceCount=self.rows,
+                    interfaceEdgeCount=0,
+                    totalDevCount=self.rows // DEVICE_INTERFACES,
+                    isLastSnapshot=n == 0,
+                    tsChange=end,
+                    tsEnd=end,
+                    tsStart=end - 3600000,
+                    userCount=0,
+                )
+            )
+        return rows
+
+    @staticmethod
+    def columns(endpoint: str) -> list:
+        return TABLE_COLUMNS.get(endpoint, DEFAULT_COLUMNS)
+
+    def table(self, endpoint: str, snapshot_id: str) -> list:
+        """All rows of a table in a snapshot, the oldest snapshot is generated first and changed by the newer ones"""
+        references = {"$last": 0, "$prev": 1, "$lastLocked": 0}
+        if snapshot_id in references and references[snapshot_id] < len(self.snapshot_ids):
+            snapshot_id = self.snapshot_ids[references[snapshot_id]]
+        key = (endpoint, snapshot_id)
+        with self._lock:
+            if key in self._tables:
+                self._tables.move_to_end(key)
+                return self._tables[key]
+        age = self.snapshot_ids.index(snapshot_id) if snapshot_id in self.snapshot_ids else 0
+        newest = len(self.snapshot_ids) - 1 - age
+        columns = self.columns(endpoint)
+        per_device = 1 if endpoint == "tables/inventory/devices" else DEVICE_INTERFACES
+        count = self.rows + (self.rows // 200 if age == 0 and len(self.snapshot_ids) > 1 else 0)
+        seed = zlib.crc32(endpoint.encode()) ^ self.seed
+        rows = list()
+        for i in range(count):
+            rand = random.Random(seed * 1000003 + i)
+            row = {c: _value(c, i, rand, per_device) for c in columns}
+            if newest and i % 100 < newest:
+                changed = [c for c in columns if c not in {"id", "sn", "hostname", "intName", "hash"}]
+                row[changed[i % len(changed)]] = _value(changed[i % len(changed)], i + newest, rand, per_device)
+            rows.append(row)
+        with self._lock:
+            self._tables[key] = rows
+            while len(self._tables) > 8:
+                self._tables.popitem(last=False)
+        return rows
+
+    @staticmethod
+    def color(row: dict) -> int:
+        return (zlib.crc32(str(row.get("id")).encode()) % 4) * 10
+
+    def query(self, endpoint: str, body: dict) -> list:
+        """Filtered, sorted and projected rows of a query, cached without the pagination"""
+        key = json.dumps([endpoint, {k: v for k, v in body.items() if k != "pagination"}], sort_keys=True)
+        with self._lock:
+            if key in self._queries:
+                self._queries.move_to_end(key)
+                return self._queries[key]
+        if endpoint == "tables/management/snapshots":
+            rows = self.snapshot_rows()
+        else:
+            rows = self.table(endpoint, body.get("snapshot"))
+        filters = dict(body.get("filters") or dict())
+        colors = dict()
+        for column in [k for k, v in filters.items() if isinstance(v, list) and v and v[0] == "color"]:
+            colors[column] = filters.pop(column)[2]
+        if colors:
+            rows = [r for r in rows if all(self.color(r) == c for c in colors.values())]
+        data = query_rows(rows, body.get("columns"), filters or None, body.get("sort"))
+        with self._lock:
+            self._queries[key] = data
+            while len(self._queries) > 128:
+                self._queries.popitem(last=False)
+        return data
+
+    def intent_checks(self) -> list:
+        endpoints = list(TABLE_COLUMNS)[:2] + [f"tables/intent/check-{n}" for n in range(self.intents)]
+        checks = list()
+        for n in range(self.intents):
+            counts = {str(c): self.rows // 8 for c in (0, 10, 20, 30)}
+            checks.append(
+                {
+                    "id": str(320000000 + n),
+                    "name": f"Intent check {n}",
+                    "apiEndpoint": f"/{API_VERSION}/{endpoints[n % len(endpoints)]}",
+                    "webEndpoint": f"/technology/intent/check-{n}",
+                    "column": "state" if n >= 2 else "hostname",
+                    "custom": False,
+                    "defaultColor": None,
+                    "status": 1,
+                    "groups": [{"id": "320668119", "custom": False, "name": "Benchmark"}],
+                    "checks": counts,
+                    "descriptions": {"general": f"Intent check {n}", "checks": {}},
+                    "result": {"count": self.rows // 2, "checks": counts},
+                }
+            )
+        return checks
+
+    def config(self, config_hash: str) -> bytes:
+        line = f"interface Ethernet1/{config_hash[:4]}\n description benchmark {config_hash}\n".encode()
+        return (line * (self.config_size // len(line) + 1))[: self.config_size]
+
+    # HTTP
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body are written separately, avoids delayed ACK stalls
+
+            def log_message(self, *args):
+                pass
+
+            def handle_one_request(self):
+                if hasattr(socket, "TCP_QUICKACK"):  # acknowledge the request headers before the body arrives
+                    self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+                super().handle_one_request()
+
+            def _send(self, status: int, body, content_type: str = "application/json"):
+                content = body if isinstance(body, bytes) else json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def _path(self):
+                url = urlparse(self.path)
+                path = url.path.strip("/")
+                prefix = f"api/{API_VERSION}/"
+                return (path[len(prefix) :] if path.startswith(prefix) else path), parse_qs(url.query)
+
+            def _wait(self, rows: int = 0):
+                server.requests += 1
+                if server.latency or server.row_latency:
+                    sleep(server.latency + rows * server.row_latency)
+
+            def do_GET(self):
+                path, query = self._path()
+                self._wait()
+                if path == "api/version":
+                    return self._send(200, {"apiVersion": API_VERSION, "releaseVersion": RELEASE_VERSION})
+                if path == "users/me":
+                    return self._send(200, USER)
+                if path == "snapshots":
+                    return self._send(
+                        200,
+                        [
+                            {"id": s, "version": RELEASE_VERSION, "licensedDevCount": 1, "errors": []}
+                            for s in server.snapshot_ids
+                        ],
+                    )
+                if path.startswith("snapshots/") and path.endswith("/settings"):
+                    return self._send(200, SNAPSHOT_SETTINGS)
+                if path == "reports":
+                    return self._send(200, server.intent_checks())
+                if path == "reports/groups":
+                    return self._send(200, [{"id": "320668119", "custom": False, "name": "Benchmark", "children": []}])
+                if path == "tables/management/configuration/download":
+                    return self._send(200, server.config(query.get("hash", [""])[0]), "text/plain")
+                self._send(404, {"code": "API_NOT_FOUND", "message": f"Unknown endpoint '{path}'"})
+
+            def do_POST(self):
+                path, _ = self._path()
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if not path.startswith("tables/"):
+                    self._wait()
+                    return self._send(404, {"code": "API_NOT_FOUND", "message": f"Unknown endpoint '{path}'"})
+                columns = server.columns(path) if path != "tables/management/snapshots" else None
+                if columns is not None and not set(body.get("columns") or ["*"]) <= set(columns):
+                    self._wait()
+                    message = f'"columns" must be one of [{", ".join(columns)}]'
+                    return self._send(422, {"errors": [{"message": message}]})
+                data = server.query(path, body)
+                pagination = body.get("pagination") or dict(start=0, limit=len(data))
+                start, limit = pagination.get("start", 0), pagination.get("limit", len(data))
+                page = data[start : start + limit]
+                self._wait(len(page))
+                self._send(200, {"data": page, "_meta": {"count": len(data), "size": limit, "limit": limit}})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="Rows of each table per snapshot")
+    parser.add_argument("--snapshots", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--row-latency", type=float, default=0.0, help="Seconds added per row returned")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    server = MockIPFabric(args.rows, args.snapshots, latency=args.latency, row_latency=args.row_latency, port=args.port)
+    print(f"Serving {args.rows:,} rows per table on {server.url} (IPF_URL={server.url} IPF_TOKEN=any)")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        server.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+async_example.py
+"""
+import asyncio
+
+from ipfabric import AsyncIPFClient
+
+
+async def main():
+    async with AsyncIPFClient(max_workers=8) as ipf:
+        # ipf = await AsyncIPFClient('https://demo3.ipfabric.io/', token='token', verify=False).connect()
+        print(await ipf.get_count('tables/inventory/devices'))
+
+        # Requests are limited to max_workers at a time across all coroutines
+        devices, sites, routes = await ipf.gather(
+            ipf.inventory.devices.all(),
+            ipf.inventory.sites.all(),
+            ipf.technology.routing.routes_ipv4.all(parallel=True),
+        )
+        print(len(devices), len(sites), len(routes))
+
+        # Same table across all loaded snapshots
+        snapshots = [s for k, s in ipf.loaded_snapshots.items() if k == s.snapshot_id]
+        counts = await ipf.gather(*[ipf.inventory.devices.count(snapshot_id=s.snapshot_id) for s in snapshots])
+        print(dict(zip([s.snapshot_id for s in snapshots], counts)))
+
+        await ipf.intent.load_intent()
+        print(len(ipf.intent.intent_checks))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -22,13 +22,19 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+from .async_client import AsyncIPFClient
 from .client import IPFClient
 
-try:
-    import importlib.metadata as importlib_metadata
-except ModuleNotFoundError:
-    import importlib_metadata
 
-__version__ = importlib_metadata.version(__name__)
+def __getattr__(name: str):
+    # Reading the package metadata is deferred until the version is requested (PEP 562)
+    if name == "__version__":
+        try:
+            import importlib.metadata as importlib_metadata
+        except ModuleNotFoundError:
+            import importlib_metadata
+        return importlib_metadata.version(__name__)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
 
-__all__ = ["IPFClient"]
+
+__all__ = ["IPFClient", "AsyncIPFClient"]
@@ -1,26 +1,51 @@
+import json
 import logging
-from collections import OrderedDict
+import os
+import re
+import ssl
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 import httpx
-
-try:
-    import importlib.metadata as importlib_metadata
-except ModuleNotFoundError:
-    import importlib_metadata
-from typing import Optional, Union, Dict, List
+from pathlib import Path
+from time import perf_counter, sleep, time
+from typing import Optional, Union, Dict, List, Iterator, Iterable, Any, Callable
 from urllib.parse import urljoin
 from httpx import Client
 from ipfabric_httpx_auth import PasswordCredentials, HeaderApiKey
 from pydantic import BaseSettings
-import dotenv
 
 from ipfabric import snapshot_models
+from ipfabric.codec import JSON_HEADERS, decode, get_codec, page_decoder, row_struct
+from ipfabric.cache import (
+    ColumnCache,
+    CountCache,
+    HandshakeCache,
+    TableCache,
+    ResultCache,
+    DEFAULT_HANDSHAKE_TTL,
+    DEFAULT_TABLE_CACHE_SIZE,
+    DEFAULT_RESULT_POLICIES,
+)
+from ipfabric.governor import Governor
+from ipfabric.instrumentation import Instrumentation, RequestEvent, NO_SCOPE, carry_context, instrumented
+from ipfabric.paging import PageSizer, response_size
+from ipfabric.retry import (
+    DEFAULT_RETRIES,
+    TRANSIENT_ERRORS,
+    Checkpoints,
+    RetryPolicy,
+    checkpoint_key,
+    get_retry_policy,
+)
 from ipfabric.settings.user_mgmt import User
 from uuid import UUID
 
 logger = logging.getLogger("ipfabric")
 
 LAST_ID, PREV_ID, LASTLOCKED_ID = "$last", "$prev", "$lastLocked"
+DEFAULT_WORKERS = 8
 
 
 class Settings(BaseSettings):
@@ -44,117 +69,85 @@ class Settings(BaseSettings):
         pass
 
 
-class IPFabricAPI(Client):
-    def __init__(
-        self,
+@lru_cache(maxsize=None)
+def _find_dotenv(cwd: str) -> str:
+    """Searching the .env file walks up the filesystem, the result only changes with the working directory"""
+    import dotenv
+
+    return dotenv.find_dotenv()
+
+
+@lru_cache(maxsize=None)
+def _ssl_context(verify: Union[bool, str, ssl.SSLContext]) -> ssl.SSLContext:
+    """Loading the CA bundle takes tens of milliseconds, clients verifying the same way share a context"""
+    return httpx.create_ssl_context(verify=verify)
+
+
+class IPFabricBase:
+    """Logic shared by the synchronous and asynchronous clients which does not make any requests"""
+
+    @staticmethod
+    def _load_settings(
         base_url: Optional[str] = None,
         api_version: Optional[str] = None,
         token: Optional[str] = None,
-        snapshot_id: Optional[str] = LAST_ID,
         username: Optional[str] = None,
         password: Optional[str] = None,
-        unloaded: bool = False,
-        **kwargs: Optional[dict],
-    ):
-        """Initializes the IP Fabric Client
+    ) -> Settings:
+        """Merges the parameters with the environment variables, parameters take precedence"""
+        import dotenv
 
-        Args:
-            base_url: IP Fabric instance provided in 'base_url' parameter, or the 'IPF_URL' environment variable
-            api_version: Version of IP Fabric API
-            token: API token or 'IPF_TOKEN' environment variable
-            snapshot_id: IP Fabric snapshot ID to use by default for database actions - defaults to '$last'
-            username: username to authenticate against IP Fabric
-            password: password to authenticate against IP Fabric
-            **kwargs: Keyword args to pass to httpx
-        """
-        self.unloaded = unloaded
         # find env file
-        dotenv.load_dotenv(dotenv.find_dotenv())
-        with Settings() as settings:
-            super().__init__(
-                timeout=kwargs.get("timeout", True),
-                verify=kwargs.get("verify", settings.ipf_verify),
-            )
-            base_url = base_url or settings.ipf_url
-            if not base_url:
-                raise RuntimeError("IP Fabric base_url not provided or IPF_URL not set")
-
-            self.api_version, self.os_version = self.check_version(
-                api_version or settings.ipf_version, base_url, settings.ipf_dev
-            )
-            self.base_url = (
-                urljoin(base_url, f"api/{self.api_version}/")
-                if not settings.ipf_dev
-                else urljoin(base_url, f"{self.api_version}/")
-            )
-            token = token or settings.ipf_token
-            username = username or settings.ipf_username
-            password = password or settings.ipf_password
-
-        if not token and not (username and password):
+        dotenv.load_dotenv(_find_dotenv(os.getcwd()))
+        params = dict(
+            ipf_url=base_url, ipf_version=api_version, ipf_token=token, ipf_username=username, ipf_password=password
+        )
+        settings = Settings(**{k: v for k, v in params.items() if v})
+        if not settings.ipf_url:
+            raise RuntimeError("IP Fabric base_url not provided or IPF_URL not set")
+        if not settings.ipf_token and not (settings.ipf_username and settings.ipf_password):
             logger.error("IP Fabric Token or Username/Password not provided.")
             raise RuntimeError("IP Fabric Token or Username/Password not provided.")
+        return settings
 
-        self.auth = (
-            HeaderApiKey(token) if token else PasswordCredentials(base_url, username, password, self.api_version)
-        )
-        # Get Current User, by doing that we are also ensuring the token is valid
-        self.user = self.get_user()
-        self.snapshots = self.get_snapshots()
-        self._attribute_filters = None
-        self.snapshot_id = snapshot_id
-        logger.debug(
-            f"Successfully connected to '{self.base_url.host}' IPF version '{self.os_version}' "
-            f"as user '{self.user.username}'"
+    def _api_url(self, settings: Settings) -> str:
+        return (
+            urljoin(settings.ipf_url, f"api/{self.api_version}/")
+            if not settings.ipf_dev
+            else urljoin(settings.ipf_url, f"{self.api_version}/")
         )
 
-    @property
-    def attribute_filters(self):
-        return self._attribute_filters
-
-    @attribute_filters.setter
-    def attribute_filters(self, attribute_filters: Union[Dict[str, List[str]], None]):
-        if attribute_filters:
-            logger.warning(
-                f"Setting Global Attribute Filter for all tables/diagrams until explicitly unset to None.\n"
-                f"This may cause errors on some tables like in Settings.\n"
-                f"Adding an Attribute Filter to any function will overwrite the Global Filter.\n"
-                f"Filter: {attribute_filters}"
-            )
-        self._attribute_filters = attribute_filters
+    def _authentication(self, settings: Settings) -> httpx.Auth:
+        return (
+            HeaderApiKey(settings.ipf_token)
+            if settings.ipf_token
+            else PasswordCredentials(settings.ipf_url, settings.ipf_username, settings.ipf_password, self.api_version)
+        )
 
-    def get_user(self) -> User:
-        """Gets current logged in user information.
+    @staticmethod
+    def _sdk_version(api_version: str = None) -> list:
+        if api_version == "v1":
+            raise RuntimeError("IP Fabric Version < 5.0 support has been dropped, please use ipfabric==4.4.3")
+        if api_version:
+            return api_version.lstrip("v").split(".")
+        try:
+            import importlib.metadata as importlib_metadata
+        except ModuleNotFoundError:
+            import importlib_metadata
+        return importlib_metadata.version("ipfabric").lstrip("v").split(".")
 
-        Returns:
-            User: User model of logged in user
+    @staticmethod
+    def _compare_versions(api_version: list, version: dict) -> tuple:
         """
-        resp = self.get("users/me")
-        resp.raise_for_status()
-        return User(**resp.json())
-
-    def check_version(self, api_version: str = None, base_url: str = None, dev: bool = False) -> tuple:
-        """Checks API Version and returns the version to use in the URL and the OS Version
-
+        Compares the requested API Version to the response of `api/version`
         Args:
-            api_version: User defined API Version or None
-            base_url: URL of IP Fabric
-            dev: Internal Use Only
+            api_version: Split User defined API Version or SDK Version
+            version: JSON response of `api/version`
 
         Returns:
             api_version, os_version
         """
-        if api_version == "v1":
-            raise RuntimeError("IP Fabric Version < 5.0 support has been dropped, please use ipfabric==4.4.3")
-        api_version = (
-            api_version.lstrip("v").split(".")
-            if api_version
-            else importlib_metadata.version("ipfabric").lstrip("v").split(".")
-        )
-
-        resp = self.get(urljoin(base_url, "api/version" if not dev else "version"))
-        resp.raise_for_status()
-        os_api_version = resp.json()["apiVersion"].lstrip("v").split(".")
+        os_api_version = version["apiVersion"].lstrip("v").split(".")
         return_version = f"v{api_version[0]}.{api_version[1]}" if len(api_version) > 1 else f"v{api_version[0]}"
         if len(api_version) == 1 and api_version[0] > os_api_version[0]:
             logger.warning(
@@ -174,25 +167,115 @@ class IPFabricAPI(Client):
                 f"v{api_version[0]}.  Please upgrade the Python SDK to the new major version."
             )
 
-        return return_version, resp.json()["releaseVersion"]
+        return return_version, version["releaseVersion"]
 
-    def update(self):
-        """get all snapshots and assigns them to an attribute"""
-        self.snapshots = self.get_snapshots()
+    @staticmethod
+    def _handshake_cache(cache_dir: Optional[Union[str, Path]], fast_start: Union[bool, float]):
+        if not fast_start:
+            return None
+        return HandshakeCache(cache_dir, DEFAULT_HANDSHAKE_TTL if fast_start is True else fast_start)
+
+    def _cached_handshake(self, settings: Settings) -> bool:
+        """Restores the versions, user and snapshots of a cached handshake, returns False if none is cached"""
+        if self.handshake_cache is None:
+            return False
+        credentials = settings.ipf_token or f"{settings.ipf_username}:{settings.ipf_password}"
+        self._handshake = self.handshake_cache.key(
+            settings.ipf_url, settings.ipf_version, settings.ipf_dev, self.unloaded, credentials
+        )
+        handshake = self.handshake_cache.get(self._handshake)
+        if handshake is None:
+            return False
+        self.api_version, self.os_version = handshake["api_version"], handshake["os_version"]
+        self.base_url = self._api_url(settings)
+        self.auth = self._authentication(settings)
+        # The token is validated by the first request, a 401 drops the cached handshake
+        self.user = User(**handshake["user"])
+        if handshake["snapshots"] is not None:
+            self.snapshots = self._index_snapshots(snapshot_models.Snapshot(**s) for s in handshake["snapshots"])
+        logger.debug(f"Using the handshake of '{self.base_url.host}' cached {time() - handshake['time']:.0f}s ago.")
+        return True
+
+    def _save_handshake(self, snapshots: Optional[dict]):
+        if not getattr(self, "_handshake", None):
+            return
+        unique = list({s.snapshot_id: s for s in snapshots.values()}.values()) if snapshots is not None else None
+        handshake = dict(
+            api_version=self.api_version,
+            os_version=self.os_version,
+            user=json.loads(self.user.json(by_alias=True)),
+            snapshots=[json.loads(s.json(by_alias=True)) for s in unique] if unique is not None else None,
+        )
+        self.handshake_cache.set(self._handshake, handshake)
+
+    def _check_handshake(self, response: httpx.Response) -> httpx.Response:
+        """Drops the cached handshake once the server rejects the credentials it was cached for"""
+        if response.status_code == 401 and getattr(self, "_handshake", None):
+            logger.warning("Credentials rejected by IP Fabric, removing the cached handshake.")
+            self.handshake_cache.invalidate(self._handshake)
+            self._handshake = None
+        return response
+
+    def _invalidate_columns(self, base_url: str, os_version: str):
+        """Drops cached columns of other IP Fabric versions of this server"""
+        self.column_cache.invalidate(httpx.URL(base_url).host, os_version)
+
+    def _cached_columns(self, url: str) -> Optional[List[str]]:
+        return self.column_cache.get(self.base_url.host, self.os_version, url)
+
+    def _cache_columns(self, url: str, columns: Optional[List[str]], save: bool = True):
+        """Caches the columns of an endpoint, nothing is cached if the columns could not be parsed"""
+        if not columns or not isinstance(columns, list):
+            return
+        self.column_cache.set(self.base_url.host, self.os_version, url, columns, save=save)
+
+    def build_request(self, method, url, *, json=None, content=None, headers=None, **kwargs) -> httpx.Request:
+        """Encodes `json=` payloads with the client JSON codec instead of the standard library"""
+        codec = getattr(self, "codec", None)
+        if json is not None and content is None and codec is not None:
+            content, json = codec.dumps(json), None
+            headers = dict(JSON_HEADERS, **dict(headers or dict()))
+        return super().build_request(method, url, content=content, json=json, headers=headers, **kwargs)
+
+    def _host(self, url: Union[httpx.URL, str]) -> str:
+        return httpx.URL(url).host or getattr(self, "base_url", httpx.URL()).host or ""
+
+    def _page_scope(self, start: int, limit: int):
+        """Instrumentation scope of the requests of a page"""
+        instrumentation = getattr(self, "instrumentation", None)
+        return instrumentation.page(start // limit) if instrumentation else NO_SCOPE
+
+    def _decode(self, response: httpx.Response, decoder=None):
+        """Decodes the JSON of a response with the client JSON codec or into typed rows with a `page_decoder`"""
+        return decode(response, self.codec, decoder)
+
+    @staticmethod
+    def _struct_decoder(url: str, payload: dict):
+        return page_decoder(row_struct(url, payload["columns"]))
+
+    def _page_size(self, url: str, payload: dict, limit: Optional[int] = None) -> int:
+        return limit or self.page_size or self.page_sizer.limit(url, payload.get("columns"))
+
+    @property
+    def attribute_filters(self):
+        return self._attribute_filters
+
+    @attribute_filters.setter
+    def attribute_filters(self, attribute_filters: Union[Dict[str, List[str]], None]):
+        if attribute_filters:
+            logger.warning(
+                f"Setting Global Attribute Filter for all tables/diagrams until explicitly unset to None.\n"
+                f"This may cause errors on some tables like in Settings.\n"
+                f"Adding an Attribute Filter to any function will overwrite the Global Filter.\n"
+                f"Filter: {attribute_filters}"
+            )
+        self._attribute_filters = attribute_filters
 
     @property
     def loaded_snapshots(self) -> dict:
         """get only loaded snapshots"""
         return {k: v for k, v in self.snapshots.items() if v.loaded}
 
-    @property
-    def unloaded_snapshots(self):
-        if not self.unloaded:
-            logger.warning("Unloaded snapshots not initialized. Retrieving unloaded snapshots.")
-            self.unloaded = True
-            self.update()
-        return {k: v for k, v in self.snapshots.items() if not v.loaded}
-
     @property
     def snapshot_id(self):
         """get snapshot Id"""
@@ -214,21 +297,6 @@ class IPFabricAPI(Client):
         else:
             self._snapshot_id = self.snapshots[snapshot_id].snapshot_id
 
-    def get_snapshot(self, snapshot_id: str):
-        if snapshot_id in self.snapshots:
-            return self.snapshots[snapshot_id]
-        else:
-            payload = {"columns": snapshot_models.SNAPSHOT_COLUMNS, "filters": {"id": ["eq", snapshot_id]}}
-            results = self._ipf_pager("tables/management/snapshots", payload)
-            if not results:
-                logger.error(f"Snapshot {snapshot_id} not found.")
-                return None
-            get_results = self._get_snapshots()
-            snapshot = self._create_snapshot_model(results[0], get_results)
-            if snapshot.loaded:
-                snapshot.get_assurance_engine_settings(self)
-            return snapshot
-
     @staticmethod
     def _create_snapshot_model(s, get_results):
         return snapshot_models.Snapshot(
@@ -262,6 +330,323 @@ class IPFabricAPI(Client):
                     return snap.snapshot_id
         raise ValueError(f"Could not locate Snapshot ID for {snapshot}.")
 
+    def _check_payload(self, payload, snapshot, filters, reports, sort, attr_filters):
+        if not snapshot:
+            payload.pop("snapshot", None)
+        if filters:
+            payload["filters"] = filters
+        if reports:
+            payload["reports"] = reports
+        if sort:
+            payload["sort"] = sort
+        if attr_filters or self.attribute_filters:
+            payload["attributeFilters"] = attr_filters or self.attribute_filters
+        return payload
+
+    @staticmethod
+    def _parse_columns(r: httpx.Response) -> list:
+        """Extracts the column names from the error of a malformed payload"""
+        if r.status_code == 422:
+            msg = r.json()["errors"][0]["message"]
+            return [x.strip() for x in re.match(r"\".*\".*\[(.*)]$", msg).group(1).split(",")]
+        else:
+            r.raise_for_status()
+
+    def _snapshots_payload(self) -> dict:
+        payload = {"columns": snapshot_models.SNAPSHOT_COLUMNS, "sort": {"order": "desc", "column": "tsEnd"}}
+        if not self.unloaded:
+            logger.warning("Retrieving only loaded snapshots. To load all snapshots set `unloaded` to True.")
+            payload["filters"] = {"and": [{"status": ["eq", "done"]}, {"finishStatus": ["eq", "done"]}]}
+        return payload
+
+    def _resolve_snapshot_payload(self, snapshot_id: str) -> dict:
+        """Payload returning only the ID of a single snapshot for an ID or reference ($last, $prev, $lastLocked)"""
+        references = [LAST_ID, PREV_ID, LASTLOCKED_ID]
+        filters = list()
+        if snapshot_id in references or not self.unloaded:
+            filters.extend([{"status": ["eq", "done"]}, {"finishStatus": ["eq", "done"]}])
+        if snapshot_id == LASTLOCKED_ID:
+            filters.append({"locked": ["eq", True]})
+        elif snapshot_id not in references:
+            filters.append({"id": ["eq", snapshot_id]})
+        payload = {
+            "columns": ["id"],
+            "sort": {"order": "desc", "column": "tsEnd"},
+            "pagination": {"start": 1 if snapshot_id == PREV_ID else 0, "limit": 1},
+        }
+        if filters:
+            payload["filters"] = {"and": filters}
+        return payload
+
+    def _build_snapshots(self, results: list, get_results: dict) -> OrderedDict:
+        """Creates the dictionary of {ID: Snapshot} including the `$last`, `$prev` and `$lastLocked` references"""
+        return self._index_snapshots(self._create_snapshot_model(s, get_results) for s in results)
+
+    @staticmethod
+    def _index_snapshots(snapshots: Iterable[snapshot_models.Snapshot]) -> OrderedDict:
+        """Snapshots sorted by end time to {ID: Snapshot} including the references"""
+        snap_dict = OrderedDict()
+        for snap in snapshots:
+            snap_dict[snap.snapshot_id] = snap
+            if snap.loaded:
+                if LASTLOCKED_ID not in snap_dict and snap.locked:
+                    snap_dict[LASTLOCKED_ID] = snap
+                if LAST_ID not in snap_dict:
+                    snap_dict[LAST_ID] = snap
+                    continue
+                if PREV_ID not in snap_dict:
+                    snap_dict[PREV_ID] = snap
+        return snap_dict
+
+
+class IPFabricAPI(IPFabricBase, Client):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_version: Optional[str] = None,
+        token: Optional[str] = None,
+        snapshot_id: Optional[str] = LAST_ID,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        unloaded: bool = False,
+        max_workers: int = DEFAULT_WORKERS,
+        cache_dir: Optional[Union[str, Path]] = None,
+        lazy_snapshots: bool = False,
+        table_cache: Union[bool, int] = False,
+        result_cache: Union[bool, Dict[str, float]] = False,
+        json_codec: Optional[str] = None,
+        page_size: Optional[int] = None,
+        retries: Union[int, RetryPolicy] = DEFAULT_RETRIES,
+        rate_limit: Optional[float] = None,
+        host_limits: Optional[Dict[str, dict]] = None,
+        instrumentation: Optional[List[Callable[[RequestEvent], Any]]] = None,
+        fast_start: Union[bool, float] = False,
+        **kwargs: Optional[dict],
+    ):
+        """Initializes the IP Fabric Client
+
+        Args:
+            base_url: IP Fabric instance provided in 'base_url' parameter, or the 'IPF_URL' environment variable
+            api_version: Version of IP Fabric API
+            token: API token or 'IPF_TOKEN' environment variable
+            snapshot_id: IP Fabric snapshot ID to use by default for database actions - defaults to '$last'
+            username: username to authenticate against IP Fabric
+            password: password to authenticate against IP Fabric
+            unloaded: True to also retrieve unloaded snapshots
+            max_workers: Maximum number of concurrent requests used when paging in parallel
+            cache_dir: Optional directory to persist cached data like table columns
+            lazy_snapshots: Load the snapshots on first use and their Assurance Engine settings only when needed;
+                            the default snapshot is resolved with a single query
+            table_cache: Cache the results of snapshot table queries in `cache_dir/tables.sqlite` (in memory if no
+                         cache_dir), True for a maximum size of 1 GiB or the maximum size in bytes
+            result_cache: Cache the results of some `snapshot=False` tables in memory for a short time, True for the
+                          default policies or a dictionary of {endpoint: TTL in seconds} updating the defaults
+            json_codec: 'orjson', 'msgspec' or 'json' to encode payloads and decode tables, default is the fastest
+                        installed
+            page_size: Number of rows per page when fetching tables, default adapts the page size of each endpoint to
+                       the response times of the server
+            retries: Number of retries of idempotent requests (GET and table queries) failing with a timeout, a
+                     connection error or a 429/502/503/504 status, or a RetryPolicy; 0 disables retries
+            rate_limit: Optional maximum number of requests per second to a server, the number of concurrent requests
+                        is limited to `max_workers` and reduced while the server answers 429/503 or times out
+            host_limits: Optional {host: dict(max_concurrency=int, rate=float)} overriding the limits of a server
+            instrumentation: Optional hooks called with a RequestEvent after every request, like
+                             `ipfabric.instrumentation.LatencyStats()`; nothing is measured without hooks
+            fast_start: Reuse the versions, user and snapshots of a previous client of the same server and credentials
+                        saved in `cache_dir` (or `~/.cache/ipfabric`), True for 5 minutes or the TTL in seconds;
+                        the token is then only validated by the first request
+            **kwargs: Keyword args to pass to httpx
+        """
+        self.codec = get_codec(json_codec)
+        self.page_size = page_size
+        self.page_sizer = PageSizer()
+        self.retry = get_retry_policy(retries)
+        self.checkpoints = Checkpoints()
+        self.governor = Governor(max_workers, rate_limit, host_limits)
+        self.instrumentation = Instrumentation(instrumentation)
+        self.unloaded = unloaded
+        self.max_workers = max_workers
+        self.lazy_snapshots = lazy_snapshots
+        self.column_cache = ColumnCache(cache_dir)
+        self.table_cache = (
+            TableCache(cache_dir, DEFAULT_TABLE_CACHE_SIZE if table_cache is True else table_cache)
+            if table_cache
+            else None
+        )
+        self.result_cache = (
+            ResultCache(dict(DEFAULT_RESULT_POLICIES, **result_cache) if isinstance(result_cache, dict) else None)
+            if result_cache
+            else None
+        )
+        self.count_cache = CountCache()
+        self.handshake_cache = self._handshake_cache(cache_dir, fast_start)
+        self._handshake = None
+        self.snapshot_timings: Dict[str, float] = dict()
+        self._snapshots = None
+        settings = self._load_settings(base_url, api_version, token, username, password)
+        super().__init__(
+            timeout=kwargs.get("timeout", True),
+            verify=_ssl_context(kwargs.get("verify", settings.ipf_verify)),
+        )
+        if not self._cached_handshake(settings):
+            self.api_version, self.os_version = self.check_version(
+                settings.ipf_version, settings.ipf_url, settings.ipf_dev
+            )
+            self.base_url = self._api_url(settings)
+            self.auth = self._authentication(settings)
+            # Get Current User, by doing that we are also ensuring the token is valid
+            self.user = self.get_user()
+            if not lazy_snapshots:
+                self.snapshots = self.get_snapshots()
+            self._save_handshake(self._snapshots)
+        self._attribute_filters = None
+        self.snapshot_id = snapshot_id
+        logger.debug(
+            f"Successfully connected to '{self.base_url.host}' IPF version '{self.os_version}' "
+            f"as user '{self.user.username}'"
+        )
+
+    def _send(self, method: str, url: Union[httpx.URL, str], **kwargs) -> httpx.Response:
+        """Sends a single request once the `governor` allows it"""
+        governor = getattr(self, "governor", None)
+        if governor is None:
+            return self._check_handshake(super().request(method, url, **kwargs))
+        host = self._host(url)
+        governor.acquire(host)
+        response, overloaded = None, False
+        try:
+            response = super().request(method, url, **kwargs)
+            return self._check_handshake(response)
+        except httpx.TimeoutException:
+            overloaded = True
+            raise
+        finally:
+            governor.release(host, response, overloaded)
+
+    def request(self, method: str, url: Union[httpx.URL, str], **kwargs) -> httpx.Response:
+        """Sends a request, idempotent requests are retried on transient errors following the `retry` policy"""
+        instrumentation = getattr(self, "instrumentation", None)
+        if not instrumentation:
+            return self._retry(method, url, None, **kwargs)
+        event = instrumentation.start(method, url)
+        try:
+            response = self._retry(method, url, event, **kwargs)
+        except Exception as err:
+            instrumentation.finish(event, error=err)
+            raise
+        instrumentation.finish(event, response)
+        return response
+
+    def _retry(
+        self, method: str, url: Union[httpx.URL, str], event: Optional[RequestEvent], **kwargs
+    ) -> httpx.Response:
+        retry, attempt = getattr(self, "retry", None), 0
+        if not retry or not retry.idempotent(method, url):
+            return self._send(method, url, **kwargs)
+        while True:
+            try:
+                response = self._send(method, url, **kwargs)
+            except TRANSIENT_ERRORS as err:
+                if not retry.retry_error(attempt, err):
+                    raise
+                response, reason = None, repr(err)
+            else:
+                if not retry.retry_response(attempt, response):
+                    return response
+                reason = f"status {response.status_code}"
+            delay = retry.delay(attempt, response)
+            logger.warning(f"{method} {url} failed ({reason}), retry {attempt + 1}/{retry.retries} in {delay:.1f}s.")
+            sleep(delay)
+            attempt += 1
+            if event is not None:
+                event.retries = attempt
+
+    def get_user(self) -> User:
+        """Gets current logged in user information.
+
+        Returns:
+            User: User model of logged in user
+        """
+        resp = self.get("users/me")
+        resp.raise_for_status()
+        return User(**resp.json())
+
+    def check_version(self, api_version: str = None, base_url: str = None, dev: bool = False) -> tuple:
+        """Checks API Version and returns the version to use in the URL and the OS Version
+
+        Args:
+            api_version: User defined API Version or None
+            base_url: URL of IP Fabric
+            dev: Internal Use Only
+
+        Returns:
+            api_version, os_version
+        """
+        api_version = self._sdk_version(api_version)
+        resp = self.get(urljoin(base_url, "api/version" if not dev else "version"))
+        resp.raise_for_status()
+        api_version, os_version = self._compare_versions(api_version, resp.json())
+        self._invalidate_columns(base_url, os_version)
+        return api_version, os_version
+
+    @property
+    def snapshots(self) -> dict:
+        """Dictionary of {ID: Snapshot}, loaded on first use if `lazy_snapshots` is set"""
+        if self._snapshots is None:
+            self._snapshots = self.get_snapshots(ae_settings=not self.lazy_snapshots)
+        return self._snapshots
+
+    @snapshots.setter
+    def snapshots(self, snapshots: dict):
+        self._snapshots = snapshots
+
+    @IPFabricBase.snapshot_id.setter
+    def snapshot_id(self, snapshot_id):
+        if self._snapshots is not None:
+            IPFabricBase.snapshot_id.fset(self, snapshot_id)
+        else:
+            self._snapshot_id = self._resolve_snapshot_id(snapshot_id or LAST_ID)
+
+    def _resolve_snapshot_id(self, snapshot_id: str) -> Optional[str]:
+        """Finds the ID of a snapshot or reference ($last, $prev, $lastLocked) without loading all snapshots"""
+        res = self.post("tables/management/snapshots", json=self._resolve_snapshot_payload(snapshot_id))
+        res.raise_for_status()
+        data = res.json()["data"]
+        if data:
+            return data[0]["id"]
+        elif snapshot_id == LAST_ID:
+            logger.warning("No Snapshots are currently loaded.  Please load a snapshot before querying any data.")
+            return None
+        raise ValueError(f"Incorrect Snapshot ID: '{snapshot_id}'")
+
+    def update(self):
+        """get all snapshots and assigns them to an attribute"""
+        self.snapshots = self.get_snapshots(ae_settings=not self.lazy_snapshots)
+        self._save_handshake(self._snapshots)
+
+    @property
+    def unloaded_snapshots(self):
+        if not self.unloaded:
+            logger.warning("Unloaded snapshots not initialized. Retrieving unloaded snapshots.")
+            self.unloaded = True
+            self.update()
+        return {k: v for k, v in self.snapshots.items() if not v.loaded}
+
+    def get_snapshot(self, snapshot_id: str):
+        if snapshot_id in self.snapshots:
+            return self.snapshots[snapshot_id]
+        else:
+            payload = {"columns": snapshot_models.SNAPSHOT_COLUMNS, "filters": {"id": ["eq", snapshot_id]}}
+            results = self._ipf_pager("tables/management/snapshots", payload)
+            if not results:
+                logger.error(f"Snapshot {snapshot_id} not found.")
+                return None
+            get_results = self._get_snapshots()
+            snapshot = self._create_snapshot_model(results[0], get_results)
+            if snapshot.loaded:
+                snapshot.get_assurance_engine_settings(self)
+            return snapshot
+
     def _get_snapshots(self):
         """
         Need to do a GET and POST to get all Snapshot data. See NIM-7223
@@ -289,61 +674,273 @@ class IPFabricAPI(Client):
             )
         return ae_tasks
 
-    def get_snapshots(self):
+    @instrumented
+    def get_snapshots(self, ae_settings: bool = True):
         """Gets all snapshots from IP Fabric and returns a dictionary of {ID:   Snapshot_info}
 
+        Args:
+            ae_settings: Get the Assurance Engine settings of loaded snapshots
+
         Returns:
             Dictionary with ID as key and dictionary with info as the value
         """
-        payload = {"columns": snapshot_models.SNAPSHOT_COLUMNS, "sort": {"order": "desc", "column": "tsEnd"}}
-        if not self.unloaded:
-            logger.warning("Retrieving only loaded snapshots. To load all snapshots set `unloaded` to True.")
-            payload["filters"] = {"and": [{"status": ["eq", "done"]}, {"finishStatus": ["eq", "done"]}]}
-        results = self._ipf_pager("tables/management/snapshots", payload)
+        start = perf_counter()
+        results = self._ipf_pager("tables/management/snapshots", self._snapshots_payload())
+        self.snapshot_timings["tables/management/snapshots"] = perf_counter() - start
+        start = perf_counter()
         get_results = self._get_snapshots()
-
-        snap_dict = OrderedDict()
-        for s in results:
-            snap = self._create_snapshot_model(s, get_results)
-            snap_dict[snap.snapshot_id] = snap
-            if snap.loaded:
-                snap.get_assurance_engine_settings(self)
-                if LASTLOCKED_ID not in snap_dict and snap.locked:
-                    snap_dict[LASTLOCKED_ID] = snap
-                if LAST_ID not in snap_dict:
-                    snap_dict[LAST_ID] = snap
-                    continue
-                if PREV_ID not in snap_dict:
-                    snap_dict[PREV_ID] = snap
+        self.snapshot_timings["/snapshots"] = perf_counter() - start
+
+        snap_dict = self._build_snapshots(results, get_results)
+        # Results of snapshots which were unloaded or deleted are no longer valid
+        loaded = [s.snapshot_id for s in snap_dict.values() if s.loaded]
+        if self.table_cache:
+            self.table_cache.invalidate(self.base_url.host, keep=loaded)
+        self.count_cache.invalidate(self.base_url.host, keep=loaded)
+        if ae_settings:
+            self.hydrate_snapshots(snap_dict.values())
         return snap_dict
 
+    def invalidate_table_cache(self, snapshot_ids: Optional[List[str]] = None, endpoint: Optional[str] = None):
+        """Removes cached table results and counts of this server
+
+        Args:
+            snapshot_ids: Snapshot IDs to remove, defaults to all snapshots
+            endpoint: Only remove the results of this table
+        """
+        if self.table_cache:
+            self.table_cache.invalidate(self.base_url.host, snapshot_ids, endpoint=endpoint)
+        self.count_cache.invalidate(self.base_url.host, snapshot_ids, endpoint=endpoint)
+
+    def invalidate_result_cache(self, endpoint: Optional[str] = None):
+        """Removes cached results of `snapshot=False` tables, used after changing the data of a table
+
+        Args:
+            endpoint: Only remove the results of this table
+        """
+        if self.result_cache:
+            self.result_cache.invalidate(endpoint)
+
+    def _get_cached(self, url: str, payload: dict, snapshot: bool) -> Optional[list]:
+        """Returns the cached result of a query from the table or result cache or None"""
+        if not snapshot:
+            return self.result_cache.get(url, payload) if self.result_cache else None
+        cache_args = self._table_cache_args(url, payload, snapshot)
+        return self.table_cache.get(*cache_args) if cache_args else None
+
+    def _set_cached(self, url: str, payload: dict, snapshot: bool, data: list):
+        if not snapshot:
+            if self.result_cache:
+                self.result_cache.set(url, payload, data)
+            return
+        cache_args = self._table_cache_args(url, payload, snapshot)
+        if cache_args:
+            self.table_cache.set(*cache_args, data)
+
+    def _cached_snapshot_id(self, payload: dict, snapshot: bool) -> Optional[str]:
+        """Returns the ID of the loaded snapshot of a query or None if its results must not be cached"""
+        if not snapshot or not payload.get("snapshot"):
+            return None
+        snapshot_id = payload["snapshot"]
+        if self._snapshots is not None:
+            snap = self._snapshots.get(snapshot_id, None)
+            if not snap or not snap.loaded:
+                return None
+            snapshot_id = snap.snapshot_id
+        elif snapshot_id != self._snapshot_id and snapshot_id.startswith("$"):
+            return None
+        return snapshot_id
+
+    def _table_cache_args(self, url: str, payload: dict, snapshot: bool) -> Optional[tuple]:
+        """Returns the table cache arguments of a query or None if the query must not be cached"""
+        snapshot_id = self._cached_snapshot_id(payload, snapshot) if self.table_cache else None
+        if snapshot_id is None:
+            return None
+        query = {
+            k: v for k, v in payload.items() if k in ["columns", "filters", "attributeFilters", "sort", "pagination"]
+        }
+        return self.base_url.host, snapshot_id, url, query
+
+    def _count_cache_args(self, url: str, payload: dict, snapshot: bool) -> Optional[tuple]:
+        """Returns the count cache arguments of a count query or None if the count must not be cached"""
+        snapshot_id = self._cached_snapshot_id(payload, snapshot)
+        if snapshot_id is None:
+            return None
+        return self.base_url.host, snapshot_id, url, {k: payload.get(k) for k in ["filters", "attributeFilters"]}
+
+    @instrumented
+    def hydrate_snapshots(
+        self, snapshots: Optional[Iterable[snapshot_models.Snapshot]] = None, max_workers: Optional[int] = None
+    ) -> Dict[str, float]:
+        """Gets the Assurance Engine settings of the loaded snapshots concurrently and updates the Snapshot models
+
+        Args:
+            snapshots: Snapshots to update, defaults to all snapshots of the client
+            max_workers: Number of concurrent requests, defaults to the `max_workers` of the client
+
+        Returns:
+            dict: {snapshot_id: seconds} time taken by each `/snapshots/{id}/settings` request
+        """
+        snapshots = self.snapshots.values() if snapshots is None else snapshots
+        snapshots = list({s.snapshot_id: s for s in snapshots if s.loaded}.values())
+        if not snapshots:
+            return dict()
+
+        def hydrate(snapshot):
+            start = perf_counter()
+            snapshot.get_assurance_engine_settings(self)
+            return snapshot.snapshot_id, perf_counter() - start
+
+        start = perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+            timings = dict(executor.map(carry_context(hydrate), snapshots))
+        self.snapshot_timings.update({f"/snapshots/{k}/settings": v for k, v in timings.items()})
+        logger.debug(
+            f"Retrieved Assurance Engine settings of {len(timings)} snapshots in {perf_counter() - start:.3f}s "
+            f"(slowest request {max(timings.values()):.3f}s)."
+        )
+        return timings
+
+    def _fetch_page(self, url: str, payload: dict, start: int, limit: int, decoder=None, adaptive: bool = False):
+        """
+        Posts a page of `limit` rows starting at `start`.
+        If adaptive, the response time is recorded by the `page_sizer` and a page which times out or fails with a
+        server error is fetched again as smaller pages covering the same rows.
+        :return: dict: Decoded response
+        """
+        begin = perf_counter()
+        with self._page_scope(start, limit) as scope:
+            try:
+                r = self.post(url, json=dict(payload, pagination=dict(limit=limit, start=start)))
+                r.raise_for_status()
+            except (httpx.HTTPStatusError, httpx.TimeoutException) as err:
+                if not adaptive or not self.page_sizer.failed(url, payload.get("columns"), limit, err):
+                    raise
+                return self._split_page(url, payload, start, limit, decoder)
+            page = self._decode(r, decoder)
+            scope.rows = len(page["data"])
+        if adaptive:
+            latency, size = perf_counter() - begin, response_size(r)
+            self.page_sizer.record(url, payload.get("columns"), limit, len(page["data"]), latency, size)
+        return page
+
+    def _fetch_full_page(self, url: str, payload: dict, start: int, limit: int, decoder=None, adaptive: bool = False):
+        """
+        Posts a page of `limit` rows like `_fetch_page`. A server which caps the page size returns fewer rows before
+        the end of the table (`_meta.count`), the missing rows are then requested and the page size is limited.
+        A short page only ends the table if the response has no count.
+        :return: dict: Decoded response
+        """
+        page = self._fetch_page(url, payload, start, limit, decoder, adaptive)
+        rows, count = page["data"], page.get("_meta", dict()).get("count", None)
+        if count is None or not rows or len(rows) >= limit or start + len(rows) >= count:
+            return page
+        if adaptive:
+            self.page_sizer.capped(url, payload.get("columns"), len(rows))
+        while len(rows) < limit and start + len(rows) < count:
+            part = self._fetch_page(url, payload, start + len(rows), limit - len(rows), decoder, adaptive)
+            if not part["data"]:
+                break
+            rows.extend(part["data"])
+        return page
+
+    def _split_page(self, url: str, payload: dict, start: int, limit: int, decoder=None):
+        end, page, size = start + limit, None, self.page_sizer.limit(url, payload.get("columns"))
+        for s in range(start, end, size):
+            part = self._fetch_page(url, payload, s, min(size, end - s), decoder, adaptive=True)
+            if page is None:
+                page = part
+            else:
+                page["data"].extend(part["data"])
+            if len(part["data"]) != min(size, end - s):
+                break
+        return page
+
     def _ipf_pager(
         self,
         url: str,
         payload: dict,
-        limit: int = 1000,
+        limit: Optional[int] = None,
         start: int = 0,
+        parallel: bool = False,
+        decoder=None,
+        resume: bool = False,
     ):
         """
         Loops through and collects all the data from the tables
         :param url: str: Full URL to post to
         :param payload: dict: Data to submit to IP Fabric
+        :param limit: int: Page size, default is the client `page_size` or adapted per endpoint by the `page_sizer`
         :param start: int: Where to start for the data
+        :param parallel: bool: Fetch the pages concurrently using `max_workers` threads
+        :param decoder: Optional `page_decoder` to decode the rows into typed structs
+        :param resume: bool: Continue after the rows of a previous failed attempt of the same query
         :return: list: List of dictionaries
+        If a page of a query pinned to a snapshot ID fails the rows already received are kept in `checkpoints`.
         """
-        payload["pagination"] = dict(limit=limit)
-        data = list()
-
-        def page(s):
-            payload["pagination"]["start"] = s
-            r = self.post(url, json=payload)
-            r.raise_for_status()
-            return r.json()["data"]
-
-        r_data = page(start)
-        data.extend(r_data)
-        while limit == len(r_data):
-            start = start + limit
-            r_data = page(start)
-            data.extend(r_data)
-        return data
+        key = checkpoint_key(url, payload, start, decoder is not None)
+        checkpoint = self.checkpoints.pop(key, start, resume)
+        try:
+            if parallel:
+                for r_data in self._ipf_page_iter(url, payload, limit, checkpoint.start, True, decoder):
+                    checkpoint.data.extend(r_data)
+                    checkpoint.start += len(r_data)
+                return checkpoint.data
+            adaptive = not (limit or self.page_size)
+            while True:
+                size = self._page_size(url, payload, limit)
+                r_data = self._fetch_full_page(url, payload, checkpoint.start, size, decoder, adaptive)["data"]
+                checkpoint.data.extend(r_data)
+                checkpoint.start += len(r_data)
+                if size != len(r_data):
+                    return checkpoint.data
+        except Exception as err:
+            self.checkpoints.save(key, payload, checkpoint, err)
+            raise
+
+    def _ipf_page_iter(
+        self,
+        url: str,
+        payload: dict,
+        limit: Optional[int] = None,
+        start: int = 0,
+        parallel: bool = False,
+        decoder=None,
+    ) -> Iterator[list]:
+        """
+        Generator which yields the data from the tables one page at a time.
+        While a page is being consumed the next page (or `max_workers` pages if parallel) is fetched in the background.
+        The first page returns the total row count (`_meta.count`) which is used to schedule the following pages.
+        :param url: str: Full URL to post to
+        :param payload: dict: Data to submit to IP Fabric
+        :param limit: int: Page size, default is the client `page_size` or adapted per endpoint by the `page_sizer`
+        :param start: int: Where to start for the data
+        :param parallel: bool: Fetch up to `max_workers` pages concurrently instead of prefetching a single page
+        :param decoder: Optional `page_decoder` to decode the rows into typed structs
+        :return: Iterator[list]: Pages of dictionaries in the same order as the serial pager
+        """
+        adaptive = not (limit or self.page_size)
+
+        def page(s, size):
+            return self._fetch_full_page(url, payload, s, size, decoder, adaptive)["data"], size
+
+        size = self._page_size(url, payload, limit)
+        first = self._fetch_full_page(url, payload, start, size, decoder, adaptive)
+        r_data, count = first["data"], first.get("_meta", dict()).get("count", None)
+        window, next_start, pending = self.max_workers if parallel else 1, start + size, deque()
+        with ThreadPoolExecutor(max_workers=window) as executor:
+            try:
+                while True:
+                    if size == len(r_data):
+                        # Past the count (or without one) only request the next page, as the serial pager does
+                        while len(pending) < window and (not pending or (count is not None and next_start < count)):
+                            next_size = self._page_size(url, payload, limit)
+                            pending.append(executor.submit(carry_context(page), next_start, next_size))
+                            next_start += next_size
+                    if r_data:
+                        yield r_data
+                    if size != len(r_data):
+                        break
+                    r_data, size = pending.popleft().result()
+            finally:
+                [f.cancel() for f in pending]
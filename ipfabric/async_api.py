@@ -0,0 +1,485 @@
+import asyncio
+import logging
+from collections import deque
+from pathlib import Path
+from time import perf_counter
+from typing import Optional, Union, Dict, List, AsyncIterator, Any, Callable
+from urllib.parse import urljoin
+
+import httpx
+from httpx import AsyncClient
+
+from ipfabric import snapshot_models
+from ipfabric.api import IPFabricBase, LAST_ID, DEFAULT_WORKERS, _ssl_context
+from ipfabric.cache import ColumnCache
+from ipfabric.codec import get_codec
+from ipfabric.governor import AsyncGovernor
+from ipfabric.instrumentation import Instrumentation, RequestEvent
+from ipfabric.paging import PageSizer, response_size
+from ipfabric.retry import (
+    DEFAULT_RETRIES,
+    TRANSIENT_ERRORS,
+    Checkpoints,
+    RetryPolicy,
+    checkpoint_key,
+    get_retry_policy,
+)
+from ipfabric.settings.user_mgmt import User
+
+logger = logging.getLogger("ipfabric")
+
+
+class AsyncIPFabricAPI(IPFabricBase, AsyncClient):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_version: Optional[str] = None,
+        token: Optional[str] = None,
+        snapshot_id: Optional[str] = LAST_ID,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        unloaded: bool = False,
+        max_workers: int = DEFAULT_WORKERS,
+        cache_dir: Optional[Union[str, Path]] = None,
+        lazy_snapshots: bool = False,
+        json_codec: Optional[str] = None,
+        page_size: Optional[int] = None,
+        retries: Union[int, RetryPolicy] = DEFAULT_RETRIES,
+        rate_limit: Optional[float] = None,
+        host_limits: Optional[Dict[str, dict]] = None,
+        instrumentation: Optional[List[Callable[[RequestEvent], Any]]] = None,
+        fast_start: Union[bool, float] = False,
+        **kwargs: Optional[dict],
+    ):
+        """Initializes the asyncio IP Fabric Client, the connection is made by `await connect()` or `async with`
+
+        Args:
+            base_url: IP Fabric instance provided in 'base_url' parameter, or the 'IPF_URL' environment variable
+            api_version: Version of IP Fabric API
+            token: API token or 'IPF_TOKEN' environment variable
+            snapshot_id: IP Fabric snapshot ID to use by default for database actions - defaults to '$last'
+            username: username to authenticate against IP Fabric
+            password: password to authenticate against IP Fabric
+            unloaded: True to also retrieve unloaded snapshots
+            max_workers: Maximum number of concurrent requests made by the client
+            cache_dir: Optional directory to persist cached data like table columns
+            lazy_snapshots: Resolve the default snapshot with a single query on connect, the snapshots are loaded
+                            without their Assurance Engine settings by `await update()` or the first method needing
+                            them and the settings only when needed (e.g. by Intent checks)
+            json_codec: 'orjson', 'msgspec' or 'json' to encode payloads and decode tables, default is the fastest
+                        installed
+            page_size: Number of rows per page when fetching tables, default adapts the page size of each endpoint to
+                       the response times of the server
+            retries: Number of retries of idempotent requests (GET and table queries) failing with a timeout, a
+                     connection error or a 429/502/503/504 status, or a RetryPolicy; 0 disables retries
+            rate_limit: Optional maximum number of requests per second to a server, the number of concurrent requests
+                        is limited to `max_workers` and reduced while the server answers 429/503 or times out
+            host_limits: Optional {host: dict(max_concurrency=int, rate=float)} overriding the limits of a server
+            instrumentation: Optional hooks called with a RequestEvent after every request, like
+                             `ipfabric.instrumentation.LatencyStats()`; nothing is measured without hooks
+            fast_start: Reuse the versions, user and snapshots of a previous client of the same server and credentials
+                        saved in `cache_dir` (or `~/.cache/ipfabric`), True for 5 minutes or the TTL in seconds;
+                        the token is then only validated by the first request
+            **kwargs: Keyword args to pass to httpx
+        """
+        self.codec = get_codec(json_codec)
+        self.page_size = page_size
+        self.page_sizer = PageSizer()
+        self.retry = get_retry_policy(retries)
+        self.checkpoints = Checkpoints()
+        self.governor = AsyncGovernor(max_workers, rate_limit, host_limits)
+        self.instrumentation = Instrumentation(instrumentation)
+        self.unloaded = unloaded
+        self.max_workers = max_workers
+        self.lazy_snapshots = lazy_snapshots
+        self.column_cache = ColumnCache(cache_dir)
+        self.handshake_cache = self._handshake_cache(cache_dir, fast_start)
+        self._handshake = None
+        self._settings = self._load_settings(base_url, api_version, token, username, password)
+        super().__init__(
+            timeout=kwargs.get("timeout", True),
+            verify=_ssl_context(kwargs.get("verify", self._settings.ipf_verify)),
+        )
+        self._initial_snapshot_id = snapshot_id
+        self._attribute_filters = None
+        self._snapshot_id = None
+        self.api_version, self.os_version, self.user = None, None, None
+        self._snapshots = None
+
+    async def connect(self):
+        """Checks the version, validates the user and loads the snapshots (unless `lazy_snapshots`)"""
+        settings = self._settings
+        if not self._cached_handshake(settings):
+            self.api_version, self.os_version = await self.check_version(
+                settings.ipf_version, settings.ipf_url, settings.ipf_dev
+            )
+            self.base_url = self._api_url(settings)
+            self.auth = self._authentication(settings)
+            # Get Current User, by doing that we are also ensuring the token is valid
+            self.user = await self.get_user()
+            if not self.lazy_snapshots:
+                self.snapshots = await self.get_snapshots()
+            self._save_handshake(self._snapshots)
+        if self._snapshots is None:
+            self._snapshot_id = await self._resolve_snapshot_id(self._initial_snapshot_id or LAST_ID)
+        else:
+            self.snapshot_id = self._initial_snapshot_id
+        logger.debug(
+            f"Successfully connected to '{self.base_url.host}' IPF version '{self.os_version}' "
+            f"as user '{self.user.username}'"
+        )
+        return self
+
+    async def __aenter__(self):
+        await super().__aenter__()
+        return await self.connect()
+
+    async def _send(self, method: str, url: Union[httpx.URL, str], **kwargs) -> httpx.Response:
+        """Sends a single request once the `governor` allows it"""
+        host = self._host(url)
+        await self.governor.acquire(host)
+        response, overloaded = None, False
+        try:
+            response = await super().request(method, url, **kwargs)
+            return self._check_handshake(response)
+        except httpx.TimeoutException:
+            overloaded = True
+            raise
+        finally:
+            await self.governor.release(host, response, overloaded)
+
+    async def request(self, method: str, url: Union[httpx.URL, str], **kwargs) -> httpx.Response:
+        """Sends a request, idempotent requests are retried on transient errors following the `retry` policy"""
+        instrumentation = getattr(self, "instrumentation", None)
+        if not instrumentation:
+            return await self._retry(method, url, None, **kwargs)
+        event = instrumentation.start(method, url)
+        try:
+            response = await self._retry(method, url, event, **kwargs)
+        except Exception as err:
+            instrumentation.finish(event, error=err)
+            raise
+        instrumentation.finish(event, response)
+        return response
+
+    async def _retry(
+        self, method: str, url: Union[httpx.URL, str], event: Optional[RequestEvent], **kwargs
+    ) -> httpx.Response:
+        retry, attempt = getattr(self, "retry", None), 0
+        if not retry or not retry.idempotent(method, url):
+            return await self._send(method, url, **kwargs)
+        while True:
+            try:
+                response = await self._send(method, url, **kwargs)
+            except TRANSIENT_ERRORS as err:
+                if not retry.retry_error(attempt, err):
+                    raise
+                response, reason = None, repr(err)
+            else:
+                if not retry.retry_response(attempt, response):
+                    return response
+                reason = f"status {response.status_code}"
+            delay = retry.delay(attempt, response)
+            logger.warning(f"{method} {url} failed ({reason}), retry {attempt + 1}/{retry.retries} in {delay:.1f}s.")
+            await asyncio.sleep(delay)
+            attempt += 1
+            if event is not None:
+                event.retries = attempt
+
+    @staticmethod
+    async def gather(*aws, limit: Optional[int] = None, return_exceptions: bool = False) -> list:
+        """asyncio.gather for many tables or snapshots, requests are always limited to `max_workers` at a time
+
+        Examples:
+            >>> async with AsyncIPFClient() as ipf:
+            >>>     devices, sites = await ipf.gather(ipf.inventory.devices.all(), ipf.inventory.sites.all())
+
+        Args:
+            *aws: Coroutines like `fetch_all` or `Table.all`
+            limit: Optional maximum number of coroutines running at the same time
+            return_exceptions: Return exceptions instead of raising the first one
+
+        Returns:
+            list: Results in the same order as the coroutines
+        """
+        if limit:
+            semaphore = asyncio.Semaphore(limit)
+
+            async def bounded(aw):
+                async with semaphore:
+                    return await aw
+
+            aws = [bounded(aw) for aw in aws]
+        return await asyncio.gather(*aws, return_exceptions=return_exceptions)
+
+    async def get_user(self) -> User:
+        """Gets current logged in user information.
+
+        Returns:
+            User: User model of logged in user
+        """
+        resp = await self.get("users/me")
+        resp.raise_for_status()
+        return User(**resp.json())
+
+    async def check_version(self, api_version: str = None, base_url: str = None, dev: bool = False) -> tuple:
+        """Checks API Version and returns the version to use in the URL and the OS Version
+
+        Args:
+            api_version: User defined API Version or None
+            base_url: URL of IP Fabric
+            dev: Internal Use Only
+
+        Returns:
+            api_version, os_version
+        """
+        api_version = self._sdk_version(api_version)
+        resp = await self.get(urljoin(base_url, "api/version" if not dev else "version"))
+        resp.raise_for_status()
+        api_version, os_version = self._compare_versions(api_version, resp.json())
+        self._invalidate_columns(base_url, os_version)
+        return api_version, os_version
+
+    @property
+    def snapshots(self) -> dict:
+        """Dictionary of {ID: Snapshot}, with `lazy_snapshots` they are loaded by `await update()`"""
+        if self._snapshots is None:
+            raise RuntimeError("Snapshots are not loaded (lazy_snapshots), use 'await update()' to load them.")
+        return self._snapshots
+
+    @snapshots.setter
+    def snapshots(self, snapshots: dict):
+        self._snapshots = snapshots
+
+    @IPFabricBase.snapshot_id.setter
+    def snapshot_id(self, snapshot_id):
+        if self._snapshots is None:
+            raise RuntimeError("Snapshots are not loaded (lazy_snapshots), use 'await update()' before setting one.")
+        IPFabricBase.snapshot_id.fset(self, snapshot_id)
+
+    async def _resolve_snapshot_id(self, snapshot_id: str) -> Optional[str]:
+        """Finds the ID of a snapshot or reference ($last, $prev, $lastLocked) without loading all snapshots"""
+        res = await self.post("tables/management/snapshots", json=self._resolve_snapshot_payload(snapshot_id))
+        res.raise_for_status()
+        data = res.json()["data"]
+        if data:
+            return data[0]["id"]
+        elif snapshot_id == LAST_ID:
+            logger.warning("No Snapshots are currently loaded.  Please load a snapshot before querying any data.")
+            return None
+        raise ValueError(f"Incorrect Snapshot ID: '{snapshot_id}'")
+
+    async def update(self):
+        """get all snapshots and assigns them to an attribute"""
+        self.snapshots = await self.get_snapshots(ae_settings=not self.lazy_snapshots)
+        self._save_handshake(self._snapshots)
+
+    async def get_unloaded_snapshots(self) -> dict:
+        if not self.unloaded:
+            logger.warning("Unloaded snapshots not initialized. Retrieving unloaded snapshots.")
+            self.unloaded = True
+            await self.update()
+        elif self._snapshots is None:
+            await self.update()
+        return {k: v for k, v in self.snapshots.items() if not v.loaded}
+
+    async def get_snapshot(self, snapshot_id: str):
+        if self._snapshots is None:
+            await self.update()
+        if snapshot_id in self.snapshots:
+            return self.snapshots[snapshot_id]
+        payload = {"columns": snapshot_models.SNAPSHOT_COLUMNS, "filters": {"id": ["eq", snapshot_id]}}
+        results = await self._ipf_pager("tables/management/snapshots", payload)
+        if not results:
+            logger.error(f"Snapshot {snapshot_id} not found.")
+            return None
+        snapshot = self._create_snapshot_model(results[0], await self._get_snapshots())
+        if snapshot.loaded:
+            await self.get_assurance_engine_settings(snapshot)
+        return snapshot
+
+    async def _get_snapshots(self):
+        """
+        Need to do a GET and POST to get all Snapshot data. See NIM-7223
+        """
+        res = await self.get("/snapshots")
+        res.raise_for_status()
+        return {s["id"]: s for s in res.json()}
+
+    async def get_assurance_engine_settings(self, snapshot: snapshot_models.Snapshot) -> Optional[dict]:
+        """Asyncio version of `Snapshot.get_assurance_engine_settings`
+
+        Args:
+            snapshot: Snapshot model to update
+
+        Returns:
+            dict: Assurance Engine settings or None if the user does not have access
+        """
+        res = await self.get(f"/snapshots/{snapshot.snapshot_id}/settings")
+        try:
+            res.raise_for_status()
+        except httpx.HTTPError:
+            logger.warning(
+                "User/Token does not have access to `snapshots/:key/settings`; "
+                "cannot get status of Assurance Engine tasks."
+            )
+            logger.error(f"Could not get Snapshot {snapshot.snapshot_id} Settings to verify Assurance Engine tasks.")
+            return None
+        return snapshot._set_assurance_engine_settings(res.json())
+
+    async def get_snapshots(self, ae_settings: bool = True):
+        """Gets all snapshots from IP Fabric and returns a dictionary of {ID:   Snapshot_info}
+
+        Args:
+            ae_settings: Get the Assurance Engine settings of loaded snapshots
+
+        Returns:
+            Dictionary with ID as key and dictionary with info as the value
+        """
+        results, get_results = await asyncio.gather(
+            self._ipf_pager("tables/management/snapshots", self._snapshots_payload()), self._get_snapshots()
+        )
+        snap_dict = self._build_snapshots(results, get_results)
+        await asyncio.gather(
+            *[
+                self.get_assurance_engine_settings(snap)
+                for snap_id, snap in snap_dict.items()
+                if ae_settings and snap_id == snap.snapshot_id and snap.loaded
+            ]
+        )
+        return snap_dict
+
+    async def _fetch_page(self, url: str, payload: dict, start: int, limit: int, decoder=None, adaptive: bool = False):
+        """
+        Posts a page of `limit` rows starting at `start`.
+        If adaptive, the response time is recorded by the `page_sizer` and a page which times out or fails with a
+        server error is fetched again as smaller pages covering the same rows.
+        :return: dict: Decoded response
+        """
+        begin = perf_counter()
+        with self._page_scope(start, limit) as scope:
+            try:
+                r = await self.post(url, json=dict(payload, pagination=dict(limit=limit, start=start)))
+                r.raise_for_status()
+            except (httpx.HTTPStatusError, httpx.TimeoutException) as err:
+                if not adaptive or not self.page_sizer.failed(url, payload.get("columns"), limit, err):
+                    raise
+                return await self._split_page(url, payload, start, limit, decoder)
+            page = self._decode(r, decoder)
+            scope.rows = len(page["data"])
+        if adaptive:
+            latency, size = perf_counter() - begin, response_size(r)
+            self.page_sizer.record(url, payload.get("columns"), limit, len(page["data"]), latency, size)
+        return page
+
+    async def _fetch_full_page(
+        self, url: str, payload: dict, start: int, limit: int, decoder=None, adaptive: bool = False
+    ):
+        """
+        Posts a page of `limit` rows like `_fetch_page`. A server which caps the page size returns fewer rows before
+        the end of the table (`_meta.count`), the missing rows are then requested and the page size is limited.
+        A short page only ends the table if the response has no count.
+        :return: dict: Decoded response
+        """
+        page = await self._fetch_page(url, payload, start, limit, decoder, adaptive)
+        rows, count = page["data"], page.get("_meta", dict()).get("count", None)
+        if count is None or not rows or len(rows) >= limit or start + len(rows) >= count:
+            return page
+        if adaptive:
+            self.page_sizer.capped(url, payload.get("columns"), len(rows))
+        while len(rows) < limit and start + len(rows) < count:
+            part = await self._fetch_page(url, payload, start + len(rows), limit - len(rows), decoder, adaptive)
+            if not part["data"]:
+                break
+            rows.extend(part["data"])
+        return page
+
+    async def _split_page(self, url: str, payload: dict, start: int, limit: int, decoder=None):
+        end, page, size = start + limit, None, self.page_sizer.limit(url, payload.get("columns"))
+        for s in range(start, end, size):
+            part = await self._fetch_page(url, payload, s, min(size, end - s), decoder, adaptive=True)
+            if page is None:
+                page = part
+            else:
+                page["data"].extend(part["data"])
+            if len(part["data"]) != min(size, end - s):
+                break
+        return page
+
+    async def _ipf_pager(
+        self,
+        url: str,
+        payload: dict,
+        limit: Optional[int] = None,
+        start: int = 0,
+        parallel: bool = False,
+        decoder=None,
+        resume: bool = False,
+    ):
+        """
+        Loops through and collects all the data from the tables
+        :param url: str: Full URL to post to
+        :param payload: dict: Data to submit to IP Fabric
+        :param limit: int: Page size, default is the client `page_size` or adapted per endpoint by the `page_sizer`
+        :param start: int: Where to start for the data
+        :param parallel: bool: Request all pages concurrently once the row count is known
+        :param decoder: Optional `page_decoder` to decode the rows into typed structs
+        :param resume: bool: Continue after the rows of a previous failed attempt of the same query
+        :return: list: List of dictionaries
+        If a page of a query pinned to a snapshot ID fails the rows already received are kept in `checkpoints`.
+        """
+        key = checkpoint_key(url, payload, start, decoder is not None)
+        checkpoint = self.checkpoints.pop(key, start, resume)
+        try:
+            async for r_data in self._ipf_page_iter(url, payload, limit, checkpoint.start, parallel, decoder):
+                checkpoint.data.extend(r_data)
+                checkpoint.start += len(r_data)
+            return checkpoint.data
+        except Exception as err:
+            self.checkpoints.save(key, payload, checkpoint, err)
+            raise
+
+    async def _ipf_page_iter(
+        self,
+        url: str,
+        payload: dict,
+        limit: Optional[int] = None,
+        start: int = 0,
+        parallel: bool = False,
+        decoder=None,
+    ) -> AsyncIterator[list]:
+        """
+        Asynchronous generator which yields the data from the tables one page at a time.
+        While a page is being consumed the next page (or `max_workers` pages if parallel) is already requested.
+        :param url: str: Full URL to post to
+        :param payload: dict: Data to submit to IP Fabric
+        :param limit: int: Page size, default is the client `page_size` or adapted per endpoint by the `page_sizer`
+        :param start: int: Where to start for the data
+        :param parallel: bool: Request up to `max_workers` pages concurrently instead of prefetching a single page
+        :param decoder: Optional `page_decoder` to decode the rows into typed structs
+        :return: AsyncIterator[list]: Pages of dictionaries in the same order as the serial pager
+        """
+        adaptive = not (limit or self.page_size)
+
+        async def page(s, size):
+            return (await self._fetch_full_page(url, payload, s, size, decoder, adaptive))["data"], size
+
+        size = self._page_size(url, payload, limit)
+        first = await self._fetch_full_page(url, payload, start, size, decoder, adaptive)
+        r_data, count = first["data"], first.get("_meta", dict()).get("count", None)
+        window, next_start, pending = self.max_workers if parallel else 1, start + size, deque()
+        try:
+            while True:
+                if size == len(r_data):
+                    # Past the count (or without one) only request the next page, as the serial pager does
+                    while len(pending) < window and (not pending or (count is not None and next_start < count)):
+                        next_size = self._page_size(url, payload, limit)
+                        pending.append(asyncio.ensure_future(page(next_start, next_size)))
+                        next_start += next_size
+                if r_data:
+                    yield r_data
+                if size != len(r_data):
+                    break
+                r_data, size = await pending.popleft()
+        finally:
+            [f.cancel() for f in pending]
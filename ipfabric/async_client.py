@@ -0,0 +1,381 @@
+import asyncio
+import logging
+from json import loads
+from pathlib import Path
+from typing import Optional, Union, Dict, List, AsyncIterator, Any, Callable
+
+import httpx
+
+from ipfabric.api import DEFAULT_WORKERS
+from ipfabric.async_api import AsyncIPFabricAPI
+from ipfabric.client import check_format, DEFAULT_ID
+from ipfabric.columnar import ColumnarBuilder, check_output
+from ipfabric.instrumentation import RequestEvent, instrumented
+from ipfabric.intent import AsyncIntent
+from ipfabric.retry import DEFAULT_RETRIES, RetryPolicy
+from ipfabric.models import Technology, Inventory, Jobs, Table
+
+logger = logging.getLogger("ipfabric")
+
+
+class AsyncIPFClient(AsyncIPFabricAPI):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_version: Optional[str] = None,
+        token: Optional[str] = None,
+        snapshot_id: str = DEFAULT_ID,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        unloaded: bool = False,
+        max_workers: int = DEFAULT_WORKERS,
+        cache_dir: Optional[Union[str, Path]] = None,
+        lazy_snapshots: bool = False,
+        json_codec: Optional[str] = None,
+        page_size: Optional[int] = None,
+        retries: Union[int, RetryPolicy] = DEFAULT_RETRIES,
+        rate_limit: Optional[float] = None,
+        host_limits: Optional[Dict[str, dict]] = None,
+        instrumentation: Optional[List[Callable[[RequestEvent], Any]]] = None,
+        fast_start: Union[bool, float] = False,
+        **kwargs: Optional[dict],
+    ):
+        """Initializes the asyncio IP Fabric Client
+
+        Examples:
+            >>> async with AsyncIPFClient() as ipf:
+            >>>     devices = await ipf.inventory.devices.all()
+
+        The Inventory and Technology Tables return coroutines for `all`, `fetch` and `count` and an asynchronous
+        iterator for `iter`; `Table.compare` and the Snapshot model actions require the synchronous IPFClient.
+
+        Args:
+            base_url: IP Fabric instance provided in 'base_url' parameter, or the 'IPF_URL' environment variable
+            api_version: Version of IP Fabric API
+            token: API token or 'IPF_TOKEN' environment variable
+            snapshot_id: IP Fabric snapshot ID to use by default for database actions - defaults to '$last'
+            username: username to authenticate against IP Fabric
+            password: password to authenticate against IP Fabric
+            unloaded: True to also retrieve unloaded snapshots
+            max_workers: Maximum number of concurrent requests made by the client
+            cache_dir: Optional directory to persist cached data like table columns
+            lazy_snapshots: Resolve the default snapshot with a single query on connect, the snapshots are loaded
+                            without their Assurance Engine settings by `await update()` or the first method needing
+                            them and the settings only when needed (e.g. by Intent checks)
+            json_codec: 'orjson', 'msgspec' or 'json' to encode payloads and decode tables, default is the fastest
+                        installed
+            page_size: Number of rows per page when fetching tables, default adapts the page size of each endpoint to
+                       the response times of the server
+            retries: Number of retries of idempotent requests (GET and table queries) failing with a timeout, a
+                     connection error or a 429/502/503/504 status, or a RetryPolicy; 0 disables retries
+            rate_limit: Optional maximum number of requests per second to a server, the number of concurrent requests
+                        is limited to `max_workers` and reduced while the server answers 429/503 or times out
+            host_limits: Optional {host: dict(max_concurrency=int, rate=float)} overriding the limits of a server
+            instrumentation: Optional hooks called with a RequestEvent after every request, like
+                             `ipfabric.instrumentation.LatencyStats()`; nothing is measured without hooks
+            fast_start: Reuse the versions, user and snapshots of a previous client of the same server and credentials
+                        saved in `cache_dir` (or `~/.cache/ipfabric`), True for 5 minutes or the TTL in seconds;
+                        the token is then only validated by the first request
+            **kwargs: Keyword args to pass to httpx
+        """
+        super().__init__(
+            base_url,
+            api_version,
+            token,
+            snapshot_id,
+            username,
+            password,
+            unloaded,
+            max_workers,
+            cache_dir,
+            lazy_snapshots,
+            json_codec,
+            page_size,
+            retries,
+            rate_limit,
+            host_limits,
+            instrumentation,
+            fast_start,
+            **kwargs,
+        )
+        self.inventory = Inventory(client=self)
+        self.intent = AsyncIntent(client=self)
+        self.technology = Technology(client=self)
+        self.jobs = Jobs(client=self)
+
+    async def connect(self):
+        await super().connect()
+        self.intent.snapshot_id = self.snapshot_id
+        return self
+
+    @check_format
+    @instrumented
+    async def fetch(
+        self,
+        url,
+        columns: Optional[List] = None,
+        filters: Optional[Union[dict, str]] = None,
+        limit: Optional[int] = 1000,
+        start: Optional[int] = 0,
+        snapshot_id: Optional[str] = None,
+        reports: Optional[str] = None,
+        sort: Optional[dict] = None,
+        attr_filters: Optional[Dict[str, List[str]]] = None,
+        snapshot: bool = True,
+    ) -> List:
+        """Gets data from IP Fabric for specified endpoint
+
+        Args:
+            url: Example tables/vlan/device-summary
+            columns: Optional list of columns to return, None will return all
+            filters: Optional dictionary of filters
+            limit: Default to 1,000 rows
+            start: Starts at 0
+            snapshot_id: Optional snapshot_id to override default
+            reports: String of frontend URL where the reports are displayed
+            sort: Dictionary to apply sorting: {"order": "desc", "column": "lastChange"}
+            attr_filters: Optional dictionary to apply an Attribute filter
+            snapshot: Set to False for some tables like management endpoints.
+
+        Returns:
+            list: List of Dictionary objects.
+        """
+        payload = dict(
+            columns=columns or await self.get_columns(url),
+            pagination=dict(start=start, limit=limit),
+            snapshot=snapshot_id or self.snapshot_id,
+        )
+        payload = self._check_payload(payload, snapshot, filters, reports, sort, attr_filters)
+        res = await self.post(url, json=payload)
+        res.raise_for_status()
+        return self._decode(res)["data"]
+
+    @check_format
+    @instrumented
+    async def fetch_all(
+        self,
+        url: str,
+        columns: Optional[List] = None,
+        filters: Optional[Union[dict, str]] = None,
+        snapshot_id: Optional[str] = None,
+        reports: Optional[str] = None,
+        sort: Optional[dict] = None,
+        attr_filters: Optional[Dict[str, List[str]]] = None,
+        snapshot: bool = True,
+        parallel: bool = False,
+        output: Optional[str] = None,
+        structs: bool = False,
+        resume: bool = False,
+    ) -> List:
+        """Gets all data from IP Fabric for specified endpoint
+
+        Args:
+            url: Example tables/vlan/device-summary
+            columns: Optional list of columns to return, None will return all
+            filters: Optional dictionary of filters
+            snapshot_id: Optional snapshot_id to override default
+            reports: String of frontend URL where the reports are displayed
+            sort: Optional dictionary to apply sorting: {"order": "desc", "column": "lastChange"}
+            attr_filters: Optional dictionary to apply an Attribute filter
+            snapshot: Set to False for some tables like management endpoints.
+            parallel: Request the pages concurrently instead of one after another.
+            output: Optional 'arrow', 'pandas' or 'numpy' to build columns page by page instead of a list of rows.
+            structs: Decode the rows directly into msgspec Structs instead of dictionaries, requires msgspec.
+            resume: Continue after the rows received by a failed attempt of the same query (pinned to a snapshot
+                    ID) instead of fetching them again, see `checkpoints`.
+
+        Returns:
+            list: List of Dictionary objects or pyarrow.Table, pandas.DataFrame or {column: numpy.ndarray} if output.
+        """
+        payload = dict(columns=columns or await self.get_columns(url), snapshot=snapshot_id or self.snapshot_id)
+        payload = self._check_payload(payload, snapshot, filters, reports, sort, attr_filters)
+        if structs:
+            decoder = self._struct_decoder(url, payload)
+            return await self._ipf_pager(url, payload, parallel=parallel, decoder=decoder, resume=resume)
+        if output:
+            check_output(output)
+            builder = ColumnarBuilder(payload["columns"])
+            async for page in self._ipf_page_iter(url, payload, parallel=parallel):
+                builder.add_page(page)
+            return builder.build(output)
+        return await self._ipf_pager(url, payload, parallel=parallel, resume=resume)
+
+    @check_format
+    @instrumented
+    async def iter_all(
+        self,
+        url: str,
+        columns: Optional[List] = None,
+        filters: Optional[Union[dict, str]] = None,
+        snapshot_id: Optional[str] = None,
+        reports: Optional[str] = None,
+        sort: Optional[dict] = None,
+        attr_filters: Optional[Dict[str, List[str]]] = None,
+        snapshot: bool = True,
+        parallel: bool = False,
+        pages: bool = False,
+    ) -> AsyncIterator:
+        """Streams all data from IP Fabric for specified endpoint, the next page is requested while the current is used
+
+        Args:
+            url: Example tables/vlan/device-summary
+            columns: Optional list of columns to return, None will return all
+            filters: Optional dictionary of filters
+            snapshot_id: Optional snapshot_id to override default
+            reports: String of frontend URL where the reports are displayed
+            sort: Optional dictionary to apply sorting: {"order": "desc", "column": "lastChange"}
+            attr_filters: Optional dictionary to apply an Attribute filter
+            snapshot: Set to False for some tables like management endpoints.
+            parallel: Prefetch up to `max_workers` pages concurrently instead of a single page.
+            pages: Yield a list of rows per page instead of single rows.
+
+        Returns:
+            AsyncIterator: Dictionary objects or lists of Dictionary objects if pages is True.
+        """
+        payload = dict(columns=columns or await self.get_columns(url), snapshot=snapshot_id or self.snapshot_id)
+        payload = self._check_payload(payload, snapshot, filters, reports, sort, attr_filters)
+        async for page in self._ipf_page_iter(url, payload, parallel=parallel):
+            if pages:
+                yield page
+            else:
+                for row in page:
+                    yield row
+
+    @check_format
+    @instrumented
+    async def query(
+        self, url: str, payload: Union[str, dict], get_all: bool = True, parallel: bool = False, resume: bool = False
+    ) -> list:
+        """Submits a query, does no formatting on the parameters.  Use for copy/pasting from the webpage.
+
+        Args:
+            url: Example: https://demo1.ipfabric.io/api/v1/tables/vlan/device-summary or tables/vlan/device-summary
+            payload: Dictionary to submit in POST or can be JSON string (i.e. read from file).
+            get_all: Default use pager to get all results and ignore pagination information in the payload
+            parallel: Request the pages concurrently instead of one after another, only used with get_all
+            resume: Continue after the rows received by a failed attempt of the same query, only used with get_all
+
+        Returns:
+            list: List of Dictionary objects.
+        """
+        if isinstance(payload, str):
+            payload = loads(payload)
+        if get_all:
+            return await self._ipf_pager(url, payload, parallel=parallel, resume=resume)
+        else:
+            res = await self.post(url, json=payload)
+            res.raise_for_status()
+            return self._decode(res)["data"]
+
+    @instrumented
+    async def get_columns(self, url: str, cache: bool = True):
+        """Submits malformed payload and extracts column names from it, results are cached per IP Fabric version
+
+        Args:
+            url: API url to post
+            cache: Set to False to ignore the cached columns
+
+        Returns:
+            list: List of column names
+        """
+        columns = self._cached_columns(url) if cache else None
+        if columns is None:
+            r = await self.post(url, json=dict(snapshot=self.snapshot_id, columns=["*"]))
+            columns = self._parse_columns(r)
+            self._cache_columns(url, columns)
+        return columns
+
+    @instrumented
+    async def warm_column_cache(self, endpoints: Optional[List[str]] = None) -> Dict[str, List[str]]:
+        """Discovers the columns of many endpoints concurrently and stores them in the column cache
+
+        Args:
+            endpoints: Endpoints to discover, defaults to every Inventory and Technology Table
+
+        Returns:
+            dict: {endpoint: columns} for all endpoints which are available on this IP Fabric version
+        """
+        if endpoints is None:
+            endpoints = [t.endpoint for t in self.inventory.all_tables() + self.technology.all_tables()]
+        endpoints = list(dict.fromkeys(e.strip("/") for e in endpoints))
+
+        async def discover(url):
+            columns = self._cached_columns(url)
+            if columns is None:
+                try:
+                    r = await self.post(url, json=dict(snapshot=self.snapshot_id, columns=["*"]))
+                    columns = self._parse_columns(r)
+                except httpx.HTTPError as err:
+                    logger.warning(f"Could not get columns for '{url}': {err}")
+                    return None
+                self._cache_columns(url, columns, save=False)
+            return columns
+
+        results = dict(zip(endpoints, await asyncio.gather(*[discover(e) for e in endpoints])))
+        self.column_cache.save()
+        return {k: v for k, v in results.items() if v is not None}
+
+    @instrumented
+    async def get_count(
+        self,
+        url: str,
+        filters: Optional[Union[dict, str]] = None,
+        attr_filters: Optional[Dict[str, List[str]]] = None,
+        snapshot_id: Optional[str] = None,
+        snapshot: bool = True,
+    ) -> int:
+        """Get a total number of rows
+        Args:
+            url: Full URL to post to
+            filters: Optional dictionary of filters
+            attr_filters: Optional dictionary of attribute filters
+            snapshot_id: Optional snapshot_id to override default
+            snapshot: Set to False for some tables like management endpoints.
+        Returns:
+            int: a count of rows
+        """
+        payload = dict(columns=["id"], pagination=dict(limit=1, start=0), snapshot=snapshot_id or self.snapshot_id)
+        payload = self._check_payload(payload, snapshot, filters, None, None, attr_filters)
+        res = await self.post(url, json=payload)
+        res.raise_for_status()
+        return self._decode(res)["_meta"]["count"]
+
+    @instrumented
+    async def get_counts(
+        self,
+        tables: Optional[List[Union[Table, str]]] = None,
+        filters: Optional[Dict[str, Union[dict, str]]] = None,
+        attr_filters: Optional[Dict[str, Dict[str, List[str]]]] = None,
+        snapshot_id: Optional[str] = None,
+    ) -> Dict[str, Optional[int]]:
+        """Gets the total number of rows of many tables concurrently
+
+        Args:
+            tables: Table models or endpoints, defaults to every Inventory and Technology Table
+            filters: Optional {endpoint: filters}
+            attr_filters: Optional {endpoint: attribute filters}, tables without use the client attribute filters
+            snapshot_id: Optional snapshot_id to override default
+
+        Returns:
+            dict: {endpoint: count}, None for tables which could not be counted
+        """
+        if tables is None:
+            tables = self.inventory.all_tables() + self.technology.all_tables()
+        filters, attr_filters, queries = filters or dict(), attr_filters or dict(), dict()
+        for table in tables:
+            endpoint, snapshot = (table, True) if isinstance(table, str) else (table.endpoint, table.snapshot)
+            queries[endpoint.strip("/")] = snapshot
+
+        async def count(endpoint):
+            table_filters = filters.get(endpoint, None)
+            if isinstance(table_filters, str):
+                table_filters = loads(table_filters)
+            try:
+                return await self.get_count(
+                    endpoint, table_filters, attr_filters.get(endpoint, None), snapshot_id, queries[endpoint]
+                )
+            except httpx.HTTPError as err:
+                logger.warning(f"Could not get the count of '{endpoint}': {err}")
+                return None
+
+        return dict(zip(queries, await asyncio.gather(*[count(e) for e in queries])))
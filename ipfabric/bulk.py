@@ -0,0 +1,257 @@
+import logging
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from time import perf_counter
+from json import loads
+from typing import Optional, Any, Callable, Dict, List, Union, Iterable
+
+from ipfabric.instrumentation import carry_context
+
+logger = logging.getLogger("ipfabric")
+
+
+class TableReport:
+    """Timing and row count of one table of `fetch_many`, timed from when its first task starts running"""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.rows = 0
+        self.pages = 0
+        self.requests = 0
+        self.seconds: Optional[float] = None
+        self.cached = False
+        self.error: Optional[Exception] = None
+        self._start: Optional[float] = None
+
+    def start(self):
+        if self._start is None:
+            self._start = perf_counter()
+
+    def done(self, error: Optional[Exception] = None):
+        self.start()
+        self.seconds, self.error = perf_counter() - self._start, error
+
+    def dict(self) -> dict:
+        return dict(
+            endpoint=self.endpoint,
+            rows=self.rows,
+            pages=self.pages,
+            requests=self.requests,
+            seconds=self.seconds,
+            cached=self.cached,
+            error=repr(self.error) if self.error else None,
+        )
+
+    def __repr__(self):
+        return f"TableReport({self.endpoint!r}, rows={self.rows}, pages={self.pages}, seconds={self.seconds})"
+
+
+class BulkResult:
+    """Results of `fetch_many`: `data` is {endpoint: rows} (empty for tables sent to a sink) and `report`"""
+
+    def __init__(self):
+        self.data: Dict[str, list] = OrderedDict()
+        self.report: Dict[str, TableReport] = OrderedDict()
+
+    @property
+    def errors(self) -> Dict[str, Exception]:
+        return {k: r.error for k, r in self.report.items() if r.error is not None}
+
+    @property
+    def seconds(self) -> float:
+        return max([r.seconds or 0 for r in self.report.values()] or [0])
+
+    def summary(self) -> List[dict]:
+        return [r.dict() for r in self.report.values()]
+
+
+class _BulkTable:
+    def __init__(self, endpoint: str, payload: dict, snapshot: bool, report: TableReport):
+        self.endpoint, self.payload, self.snapshot, self.report = endpoint, payload, snapshot, report
+        self.size: Optional[int] = None
+        self.next_start = 0
+        self.pages: Dict[int, list] = dict()
+        self.flushed = 0
+        self.last: Optional[int] = None
+        self.rows: List[Any] = list()
+        self.finished = False
+
+    def finish(self, error: Optional[Exception] = None):
+        self.finished = True
+        self.pages.clear()
+        self.report.done(error)
+
+
+class BulkFetcher:
+    """
+    Fetches many tables on one pool of `max_workers` threads; the column discovery and the pages of all tables are
+    single tasks scheduled round robin between the tables so no table waits for another to finish.
+    """
+
+    def __init__(self, client, max_workers: Optional[int] = None):
+        self.client = client
+        self.max_workers = max_workers or client.max_workers
+
+    def run(
+        self,
+        tables: List[_BulkTable],
+        sink: Optional[Callable[[str, list], Any]] = None,
+        raise_errors: bool = False,
+    ) -> BulkResult:
+        result, queues = BulkResult(), OrderedDict()
+        for table in tables:
+            result.report[table.endpoint] = table.report
+            if not sink:
+                result.data[table.endpoint] = table.rows
+            cached = None if sink or table.payload["columns"] is None else self._cached(table)
+            if cached is not None:
+                self._use_cached(table, cached, result)
+            else:
+                queues[table.endpoint] = deque([self._columns if table.payload["columns"] is None else self._page0])
+        tables_by_name = {t.endpoint: t for t in tables}
+        pending = dict()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while queues or pending:
+                # Round robin between the tables which have tasks ready
+                while queues and len(pending) < self.max_workers:
+                    endpoint = next(iter(queues))
+                    table, task = tables_by_name[endpoint], queues[endpoint].popleft()
+                    table.report.requests += 1
+                    pending[executor.submit(carry_context(self._run), task, table)] = table
+                    queues.pop(endpoint) if not queues[endpoint] else queues.move_to_end(endpoint)
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    table = pending.pop(future)
+                    if table.finished:
+                        continue
+                    try:
+                        tasks = self._handle(table, future.result(), sink, result)
+                    except Exception as err:
+                        self._fail(table, err, queues, result)
+                        if raise_errors:
+                            [f.cancel() for f in pending]
+                            raise
+                        continue
+                    if tasks:
+                        queues.setdefault(table.endpoint, deque()).extend(tasks)
+        return result
+
+    @staticmethod
+    def _run(task: Callable, table: _BulkTable):
+        # Time spent waiting in the executor queue is not counted
+        table.report.start()
+        return task(table)
+
+    def _cached(self, table: _BulkTable) -> Optional[list]:
+        return self.client._get_cached(table.endpoint, table.payload, table.snapshot)
+
+    def _use_cached(self, table: _BulkTable, cached: list, bulk: BulkResult):
+        table.report.cached, table.rows = True, cached
+        self._flush(table, [cached], None, bulk)
+        table.finish()
+
+    @staticmethod
+    def _fail(table: _BulkTable, err: Exception, queues: dict, bulk: BulkResult):
+        queues.pop(table.endpoint, None)
+        bulk.data.pop(table.endpoint, None)
+        table.finish(err)
+        logger.error(f"Fetching '{table.endpoint}' failed: {err!r}")
+
+    def _columns(self, table: _BulkTable):
+        return "columns", self.client.get_columns(table.endpoint)
+
+    def _page0(self, table: _BulkTable):
+        table.size = self.client._page_size(table.endpoint, table.payload)
+        return self._page(table, 0, table.size)
+
+    def _page(self, table: _BulkTable, start: int, size: int):
+        adaptive = not self.client.page_size
+        return "page", (
+            start,
+            size,
+            self.client._fetch_page(table.endpoint, table.payload, start, size, None, adaptive),
+        )
+
+    def _handle(self, table: _BulkTable, result: tuple, sink, bulk: BulkResult) -> list:
+        kind, value = result
+        if kind == "columns":
+            table.payload["columns"] = value
+            if not sink:
+                cached = self._cached(table)
+                if cached is not None:
+                    self._use_cached(table, cached, bulk)
+                    return list()
+            return [self._page0]
+        start, size, page = value
+        data = page["data"]
+        table.pages[start] = data
+        tasks = list()
+        if start == 0:
+            count = page.get("_meta", dict()).get("count", None)
+            table.next_start = size
+            if len(data) == size and count is not None:
+                while table.next_start < count:
+                    tasks.append(self._page_task(table.next_start, size))
+                    table.next_start += size
+        if len(data) < size:
+            table.last = start if table.last is None else min(table.last, start)
+        elif start + size == table.next_start:
+            # The count was missing or too low, continue until a page is not full
+            tasks.append(self._page_task(table.next_start, size))
+            table.next_start += size
+        self._flush_ready(table, sink, bulk)
+        return tasks
+
+    def _page_task(self, start: int, size: int):
+        return lambda table: self._page(table, start, size)
+
+    def _flush_ready(self, table: _BulkTable, sink, bulk: BulkResult):
+        """Passes on the pages received in order, the table is done once the last page is flushed"""
+        ready = list()
+        while table.flushed in table.pages:
+            data = table.pages.pop(table.flushed)
+            ready.append(data)
+            table.flushed += table.size
+            if len(data) < table.size:
+                break
+        self._flush(table, ready, sink, bulk)
+        if table.last is not None and table.flushed > table.last:
+            if not sink:
+                self.client._set_cached(table.endpoint, table.payload, table.snapshot, table.rows)
+            table.finish()
+
+    def _flush(self, table: _BulkTable, pages: List[list], sink, bulk: BulkResult):
+        for data in pages:
+            table.report.pages += 1
+            table.report.rows += len(data)
+            if sink:
+                sink(table.endpoint, data)
+            elif data is not table.rows:
+                table.rows.extend(data)
+        if not sink:
+            bulk.data[table.endpoint] = table.rows
+
+
+def bulk_tables(
+    client,
+    tables: Iterable[Union[Any, str]],
+    snapshot_id: Optional[str] = None,
+    columns: Optional[Dict[str, List[str]]] = None,
+    filters: Optional[Dict[str, Union[dict, str]]] = None,
+    attr_filters: Optional[Dict[str, List[str]]] = None,
+) -> List[_BulkTable]:
+    """Builds the payload of each table, tables are Table models or endpoints"""
+    columns, filters, bulk = columns or dict(), filters or dict(), OrderedDict()
+    for table in tables:
+        endpoint, snapshot = (table, True) if isinstance(table, str) else (table.endpoint, table.snapshot)
+        endpoint = endpoint.strip("/")
+        if endpoint in bulk:
+            continue
+        table_columns = columns.get(endpoint, None) or client._cached_columns(endpoint)
+        table_filters = filters.get(endpoint, None)
+        if isinstance(table_filters, str):
+            table_filters = loads(table_filters)
+        payload = dict(columns=table_columns, snapshot=snapshot_id or client.snapshot_id)
+        payload = client._check_payload(payload, snapshot, table_filters, None, None, attr_filters)
+        bulk[endpoint] = _BulkTable(endpoint, payload, snapshot, TableReport(endpoint))
+    return list(bulk.values())
@@ -0,0 +1,399 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from time import time, monotonic
+from typing import Optional, Union, Dict, List
+
+logger = logging.getLogger("ipfabric")
+
+COLUMNS_FILE = "columns.json"
+
+
+class ColumnCache:
+    """
+    Caches the column names of table endpoints keyed by (server, OS version, endpoint).
+    Results are always kept in memory and also saved to `cache_dir/columns.json` if a directory is provided.
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
+        self.path = Path(cache_dir, COLUMNS_FILE) if cache_dir else None
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Dict[str, Dict[str, List[str]]]] = self._load()
+
+    def _load(self) -> dict:
+        if not self.path or not self.path.exists():
+            return dict()
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            logger.warning(f"Could not read column cache '{self.path}', starting with an empty cache.")
+            return dict()
+
+    def save(self):
+        """Writes the cache to disk, does nothing if no cache directory was provided"""
+        if not self.path:
+            return
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "w") as f:
+                json.dump(self._cache, f)
+            os.replace(tmp, self.path)
+
+    @staticmethod
+    def _endpoint(endpoint: str) -> str:
+        return endpoint.strip("/")
+
+    def get(self, server: str, os_version: str, endpoint: str) -> Optional[List[str]]:
+        return self._cache.get(server, dict()).get(os_version, dict()).get(self._endpoint(endpoint), None)
+
+    def set(self, server: str, os_version: str, endpoint: str, columns: List[str], save: bool = True):
+        with self._lock:
+            self._cache.setdefault(server, dict()).setdefault(os_version, dict())[self._endpoint(endpoint)] = columns
+        if save:
+            self.save()
+
+    def invalidate(self, server: str, os_version: Optional[str] = None):
+        """Removes the cached columns of a server except for `os_version` (all versions if None)"""
+        with self._lock:
+            versions = self._cache.get(server, dict())
+            stale = [v for v in versions if v != os_version]
+            for version in stale:
+                versions.pop(version)
+        if stale:
+            logger.debug(f"Invalidated column cache of '{server}' for version(s) {stale}.")
+            self.save()
+
+
+TABLES_FILE = "tables.sqlite"
+DEFAULT_TABLE_CACHE_SIZE = 1024**3
+
+
+class TableCache:
+    """
+    Caches the results of snapshot table queries which never change once a snapshot is loaded.
+    Results are stored compressed in SQLite (`cache_dir/tables.sqlite`, or in memory if no directory is provided)
+    keyed by (server, snapshot ID, endpoint, query); the least recently used results are evicted once the total
+    size exceeds `max_size` bytes.
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, max_size: int = DEFAULT_TABLE_CACHE_SIZE):
+        import sqlite3  # only imported when the table cache is enabled
+
+        self.path = Path(cache_dir, TABLES_FILE) if cache_dir else None
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path or ":memory:"), check_same_thread=False, isolation_level=None)
+        with self._lock:
+            if self.path:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tables (key TEXT PRIMARY KEY, server TEXT, snapshot_id TEXT, "
+                "endpoint TEXT, size INTEGER, accessed REAL, data BLOB)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS tables_snapshot ON tables (server, snapshot_id)")
+
+    @staticmethod
+    def _key(server: str, snapshot_id: str, endpoint: str, query: dict) -> str:
+        key = json.dumps([server, snapshot_id, endpoint.strip("/"), query], sort_keys=True, default=str)
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, server: str, snapshot_id: str, endpoint: str, query: dict) -> Optional[list]:
+        """Returns the cached rows of a query or None"""
+        key = self._key(server, snapshot_id, endpoint, query)
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM tables WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE tables SET accessed = ? WHERE key = ?", (time(), key))
+        return json.loads(zlib.decompress(row[0]))
+
+    def set(self, server: str, snapshot_id: str, endpoint: str, query: dict, data: list):
+        """Stores the rows of a query and evicts the least recently used results if the cache is too large"""
+        blob = zlib.compress(json.dumps(data, separators=(",", ":")).encode(), 3)
+        if len(blob) > self.max_size:
+            logger.debug(f"Result of '{endpoint}' is larger than the table cache, not caching.")
+            return
+        key = self._key(server, snapshot_id, endpoint, query)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tables VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, server, snapshot_id, endpoint.strip("/"), len(blob), time(), blob),
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM tables").fetchone()[0]
+        if total <= self.max_size:
+            return
+        evict = list()
+        for key, size in self._conn.execute("SELECT key, size FROM tables ORDER BY accessed, rowid"):
+            evict.append((key,))
+            total -= size
+            if total <= self.max_size:
+                break
+        self._conn.executemany("DELETE FROM tables WHERE key = ?", evict)
+        logger.debug(f"Evicted {len(evict)} result(s) from the table cache.")
+
+    @property
+    def size(self) -> int:
+        """Total size in bytes of the cached results"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM tables").fetchone()[0]
+
+    def invalidate(
+        self,
+        server: str,
+        snapshot_ids: Optional[List[str]] = None,
+        keep: Optional[List[str]] = None,
+        endpoint: Optional[str] = None,
+    ):
+        """Removes the results of `snapshot_ids` (all snapshots if None) except for the snapshots in `keep`"""
+        query, params = "DELETE FROM tables WHERE server = ?", [server]
+        if endpoint is not None:
+            query += " AND endpoint = ?"
+            params.append(endpoint.strip("/"))
+        if snapshot_ids is not None:
+            query += f" AND snapshot_id IN ({','.join('?' * len(snapshot_ids))})"
+            params.extend(snapshot_ids)
+        if keep:
+            query += f" AND snapshot_id NOT IN ({','.join('?' * len(keep))})"
+            params.extend(keep)
+        with self._lock:
+            deleted = self._conn.execute(query, params).rowcount
+        if deleted:
+            logger.debug(f"Invalidated {deleted} result(s) from the table cache of '{server}'.")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+DEFAULT_RESULT_POLICIES = {
+    "tables/management/configuration": 60,
+    "tables/global-attributes": 60,
+    "tables/inventory/discovery-history": 60,
+    "tables/jobs": 1,
+}
+DEFAULT_RESULT_CACHE_ROWS = 500000
+
+
+class ResultCache:
+    """
+    In-memory LRU cache with a time to live for tables which are not snapshot specific (`snapshot=False`).
+    Only endpoints with a policy {endpoint: TTL in seconds} are cached and the total number of cached rows is limited
+    to `max_rows`; rows are copied so callers can modify the results.
+    """
+
+    def __init__(self, policies: Optional[Dict[str, float]] = None, max_rows: int = DEFAULT_RESULT_CACHE_ROWS):
+        policies = DEFAULT_RESULT_POLICIES if policies is None else policies
+        self.policies = {k.strip("/"): v for k, v in policies.items() if v}
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._rows = 0
+
+    @staticmethod
+    def _key(endpoint: str, payload: dict) -> tuple:
+        return endpoint.strip("/"), json.dumps(payload, sort_keys=True, default=str)
+
+    @staticmethod
+    def _copy(data: list) -> list:
+        return [dict(row) if isinstance(row, dict) else row for row in data]
+
+    def get(self, endpoint: str, payload: dict) -> Optional[list]:
+        """Returns a copy of the cached rows or None if not cached or expired"""
+        key = self._key(endpoint, payload)
+        with self._lock:
+            entry = self._cache.get(key, None)
+            if entry is None:
+                return None
+            if entry[0] < monotonic():
+                self._pop(key)
+                return None
+            self._cache.move_to_end(key)
+        return self._copy(entry[1])
+
+    def set(self, endpoint: str, payload: dict, data: list):
+        """Caches a copy of the rows if the endpoint has a policy, evicting the least recently used results"""
+        ttl = self.policies.get(endpoint.strip("/"), None)
+        if not ttl or len(data) > self.max_rows:
+            return
+        key = self._key(endpoint, payload)
+        with self._lock:
+            self._pop(key)
+            self._cache[key] = (monotonic() + ttl, self._copy(data))
+            self._rows += len(data)
+            while self._rows > self.max_rows:
+                self._pop(next(iter(self._cache)))
+
+    def _pop(self, key: tuple):
+        entry = self._cache.pop(key, None)
+        if entry:
+            self._rows -= len(entry[1])
+
+    def invalidate(self, endpoint: Optional[str] = None):
+        """Removes the cached results of an endpoint (all endpoints if None)"""
+        with self._lock:
+            for key in [k for k in self._cache if endpoint is None or k[0] == endpoint.strip("/")]:
+                self._pop(key)
+
+
+DEFAULT_COUNT_CACHE_SIZE = 100000
+
+
+class CountCache:
+    """
+    In-memory LRU cache of table counts keyed by (server, snapshot ID, endpoint, filters), counts of a loaded snapshot
+    never change. At most `max_entries` counts are kept.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_COUNT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[tuple, int]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._cache)
+
+    @staticmethod
+    def _key(server: str, snapshot_id: str, endpoint: str, query: dict) -> tuple:
+        return server, snapshot_id, endpoint.strip("/"), json.dumps(query, sort_keys=True, default=str)
+
+    def get(self, server: str, snapshot_id: str, endpoint: str, query: dict) -> Optional[int]:
+        key = self._key(server, snapshot_id, endpoint, query)
+        with self._lock:
+            count = self._cache.get(key, None)
+            if count is not None:
+                self._cache.move_to_end(key)
+            return count
+
+    def set(self, server: str, snapshot_id: str, endpoint: str, query: dict, count: int):
+        key = self._key(server, snapshot_id, endpoint, query)
+        with self._lock:
+            self._cache[key] = count
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def invalidate(
+        self,
+        server: str,
+        snapshot_ids: Optional[List[str]] = None,
+        keep: Optional[List[str]] = None,
+        endpoint: Optional[str] = None,
+    ):
+        """Removes the counts of `snapshot_ids` (all snapshots if None) except for the snapshots in `keep`"""
+        with self._lock:
+            for key in [
+                k
+                for k in self._cache
+                if k[0] == server
+                and (snapshot_ids is None or k[1] in snapshot_ids)
+                and (not keep or k[1] not in keep)
+                and (endpoint is None or k[2] == endpoint.strip("/"))
+            ]:
+                self._cache.pop(key)
+
+
+HANDSHAKE_FILE = "handshake.json"
+HANDSHAKE_SECRET_FILE = "handshake.key"
+DEFAULT_HANDSHAKE_TTL = 300
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home().joinpath(".cache"), "ipfabric")
+
+
+class HandshakeCache:
+    """
+    Caches the startup handshake of a client (API and OS versions, user and snapshots) keyed by an HMAC-SHA256 of the
+    server and credentials in `cache_dir/handshake.json` (`~/.cache/ipfabric` if no cache_dir) so a new client can
+    start without any request. Entries expire `ttl` seconds after the handshake. The HMAC secret is random per cache
+    directory and kept in `handshake.key`, both files are only readable by the owner (0600).
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, ttl: float = DEFAULT_HANDSHAKE_TTL):
+        self.path = Path(cache_dir or DEFAULT_CACHE_DIR, HANDSHAKE_FILE)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._secret: Optional[bytes] = None
+
+    def secret(self) -> bytes:
+        """Returns the HMAC secret of the cache directory, created on first use"""
+        if self._secret is not None:
+            return self._secret
+        path = self.path.with_name(HANDSHAKE_SECRET_FILE)
+        try:
+            self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            try:
+                with open(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "wb") as f:
+                    f.write(secrets.token_bytes(32))
+            except FileExistsError:
+                pass
+            secret = path.read_bytes()
+            if len(secret) < 32:
+                raise ValueError("secret is too short")
+            self._secret = secret
+        except (OSError, ValueError) as err:
+            logger.warning(f"Could not use handshake cache secret '{path}' ({err}), handshakes are not reused.")
+            self._secret = secrets.token_bytes(32)
+        return self._secret
+
+    def key(self, *parts) -> str:
+        """Returns the key of a handshake, credentials can not be recovered from it without the secret"""
+        return hmac.new(self.secret(), "\0".join(str(p) for p in parts).encode(), hashlib.sha256).hexdigest()
+
+    def _load(self) -> dict:
+        if not self.path.exists():
+            return dict()
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            logger.warning(f"Could not read handshake cache '{self.path}', starting with an empty cache.")
+            return dict()
+
+    def _save(self, cache: dict):
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+            os.chmod(tmp, 0o600)
+            json.dump(cache, f)
+        os.replace(tmp, self.path)
+
+    def get(self, key: str) -> Optional[dict]:
+        """Returns the handshake or None if not cached or expired"""
+        entry = self._load().get(key, None)
+        if entry is None or time() - entry["time"] > self.ttl:
+            return None
+        return entry
+
+    def set(self, key: str, handshake: dict):
+        """Saves a handshake and drops the expired ones"""
+        with self._lock:
+            now = time()
+            cache = {k: v for k, v in self._load().items() if now - v.get("time", 0) <= self.ttl}
+            cache[key] = dict(handshake, time=now)
+            try:
+                self._save(cache)
+            except OSError as err:
+                logger.warning(f"Could not write handshake cache '{self.path}': {err}")
+
+    def invalidate(self, key: Optional[str] = None):
+        """Removes a handshake (all handshakes if None)"""
+        with self._lock:
+            cache = self._load()
+            if key is not None and key not in cache:
+                return
+            try:
+                self._save({k: v for k, v in cache.items() if key is not None and k != key})
+            except OSError as err:
+                logger.warning(f"Could not write handshake cache '{self.path}': {err}")
@@ -1,12 +1,20 @@
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from json import loads
-from typing import Optional, Union, Dict, List
+from pathlib import Path
+from typing import Optional, Union, Dict, List, Iterator, Any, Callable
 from urllib.parse import urlparse
 
-from ipfabric.api import IPFabricAPI
+import httpx
+
+from ipfabric.api import IPFabricAPI, DEFAULT_WORKERS
+from ipfabric.bulk import BulkFetcher, BulkResult, bulk_tables
+from ipfabric.columnar import to_columnar
+from ipfabric.instrumentation import RequestEvent, carry_context, instrumented
 from ipfabric.intent import Intent
-from ipfabric.models import Technology, Inventory, Jobs
+from ipfabric.retry import DEFAULT_RETRIES, RetryPolicy
+from ipfabric.models import Technology, Inventory, Jobs, Table
 
 logger = logging.getLogger("ipfabric")
 
@@ -40,6 +48,17 @@ class IPFClient(IPFabricAPI):
         username: Optional[str] = None,
         password: Optional[str] = None,
         unloaded: bool = False,
+        max_workers: int = DEFAULT_WORKERS,
+        cache_dir: Optional[Union[str, Path]] = None,
+        table_cache: Union[bool, int] = False,
+        result_cache: Union[bool, Dict[str, float]] = False,
+        json_codec: Optional[str] = None,
+        page_size: Optional[int] = None,
+        retries: Union[int, RetryPolicy] = DEFAULT_RETRIES,
+        rate_limit: Optional[float] = None,
+        host_limits: Optional[Dict[str, dict]] = None,
+        instrumentation: Optional[List[Callable[[RequestEvent], Any]]] = None,
+        fast_start: Union[bool, float] = False,
         **kwargs: Optional[dict],
     ):
         """Initializes the IP Fabric Client
@@ -51,28 +70,57 @@ class IPFClient(IPFabricAPI):
             snapshot_id: IP Fabric snapshot ID to use by default for database actions - defaults to '$last'
             username: username to authenticate against IP Fabric
             password: password to authenticate against IP Fabric
+            unloaded: True to also retrieve unloaded snapshots
+            max_workers: Maximum number of concurrent requests used when paging in parallel
+            cache_dir: Optional directory to persist cached data like table columns
+            table_cache: Cache the results of snapshot table queries in `cache_dir/tables.sqlite` (in memory if no
+                         cache_dir), True for a maximum size of 1 GiB or the maximum size in bytes
+            result_cache: Cache the results of some `snapshot=False` tables in memory for a short time, True for the
+                          default policies or a dictionary of {endpoint: TTL in seconds} updating the defaults
+            json_codec: 'orjson', 'msgspec' or 'json' to encode payloads and decode tables, default is the fastest
+                        installed
+            page_size: Number of rows per page when fetching tables, default adapts the page size of each endpoint to
+                       the response times of the server
+            retries: Number of retries of idempotent requests (GET and table queries) failing with a timeout, a
+                     connection error or a 429/502/503/504 status, or a RetryPolicy; 0 disables retries
+            rate_limit: Optional maximum number of requests per second to a server, the number of concurrent requests
+                        is limited to `max_workers` and reduced while the server answers 429/503 or times out
+            host_limits: Optional {host: dict(max_concurrency=int, rate=float)} overriding the limits of a server
+            instrumentation: Optional hooks called with a RequestEvent after every request, like
+                             `ipfabric.instrumentation.LatencyStats()`; nothing is measured without hooks
+            fast_start: Reuse the versions, user and snapshots of a previous client of the same server and credentials
+                        saved in `cache_dir` (or `~/.cache/ipfabric`), True for 5 minutes or the TTL in seconds;
+                        the token is then only validated by the first request
             **kwargs: Keyword args to pass to httpx
         """
-        super().__init__(base_url, api_version, token, snapshot_id, username, password, unloaded, **kwargs)
+        super().__init__(
+            base_url,
+            api_version,
+            token,
+            snapshot_id,
+            username,
+            password,
+            unloaded,
+            max_workers,
+            cache_dir,
+            table_cache=table_cache,
+            result_cache=result_cache,
+            json_codec=json_codec,
+            page_size=page_size,
+            retries=retries,
+            rate_limit=rate_limit,
+            host_limits=host_limits,
+            instrumentation=instrumentation,
+            fast_start=fast_start,
+            **kwargs,
+        )
         self.inventory = Inventory(client=self)
         self.intent = Intent(client=self)
         self.technology = Technology(client=self)
         self.jobs = Jobs(client=self)
 
-    def _check_payload(self, payload, snapshot, filters, reports, sort, attr_filters):
-        if not snapshot:
-            payload.pop("snapshot", None)
-        if filters:
-            payload["filters"] = filters
-        if reports:
-            payload["reports"] = reports
-        if sort:
-            payload["sort"] = sort
-        if attr_filters or self.attribute_filters:
-            payload["attributeFilters"] = attr_filters or self.attribute_filters
-        return payload
-
     @check_format
+    @instrumented
     def fetch(
         self,
         url,
@@ -109,11 +157,16 @@ class IPFClient(IPFabricAPI):
             snapshot=snapshot_id or self.snapshot_id,
         )
         payload = self._check_payload(payload, snapshot, filters, reports, sort, attr_filters)
-        res = self.post(url, json=payload)
-        res.raise_for_status()
-        return res.json()["data"]
+        data = self._get_cached(url, payload, snapshot)
+        if data is None:
+            res = self.post(url, json=payload)
+            res.raise_for_status()
+            data = self._decode(res)["data"]
+            self._set_cached(url, payload, snapshot, data)
+        return data
 
     @check_format
+    @instrumented
     def fetch_all(
         self,
         url: str,
@@ -124,6 +177,10 @@ class IPFClient(IPFabricAPI):
         sort: Optional[dict] = None,
         attr_filters: Optional[Dict[str, List[str]]] = None,
         snapshot: bool = True,
+        parallel: bool = False,
+        output: Optional[str] = None,
+        structs: bool = False,
+        resume: bool = False,
     ) -> List:
         """Gets all data from IP Fabric for specified endpoint
 
@@ -136,23 +193,87 @@ class IPFClient(IPFabricAPI):
             sort: Optional dictionary to apply sorting: {"order": "desc", "column": "lastChange"}
             attr_filters: Optional dictionary to apply an Attribute filter
             snapshot: Set to False for some tables like management endpoints.
+            parallel: Fetch the pages concurrently instead of one after another.
+            output: Optional 'arrow', 'pandas' or 'numpy' to build columns page by page instead of a list of rows,
+                    string columns are dictionary encoded. Requires pyarrow, pandas or numpy to be installed.
+            structs: Decode the rows directly into msgspec Structs (typed for the tables in `codec.ROW_TYPES`)
+                     instead of dictionaries, results are not cached. Requires msgspec to be installed.
+            resume: Continue after the rows received by a failed attempt of the same query (pinned to a snapshot
+                    ID) instead of fetching them again, see `checkpoints`.
 
         Returns:
-            list: List of Dictionary objects.
+            list: List of Dictionary objects or pyarrow.Table, pandas.DataFrame or {column: numpy.ndarray} if output.
+        """
+        payload = dict(columns=columns or self.get_columns(url), snapshot=snapshot_id or self.snapshot_id)
+        payload = self._check_payload(payload, snapshot, filters, reports, sort, attr_filters)
+        if structs:
+            decoder = self._struct_decoder(url, payload)
+            return self._ipf_pager(url, payload, parallel=parallel, decoder=decoder, resume=resume)
+        data = self._get_cached(url, payload, snapshot)
+        if output:
+            pages = [data] if data is not None else self._ipf_page_iter(url, payload, parallel=parallel)
+            return to_columnar(pages, payload["columns"], output)
+        if data is None:
+            data = self._ipf_pager(url, payload, parallel=parallel, resume=resume)
+            self._set_cached(url, payload, snapshot, data)
+        return data
+
+    @check_format
+    @instrumented
+    def iter_all(
+        self,
+        url: str,
+        columns: Optional[List] = None,
+        filters: Optional[Union[dict, str]] = None,
+        snapshot_id: Optional[str] = None,
+        reports: Optional[str] = None,
+        sort: Optional[dict] = None,
+        attr_filters: Optional[Dict[str, List[str]]] = None,
+        snapshot: bool = True,
+        parallel: bool = False,
+        pages: bool = False,
+        structs: bool = False,
+    ) -> Iterator:
+        """Streams all data from IP Fabric for specified endpoint, the next page is fetched while the current is used
+
+        Args:
+            url: Example tables/vlan/device-summary
+            columns: Optional list of columns to return, None will return all
+            filters: Optional dictionary of filters
+            snapshot_id: Optional snapshot_id to override default
+            reports: String of frontend URL where the reports are displayed
+            sort: Optional dictionary to apply sorting: {"order": "desc", "column": "lastChange"}
+            attr_filters: Optional dictionary to apply an Attribute filter
+            snapshot: Set to False for some tables like management endpoints.
+            parallel: Prefetch up to `max_workers` pages concurrently instead of a single page.
+            pages: Yield a list of rows per page instead of single rows.
+            structs: Decode the rows directly into msgspec Structs instead of dictionaries, requires msgspec.
+
+        Returns:
+            Iterator: Dictionary objects or lists of Dictionary objects if pages is True.
         """
         payload = dict(columns=columns or self.get_columns(url), snapshot=snapshot_id or self.snapshot_id)
         payload = self._check_payload(payload, snapshot, filters, reports, sort, attr_filters)
-        return self._ipf_pager(url, payload)
+        decoder = self._struct_decoder(url, payload) if structs else None
+        for page in self._ipf_page_iter(url, payload, parallel=parallel, decoder=decoder):
+            if pages:
+                yield page
+            else:
+                yield from page
 
     @check_format
-    def query(self, url: str, payload: Union[str, dict], get_all: bool = True) -> list:
+    @instrumented
+    def query(
+        self, url: str, payload: Union[str, dict], get_all: bool = True, parallel: bool = False, resume: bool = False
+    ) -> list:
         """Submits a query, does no formatting on the parameters.  Use for copy/pasting from the webpage.
 
         Args:
             url: Example: https://demo1.ipfabric.io/api/v1/tables/vlan/device-summary or tables/vlan/device-summary
             payload: Dictionary to submit in POST or can be JSON string (i.e. read from file).
             get_all: Default use pager to get all results and ignore pagination information in the payload
-
+            parallel: Fetch the pages concurrently instead of one after another, only used with get_all
+            resume: Continue after the rows received by a failed attempt of the same query, only used with get_all
 
         Returns:
             list: List of Dictionary objects.
@@ -160,32 +281,98 @@ class IPFClient(IPFabricAPI):
         if isinstance(payload, str):
             payload = loads(payload)
         if get_all:
-            return self._ipf_pager(url, payload)
+            return self._ipf_pager(url, payload, parallel=parallel, resume=resume)
         else:
             res = self.post(url, json=payload)
             res.raise_for_status()
-            return res.json()["data"]
+            return self._decode(res)["data"]
 
     def _get_columns(self, url: str):
         logger.warning("""Use of _get_columns will be deprecated in a future release, please use get_columns""")
         return self.get_columns(url)
 
-    def get_columns(self, url: str):
-        """Submits malformed payload and extracts column names from it
+    @instrumented
+    def get_columns(self, url: str, cache: bool = True):
+        """Submits malformed payload and extracts column names from it, results are cached per IP Fabric version
 
         Args:
             url: API url to post
+            cache: Set to False to ignore the cached columns
 
         Returns:
             list: List of column names
         """
-        r = self.post(url, json=dict(snapshot=self.snapshot_id, columns=["*"]))
-        if r.status_code == 422:
-            msg = r.json()["errors"][0]["message"]
-            return [x.strip() for x in re.match(r"\".*\".*\[(.*)]$", msg).group(1).split(",")]
-        else:
-            r.raise_for_status()
+        columns = self._cached_columns(url) if cache else None
+        if columns is None:
+            r = self.post(url, json=dict(snapshot=self.snapshot_id, columns=["*"]))
+            columns = self._parse_columns(r)
+            self._cache_columns(url, columns)
+        return columns
+
+    @instrumented
+    def warm_column_cache(self, endpoints: Optional[List[str]] = None) -> Dict[str, List[str]]:
+        """Discovers the columns of many endpoints concurrently and stores them in the column cache
+
+        Args:
+            endpoints: Endpoints to discover, defaults to every Inventory and Technology Table
+
+        Returns:
+            dict: {endpoint: columns} for all endpoints which are available on this IP Fabric version
+        """
+        if endpoints is None:
+            endpoints = [t.endpoint for t in self.inventory.all_tables() + self.technology.all_tables()]
+        endpoints = list(dict.fromkeys(e.strip("/") for e in endpoints))
+
+        def discover(url):
+            columns = self._cached_columns(url)
+            if columns is None:
+                try:
+                    columns = self._parse_columns(self.post(url, json=dict(snapshot=self.snapshot_id, columns=["*"])))
+                except httpx.HTTPError as err:
+                    logger.warning(f"Could not get columns for '{url}': {err}")
+                    return None
+                self._cache_columns(url, columns, save=False)
+            return columns
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = dict(zip(endpoints, executor.map(carry_context(discover), endpoints)))
+        self.column_cache.save()
+        return {k: v for k, v in results.items() if v is not None}
+
+    @instrumented
+    def fetch_many(
+        self,
+        tables: Optional[List[Union[Table, str]]] = None,
+        snapshot_id: Optional[str] = None,
+        columns: Optional[Dict[str, List[str]]] = None,
+        filters: Optional[Dict[str, Union[dict, str]]] = None,
+        attr_filters: Optional[Dict[str, List[str]]] = None,
+        sink: Optional[Callable[[str, list], Any]] = None,
+        max_workers: Optional[int] = None,
+        raise_errors: bool = False,
+    ) -> BulkResult:
+        """Gets all data of many tables at once, the pages of all tables share one pool of workers
+
+        Args:
+            tables: Table models or endpoints, defaults to every Inventory and Technology Table
+            snapshot_id: Optional snapshot_id to override default
+            columns: Optional {endpoint: columns}, the columns of other tables are discovered on the same pool
+            filters: Optional {endpoint: filters}
+            attr_filters: Optional dictionary to apply an Attribute filter to all tables
+            sink: Optional callable(endpoint, rows) receiving each page in order instead of returning the data,
+                  the pages of different tables are interleaved.
+            max_workers: Maximum concurrent requests of all tables, defaults to the max_workers of the client
+            raise_errors: Raise the first error instead of reporting it and continuing with the other tables
 
+        Returns:
+            BulkResult: `data` is {endpoint: rows} and `report` is {endpoint: TableReport} with the rows and seconds
+        """
+        if tables is None:
+            tables = self.inventory.all_tables() + self.technology.all_tables()
+        tables = bulk_tables(self, tables, snapshot_id, columns, filters, attr_filters)
+        return BulkFetcher(self, max_workers).run(tables, sink, raise_errors)
+
+    @instrumented
     def get_count(
         self,
         url: str,
@@ -204,8 +391,65 @@ class IPFClient(IPFabricAPI):
         Returns:
             int: a count of rows
         """
+        return self._post_count(url, self._count_payload(filters, attr_filters, snapshot_id, snapshot))
+
+    def _count_payload(self, filters, attr_filters, snapshot_id, snapshot) -> dict:
         payload = dict(columns=["id"], pagination=dict(limit=1, start=0), snapshot=snapshot_id or self.snapshot_id)
-        payload = self._check_payload(payload, snapshot, filters, None, None, attr_filters)
+        return self._check_payload(payload, snapshot, filters, None, None, attr_filters)
+
+    def _post_count(self, url: str, payload: dict) -> int:
         res = self.post(url, json=payload)
         res.raise_for_status()
-        return res.json()["_meta"]["count"]
+        return self._decode(res)["_meta"]["count"]
+
+    @instrumented
+    def get_counts(
+        self,
+        tables: Optional[List[Union[Table, str]]] = None,
+        filters: Optional[Dict[str, Union[dict, str]]] = None,
+        attr_filters: Optional[Dict[str, Dict[str, List[str]]]] = None,
+        snapshot_id: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        cache: bool = True,
+    ) -> Dict[str, Optional[int]]:
+        """Gets the total number of rows of many tables concurrently
+
+        Args:
+            tables: Table models or endpoints, defaults to every Inventory and Technology Table
+            filters: Optional {endpoint: filters}
+            attr_filters: Optional {endpoint: attribute filters}, tables without use the client attribute filters
+            snapshot_id: Optional snapshot_id to override default
+            max_workers: Maximum concurrent requests, defaults to the max_workers of the client
+            cache: Use and store counts of loaded snapshots in the `count_cache`
+
+        Returns:
+            dict: {endpoint: count}, None for tables which could not be counted
+        """
+        if tables is None:
+            tables = self.inventory.all_tables() + self.technology.all_tables()
+        filters, attr_filters, queries = filters or dict(), attr_filters or dict(), dict()
+        for table in tables:
+            endpoint, snapshot = (table, True) if isinstance(table, str) else (table.endpoint, table.snapshot)
+            endpoint = endpoint.strip("/")
+            table_filters = filters.get(endpoint, None)
+            if isinstance(table_filters, str):
+                table_filters = loads(table_filters)
+            payload = self._count_payload(table_filters, attr_filters.get(endpoint, None), snapshot_id, snapshot)
+            queries[endpoint] = (payload, snapshot)
+
+        def count(endpoint):
+            payload, snapshot = queries[endpoint]
+            cache_args = self._count_cache_args(endpoint, payload, snapshot) if cache else None
+            result = self.count_cache.get(*cache_args) if cache_args else None
+            if result is None:
+                try:
+                    result = self._post_count(endpoint, payload)
+                except httpx.HTTPError as err:
+                    logger.warning(f"Could not get the count of '{endpoint}': {err}")
+                    return None
+                if cache_args:
+                    self.count_cache.set(*cache_args, result)
+            return result
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+            return dict(zip(queries, executor.map(carry_context(count), queries)))
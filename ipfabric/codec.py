@@ -0,0 +1,187 @@
+import json
+from typing import Optional, Any, Dict, List
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Column types of the largest tables used to build typed row structs, other columns are decoded as Any
+ROW_TYPES: Dict[str, Dict[str, Any]] = {
+    "tables/addressing/mac": dict(
+        id=Optional[str],
+        sn=Optional[str],
+        hostname=Optional[str],
+        siteName=Optional[str],
+        mac=Optional[str],
+        vlan=Optional[int],
+        intName=Optional[str],
+        edge=Optional[bool],
+        user=Optional[str],
+    ),
+    "tables/addressing/arp": dict(
+        id=Optional[str],
+        sn=Optional[str],
+        hostname=Optional[str],
+        siteName=Optional[str],
+        intName=Optional[str],
+        ip=Optional[str],
+        mac=Optional[str],
+        vlanId=Optional[int],
+        proxy=Optional[bool],
+    ),
+    "tables/inventory/devices": dict(
+        id=Optional[str],
+        sn=Optional[str],
+        hostname=Optional[str],
+        siteName=Optional[str],
+        loginIp=Optional[str],
+        vendor=Optional[str],
+        family=Optional[str],
+        platform=Optional[str],
+        model=Optional[str],
+        version=Optional[str],
+        devType=Optional[str],
+        uptime=Optional[int],
+        memoryUtilization=Optional[float],
+    ),
+    "tables/inventory/interfaces": dict(
+        id=Optional[str],
+        sn=Optional[str],
+        hostname=Optional[str],
+        siteName=Optional[str],
+        intName=Optional[str],
+        nameOriginal=Optional[str],
+        dscr=Optional[str],
+        mac=Optional[str],
+        duplex=Optional[str],
+        speed=Optional[str],
+        l1=Optional[str],
+        l2=Optional[str],
+        mtu=Optional[int],
+        primaryIp=Optional[str],
+    ),
+}
+
+
+class JSONCodec:
+    """Standard library codec, the same as httpx `json=` and `Response.json()`"""
+
+    name = "json"
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+    @staticmethod
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+
+class MsgspecCodec(JSONCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def loads(self, data: bytes) -> Any:
+        return self._decoder.decode(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+
+CODECS = {"orjson": (OrjsonCodec, orjson), "msgspec": (MsgspecCodec, msgspec), "json": (JSONCodec, json)}
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """Returns the JSON codec to use for requests and responses
+
+    Args:
+        name: 'orjson', 'msgspec' or 'json', None uses the fastest installed
+
+    Returns:
+        JSONCodec: Codec with `loads` and `dumps`
+    """
+    if name is None:
+        name = next(n for n, (_, module) in CODECS.items() if module is not None)
+    if name not in CODECS:
+        raise ValueError(f"JSON codec '{name}' is not valid, must be one of {set(CODECS)}.")
+    codec, module = CODECS[name]
+    if module is None:
+        raise ImportError(f"Package '{name}' is required for the '{name}' JSON codec, please install it.")
+    return codec()
+
+
+def _require_msgspec():
+    if msgspec is None:
+        raise ImportError("Package 'msgspec' is required to decode typed rows, please install it.")
+
+
+def row_struct(url: str, columns: List[str]):
+    """Creates a msgspec Struct for the rows of a table with only the requested columns
+
+    Args:
+        url: Table endpoint, columns of known tables in ROW_TYPES are typed
+        columns: Columns requested from the table
+
+    Returns:
+        msgspec.Struct: Class of the rows, missing columns default to None
+    """
+    _require_msgspec()
+    types = ROW_TYPES.get(url.strip("/"), dict())
+    fields = [(c, types.get(c, Any), None) for c in columns]
+    return msgspec.defstruct("Row", fields, module="ipfabric.codec")
+
+
+def page_decoder(row_type: type):
+    """Returns a msgspec Decoder of a table page where the rows are decoded directly into `row_type`"""
+    _require_msgspec()
+    page = msgspec.defstruct(
+        "Page", [("data", List[row_type], []), ("meta", Dict[str, Any], {})], rename={"meta": "_meta"}
+    )
+    return msgspec.json.Decoder(page)
+
+
+def decode(response, codec: JSONCodec, decoder=None) -> Any:
+    """Decodes the JSON of a response with the codec, or into typed rows with a page decoder
+
+    Args:
+        response: httpx.Response
+        codec: JSONCodec
+        decoder: Optional decoder from `page_decoder`
+
+    Returns:
+        Any: Decoded JSON, a page is {"data": [...], "_meta": {...}}
+    """
+    content = response.content
+    if not isinstance(content, bytes):
+        return response.json()
+    if decoder is not None:
+        page = decoder.decode(content)
+        return {"data": page.data, "_meta": page.meta}
+    try:
+        return codec.loads(content)
+    except ValueError:
+        # orjson and msgspec only accept UTF-8, let httpx detect the encoding
+        return response.json()
@@ -0,0 +1,140 @@
+from array import array
+from typing import Optional, Any, Dict, List, Iterable
+
+OUTPUTS = {"arrow", "pandas", "numpy"}
+
+
+def check_output(output: str):
+    if output not in OUTPUTS:
+        raise ValueError(f"Output '{output}' is not valid, must be one of {OUTPUTS}.")
+
+
+def _import(module: str, output: str):
+    try:
+        return __import__(module)
+    except ImportError:
+        raise ImportError(f"Package '{module}' is required for output='{output}', please install it.")
+
+
+class ColumnarBuilder:
+    """
+    Builds columns from pages of rows so a table is never held as a list of dictionaries.
+    String columns are dictionary encoded (the values are stored once and each row stores an integer code, -1 for
+    null), other columns are kept as lists of values.
+    """
+
+    def __init__(self, columns: List[str]):
+        self.columns = list(columns)
+        self.length = 0
+        self._codes: Dict[str, array] = {c: array("i") for c in self.columns}
+        self._dictionaries: Dict[str, Dict[str, int]] = {c: dict() for c in self.columns}
+        self._values: Dict[str, list] = dict()
+
+    def add_page(self, rows: List[dict]):
+        """Appends a page of rows to the columns"""
+        for column in self.columns:
+            values = [row.get(column, None) for row in rows]
+            if column in self._values:
+                self._values[column].extend(values)
+            elif all(v is None or v.__class__ is str for v in values):
+                codes = self._dictionaries[column]
+                self._codes[column].extend([-1 if v is None else codes.setdefault(v, len(codes)) for v in values])
+            else:
+                self._values[column] = self._decode(column) + values
+        self.length += len(rows)
+
+    def add_pages(self, pages: Iterable[List[dict]]) -> "ColumnarBuilder":
+        [self.add_page(page) for page in pages]
+        return self
+
+    def _decode(self, column: str) -> list:
+        """Converts a dictionary encoded column to a list of values"""
+        categories = list(self._dictionaries.pop(column)) + [None]
+        return [categories[i] for i in self._codes.pop(column)]
+
+    def is_dictionary(self, column: str) -> bool:
+        return column not in self._values
+
+    def categories(self, column: str) -> List[str]:
+        return list(self._dictionaries[column])
+
+    def codes(self, column: str) -> array:
+        return self._codes[column]
+
+    def values(self, column: str) -> list:
+        return self._values[column] if column in self._values else self._decode_copy(column)
+
+    def _decode_copy(self, column: str) -> list:
+        categories = list(self._dictionaries[column]) + [None]
+        return [categories[i] for i in self._codes[column]]
+
+    def to_arrow(self):
+        """Returns a pyarrow.Table, string columns are pyarrow DictionaryArrays"""
+        pa = _import("pyarrow", "arrow")
+        arrays = list()
+        for column in self.columns:
+            if self.is_dictionary(column):
+                codes = self.codes(column)
+                indices = pa.array(codes, type=pa.int32(), mask=pa.array([c < 0 for c in codes], type=pa.bool_()))
+                dictionary = pa.array(self.categories(column), type=pa.string())
+                arrays.append(pa.DictionaryArray.from_arrays(indices, dictionary))
+            else:
+                arrays.append(pa.array(self.values(column)))
+        return pa.Table.from_arrays(arrays, names=self.columns)
+
+    def to_pandas(self):
+        """Returns a pandas.DataFrame, string columns are Categoricals"""
+        pd = _import("pandas", "pandas")
+        np = _import("numpy", "pandas")
+        data = dict()
+        for column in self.columns:
+            if self.is_dictionary(column):
+                codes = np.frombuffer(self.codes(column), dtype=np.intc) if self.length else np.array([], np.intc)
+                data[column] = pd.Categorical.from_codes(codes, categories=self.categories(column))
+            else:
+                data[column] = pd.Series(self.values(column), dtype=object if self._has_nested(column) else None)
+        return pd.DataFrame(data, columns=self.columns)
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """Returns {column: numpy.ndarray}, string columns are object arrays sharing one object per distinct value"""
+        np = _import("numpy", "numpy")
+        data = dict()
+        for column in self.columns:
+            if self.is_dictionary(column):
+                categories = np.empty(len(self._dictionaries[column]) + 1, dtype=object)
+                categories[:-1] = self.categories(column)
+                data[column] = categories[np.frombuffer(self.codes(column), dtype=np.intc)]
+            elif self._has_nested(column):
+                data[column] = np.empty(self.length, dtype=object)
+                data[column][:] = self.values(column)
+            else:
+                data[column] = np.array(self.values(column))
+        return data
+
+    def _has_nested(self, column: str) -> bool:
+        return any(isinstance(v, (list, dict)) for v in self.values(column))
+
+    def build(self, output: str):
+        """Returns the columns in the `output` format: 'arrow', 'pandas' or 'numpy'"""
+        if output == "arrow":
+            return self.to_arrow()
+        elif output == "pandas":
+            return self.to_pandas()
+        elif output == "numpy":
+            return self.to_numpy()
+        check_output(output)
+
+
+def to_columnar(pages: Iterable[List[dict]], columns: List[str], output: Optional[str]):
+    """Builds the `output` format ('arrow', 'pandas' or 'numpy') from pages of rows
+
+    Args:
+        pages: Iterable of lists of rows, for example `_ipf_page_iter`
+        columns: Column names
+        output: 'arrow', 'pandas' or 'numpy'
+
+    Returns:
+        pyarrow.Table, pandas.DataFrame or dict of numpy arrays
+    """
+    check_output(output)
+    return ColumnarBuilder(columns).add_pages(pages).build(output)
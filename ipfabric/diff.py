@@ -0,0 +1,398 @@
+import gc
+import logging
+from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
+from typing import Optional, Union, Any, Callable, Dict, List, Iterable, Iterator, Hashable, Sequence, Tuple
+
+logger = logging.getLogger("ipfabric")
+
+
+_NESTED = {dict, list, tuple, set, frozenset}
+
+
+def _freeze(value):
+    """Converts nested lists and dictionaries into hashable tuples, dictionaries are ordered by key"""
+    cls = value.__class__
+    if cls is dict:
+        return dict, tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if cls is list or cls is tuple:
+        return list, tuple([_freeze(v) for v in value])
+    if cls is set or cls is frozenset:
+        return set, frozenset([_freeze(v) for v in value])
+    return value
+
+
+@contextmanager
+def _gc_paused():
+    """Pauses the garbage collector which otherwise repeatedly scans the millions of tuples created while hashing"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class HashEngine:
+    """
+    Creates a fingerprint of each table row used by `Table.compare` to match rows between snapshots.
+    Subclasses implement `fingerprint` and can override `fingerprints` to process many rows at once.
+    """
+
+    name = None
+
+    def fingerprint(self, row: dict, columns: Optional[Sequence[str]] = None) -> Hashable:
+        """Returns the fingerprint of a row using only `columns` if provided"""
+        raise NotImplementedError
+
+    def fingerprints(self, rows: Iterable[dict], columns: Optional[Sequence[str]] = None) -> Iterator[Hashable]:
+        """Yields the fingerprint of every row"""
+        for row in rows:
+            yield self.fingerprint(row, columns)
+
+
+class TupleHash(HashEngine):
+    """
+    Default engine, the fingerprint is a tuple of the row values in a canonical (sorted) column order.
+    Nested lists and dictionaries are converted to tuples so equal data always has the same fingerprint
+    regardless of dictionary key order.
+    """
+
+    name = "tuple"
+
+    @staticmethod
+    def _getter(columns: Sequence[str]):
+        if len(columns) == 1:
+            column = columns[0]
+            return lambda row: (row[column],)
+        return itemgetter(*columns)
+
+    @staticmethod
+    def _hashable():
+        """
+        Returns a function making the values of a row hashable. Values are only frozen when the tuple can not be
+        hashed; once a row had nested values the following rows are frozen directly as tables have fixed column types.
+        """
+        nested = [False]
+
+        def hashable(values: tuple) -> tuple:
+            if not nested[0]:
+                try:
+                    hash(values)
+                    return values
+                except TypeError:
+                    nested[0] = True
+            return tuple([_freeze(v) if v.__class__ in _NESTED else v for v in values])
+
+        return hashable
+
+    def fingerprint(self, row: dict, columns: Optional[Sequence[str]] = None) -> Hashable:
+        return next(self.fingerprints([row], columns))
+
+    def fingerprints(self, rows: Iterable[dict], columns: Optional[Sequence[str]] = None) -> Iterator[Hashable]:
+        hashable = self._hashable()
+        if columns is not None:
+            getter = self._getter(sorted(columns))
+            for row in rows:
+                yield hashable(getter(row))
+            return
+        # Rows of a table share the same columns so the getter is only rebuilt when the keys change
+        keys, sorted_keys, getter = None, None, None
+        for row in rows:
+            if keys != tuple(row):
+                keys = tuple(row)
+                sorted_keys = tuple(sorted(keys))
+                getter = self._getter(sorted_keys) if sorted_keys else lambda r: tuple()
+            yield sorted_keys, hashable(getter(row))
+
+
+class DeepHash(HashEngine):
+    """Compatibility engine using `deepdiff.DeepHash` which was used by `Table.compare` in previous versions"""
+
+    name = "deephash"
+
+    def fingerprint(self, row: dict, columns: Optional[Sequence[str]] = None) -> Hashable:
+        import deepdiff
+
+        if columns is not None:
+            row = {key: row[key] for key in columns}
+        return deepdiff.DeepHash(row)[row]
+
+
+HASH_ENGINES: Dict[str, type] = {TupleHash.name: TupleHash, DeepHash.name: DeepHash}
+
+
+def get_hash_engine(engine: Optional[Union[str, HashEngine]] = None) -> HashEngine:
+    """Returns a HashEngine from its name, an engine instance is returned unchanged
+
+    Args:
+        engine: 'tuple' (default), 'deephash' or a HashEngine instance
+
+    Returns:
+        HashEngine: Row fingerprinting engine
+    """
+    if isinstance(engine, HashEngine):
+        return engine
+    try:
+        return HASH_ENGINES[engine or TupleHash.name]()
+    except KeyError:
+        raise ValueError(f"Hash engine '{engine}' is not valid, must be one of {list(HASH_ENGINES)}.")
+
+
+def hash_rows(
+    rows: Iterable[dict], unique_keys: Optional[List[str]] = None, engine: Optional[Union[str, HashEngine]] = None
+) -> Dict[Hashable, dict]:
+    """Returns a dictionary with the fingerprint of each row as key and the row as value
+
+    Args:
+        rows: List of dictionaries to hash
+        unique_keys: Optional columns to use for the fingerprint, fingerprints must then be unique
+        engine: Hash engine name or instance, defaults to 'tuple'
+
+    Returns:
+        dict: {fingerprint: row}
+    """
+    engine = get_hash_engine(engine)
+    rows = rows if isinstance(rows, list) else list(rows)
+    with _gc_paused():
+        if not unique_keys:
+            return dict(zip(engine.fingerprints(rows), rows))
+        hashed = dict()
+        for fingerprint, row in zip(engine.fingerprints(rows, list(unique_keys)), rows):
+            if fingerprint in hashed:
+                raise KeyError(f"Unique Key(s) {unique_keys} are not unique, please adjust unique_keys input.")
+            hashed[fingerprint] = row
+    return hashed
+
+
+def _key_getter(unique_keys: Sequence[str]):
+    getter, hashable = TupleHash._getter(unique_keys), TupleHash._hashable()
+    return lambda row: hashable(getter(row))
+
+
+def _changes(columns: Sequence[str], before: tuple, after: tuple) -> Dict[str, dict]:
+    return {col: dict(before=b, after=a) for col, b, a in zip(columns, before, after) if b != a}
+
+
+_SEEN = object()
+
+
+class SortOrderError(ValueError):
+    """Raised by `merge_diff` when the rows are not sorted by the sort column in Python order"""
+
+
+def _diff_rows(before: Iterable[dict], after: Iterable[dict], key, values, unique_keys, columns, result: dict):
+    """Diffs two sets of rows and appends the differences to result, see `keyed_diff`"""
+    index = dict()
+    with _gc_paused():
+        for row in before:
+            row_key = key(row)
+            if row_key in index:
+                raise KeyError(f"Unique Key(s) {unique_keys} are not unique, please adjust unique_keys input.")
+            index[row_key] = values(row)
+
+    added, changed = result["added"], result["changed"]
+    for row in after:
+        row_key = key(row)
+        old = index.get(row_key, None)
+        if old is _SEEN:
+            raise KeyError(f"Unique Key(s) {unique_keys} are not unique, please adjust unique_keys input.")
+        index[row_key] = _SEEN
+        if old is None:
+            added.append(dict(zip(columns, values(row))))
+            continue
+        new = values(row)
+        if old != new:
+            changed.append(dict(key={k: row[k] for k in unique_keys}, changes=_changes(columns, old, new)))
+
+    result["removed"].extend(dict(zip(columns, v)) for v in index.values() if v is not _SEEN)
+    return result
+
+
+def _digest_diff(
+    before: Callable[[], Iterable[dict]], after: Iterable[dict], key, values, unique_keys, columns, result: dict
+):
+    """
+    Diffs two sets of rows like `_diff_rows` indexing `before` as {key: hash of the values}, the rows of `before` are
+    read a second time for the values of the changed and removed rows, see `keyed_diff`
+    """
+    index, hashable = dict(), TupleHash._hashable()
+    with _gc_paused():
+        for row in before():
+            row_key = key(row)
+            if row_key in index:
+                raise KeyError(f"Unique Key(s) {unique_keys} are not unique, please adjust unique_keys input.")
+            index[row_key] = hash(hashable(values(row)))
+
+    added, changed = result["added"], dict()
+    for row in after:
+        row_key = key(row)
+        old = index.get(row_key, None)
+        if old is _SEEN:
+            raise KeyError(f"Unique Key(s) {unique_keys} are not unique, please adjust unique_keys input.")
+        index[row_key] = _SEEN
+        if old is None:
+            added.append(dict(zip(columns, values(row))))
+            continue
+        new = values(row)
+        if old != hash(hashable(new)):
+            changed[row_key] = new
+    removed = {row_key for row_key, digest in index.items() if digest is not _SEEN}
+    del index
+
+    if not changed and not removed:
+        return result
+    for row in before():
+        row_key = key(row)
+        if row_key in changed:
+            changes = _changes(columns, values(row), changed.pop(row_key))
+            if changes:
+                result["changed"].append(dict(key={k: row[k] for k in unique_keys}, changes=changes))
+        elif row_key in removed:
+            result["removed"].append(dict(zip(columns, values(row))))
+    return result
+
+
+def _diff_args(unique_keys: Sequence[str], columns: Sequence[str]) -> tuple:
+    unique_keys = list(unique_keys)
+    columns = unique_keys + [c for c in columns if c not in unique_keys]
+    return _key_getter(unique_keys), TupleHash._getter(columns), unique_keys, columns
+
+
+def keyed_diff(
+    before: Union[Iterable[dict], Callable[[], Iterable[dict]]],
+    after: Iterable[dict],
+    unique_keys: Sequence[str],
+    columns: Sequence[str],
+) -> Dict[str, list]:
+    """Compares two tables matching the rows on `unique_keys` in a single pass over each table.
+
+    Only `before` is indexed and it is stored as {key: tuple of column values} instead of dictionaries,
+    `after` is streamed and can be a generator like `Table.iter`. Added and removed rows are both projected onto
+    `unique_keys` and `columns`, other columns of the rows (like 'id') are not returned.
+
+    If `before` is a function returning the rows (e.g. `lambda: table.iter(...)`) the index only keeps a hash of the
+    column values of each key so memory does not grow with the number of columns. `before` is then read a second
+    time, only if rows changed or were removed, to return their previous values.
+
+    Args:
+        before: Rows of the older snapshot or a function returning them (called up to twice)
+        after: Rows of the newer snapshot
+        unique_keys: Columns identifying a row, must be unique in each table
+        columns: Other columns to compare
+
+    Returns:
+        dict: {'added': [rows], 'removed': [rows], 'changed': [{'key': {..}, 'changes': {column: {'before', 'after'}}}]}
+    """
+    result = dict(added=[], removed=[], changed=[])
+    if callable(before):
+        return _digest_diff(before, after, *_diff_args(unique_keys, columns), result)
+    return _diff_rows(before, after, *_diff_args(unique_keys, columns), result)
+
+
+def _order(value) -> tuple:
+    """Python sort order of a column value, null values are last"""
+    return value is None, value
+
+
+def _sorted_groups(rows: Iterable[dict], sort_column: str) -> Iterator[tuple]:
+    """Yields (order, rows) for each run of rows with the same sort column value, checking the runs are ascending"""
+    last = None
+    for value, group in groupby(rows, key=itemgetter(sort_column)):
+        order = _order(value)
+        try:
+            ascending = last is None or last < order
+        except TypeError:
+            ascending = False
+        if not ascending:
+            raise SortOrderError(f"Rows are not sorted by '{sort_column}' in ascending Python order.")
+        last = order
+        yield order, list(group)
+
+
+def merge_diff(
+    before: Iterable[dict],
+    after: Iterable[dict],
+    unique_keys: Sequence[str],
+    columns: Sequence[str],
+    sort_column: Optional[str] = None,
+) -> Dict[str, list]:
+    """Compares two tables sorted ascending by `sort_column` with a merge join.
+
+    Only the rows sharing the current sort column value are held in memory, so both tables can be streamed with
+    `Table.iter(sort=...)` and memory is bounded by the page size and the size of the differences.
+
+    Args:
+        before: Rows of the older snapshot sorted by sort_column
+        after: Rows of the newer snapshot sorted by sort_column
+        unique_keys: Columns identifying a row, must be unique in each table
+        columns: Other columns to compare
+        sort_column: Unique key the rows are sorted by, defaults to the first unique key
+
+    Returns:
+        dict: Same format as `keyed_diff`
+
+    Raises:
+        SortOrderError: The rows are not in ascending Python order, for example if the server collation is
+                        case-insensitive. Use `keyed_diff` instead.
+    """
+    args = _diff_args(unique_keys, columns)
+    sort_column = sort_column or args[2][0]
+    result = dict(added=[], removed=[], changed=[])
+    before, after = _sorted_groups(before, sort_column), _sorted_groups(after, sort_column)
+    old, new = next(before, None), next(after, None)
+    while old is not None or new is not None:
+        try:
+            old_first = new is None or (old is not None and old[0] < new[0])
+            new_first = old is None or (not old_first and new[0] < old[0])
+        except TypeError:
+            raise SortOrderError(f"Values of '{sort_column}' can not be ordered.")
+        if old_first:
+            _diff_rows(old[1], [], *args, result)
+            old = next(before, None)
+        elif new_first:
+            _diff_rows([], new[1], *args, result)
+            new = next(after, None)
+        else:
+            _diff_rows(old[1], new[1], *args, result)
+            old, new = next(before, None), next(after, None)
+    return result
+
+
+def history_diff(
+    tables: Sequence[Tuple[str, List[dict]]], unique_keys: Sequence[str], columns: Sequence[str]
+) -> Dict[str, Any]:
+    """Diffs consecutive snapshots of a table and builds a timeline of each row
+
+    Args:
+        tables: [(snapshot_id, rows)] ordered from the oldest to the newest snapshot
+        unique_keys: Columns identifying a row, must be unique in each snapshot
+        columns: Other columns to compare
+
+    Returns:
+        dict: {
+            'snapshots': [snapshot_id],
+            'unique_keys': [column],
+            'diffs': [{'before': id, 'after': id, 'added': [..], 'removed': [..], 'changed': [..]}],
+            'timeline': {(unique key values): [{'snapshot': id, 'event': 'present|added|changed|removed'}]}
+        }
+        Rows of the first snapshot have a 'present' event, 'changed' events also contain the column 'changes'.
+    """
+    args = _diff_args(unique_keys, columns)
+    key, timeline, diffs = args[0], dict(), list()
+    if tables:
+        snapshot_id, rows = tables[0]
+        for row in rows:
+            timeline[key(row)] = [dict(snapshot=snapshot_id, event="present")]
+    for (before_id, before), (after_id, after) in zip(tables, tables[1:]):
+        result = _diff_rows(before, after, *args, dict(added=[], removed=[], changed=[]))
+        diffs.append(dict(before=before_id, after=after_id, **result))
+        for row in result["added"]:
+            timeline.setdefault(key(row), list()).append(dict(snapshot=after_id, event="added"))
+        for row in result["removed"]:
+            timeline[key(row)].append(dict(snapshot=after_id, event="removed"))
+        for change in result["changed"]:
+            timeline[key(change["key"])].append(dict(snapshot=after_id, event="changed", changes=change["changes"]))
+    return dict(snapshots=[t[0] for t in tables], unique_keys=args[2], diffs=diffs, timeline=timeline)
@@ -0,0 +1,252 @@
+import ipaddress
+import json
+import logging
+import re
+from functools import lru_cache
+from typing import Optional, Any, Callable, Dict, Iterable, List
+
+logger = logging.getLogger("ipfabric")
+
+COLORS = {"green": 0, "blue": 10, "amber": 20, "red": 30}
+LOGICAL = {"and": all, "or": any}
+
+
+def _network(value):
+    try:
+        return ipaddress.ip_network(str(value), strict=False)
+    except ValueError:
+        return None
+
+
+def _sect(value, network) -> bool:
+    value = _network(value)
+    return value is not None and network is not None and value.version == network.version and value.overlaps(network)
+
+
+def _compare(func):
+    def compare(value, other):
+        try:
+            return value is not None and func(value, other)
+        except TypeError:
+            return False
+
+    return compare
+
+
+def _empty(value, other) -> bool:
+    return (value is None or value == "" or value == [] or value == {}) == bool(other)
+
+
+def _prepare(operator: str, other):
+    """Converts the filter value once instead of for every row"""
+    if operator in {"ieq", "nieq", "like", "notlike"}:
+        return str(other).casefold()
+    if operator in {"reg", "nreg"}:
+        return re.compile(other)
+    if operator in {"ireg", "nireg"}:
+        return re.compile(other, re.IGNORECASE)
+    if operator in {"sect", "nsect"}:
+        return _network(other)
+    return other
+
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "eq": lambda v, o: v == o,
+    "neq": lambda v, o: v != o,
+    "ieq": lambda v, o: v is not None and str(v).casefold() == o,
+    "nieq": lambda v, o: v is None or str(v).casefold() != o,
+    "like": lambda v, o: v is not None and o in str(v).casefold(),
+    "notlike": lambda v, o: v is None or o not in str(v).casefold(),
+    "reg": lambda v, o: v is not None and o.search(str(v)) is not None,
+    "nreg": lambda v, o: v is None or o.search(str(v)) is None,
+    "ireg": lambda v, o: v is not None and o.search(str(v)) is not None,
+    "nireg": lambda v, o: v is None or o.search(str(v)) is None,
+    "gt": _compare(lambda v, o: v > o),
+    "gte": _compare(lambda v, o: v >= o),
+    "lt": _compare(lambda v, o: v < o),
+    "lte": _compare(lambda v, o: v <= o),
+    "empty": _empty,
+    "sect": _sect,
+    "nsect": lambda v, o: not _sect(v, o),
+}
+
+
+def _column_predicate(column: str, expression: list, colors: Dict[str, Callable[[dict], Optional[int]]]):
+    if not isinstance(expression, (list, tuple)) or len(expression) < 2:
+        raise ValueError(f"Invalid filter for column '{column}': {expression}")
+    if expression[0] == "color":
+        if column not in colors:
+            raise ValueError(f"Color filter on column '{column}' requires the Intent Checks of the column.")
+        color, test = colors[column], _column_predicate(column, expression[1:], colors)
+        return lambda row: test({column: color(row)})
+    if expression[0] in {"any", "all"}:
+        match, test = LOGICAL["and" if expression[0] == "all" else "or"], _value_test(column, expression[1:])
+        return lambda row: isinstance(row.get(column), list) and match(test(v) for v in row[column])
+    test = _value_test(column, expression)
+    return lambda row: test(row.get(column, None))
+
+
+def _value_test(column: str, expression: list) -> Callable[[Any], bool]:
+    operator, other = expression[0], expression[1]
+    if operator not in OPERATORS:
+        raise ValueError(f"Filter operator '{operator}' on column '{column}' is not supported.")
+    func, other = OPERATORS[operator], _prepare(operator, other)
+    return lambda value: func(value, other)
+
+
+def _compile(filters: dict, colors: Dict[str, Callable[[dict], Optional[int]]]) -> Callable[[dict], bool]:
+    predicates = list()
+    for key, value in filters.items():
+        if key in LOGICAL:
+            match, children = LOGICAL[key], [_compile(f, colors) for f in value]
+            predicates.append(lambda row, m=match, c=children: m(p(row) for p in c))
+        else:
+            predicates.append(_column_predicate(key, value, colors))
+    if len(predicates) == 1:
+        return predicates[0]
+    return lambda row: all(p(row) for p in predicates)
+
+
+def _intent_colors(intent_checks: Optional[Iterable[Any]]) -> Dict[str, Callable[[dict], Optional[int]]]:
+    """Returns {column: function returning the color of a row} from IntentCheck models"""
+    rules: Dict[str, list] = dict()
+    defaults: Dict[str, Optional[int]] = dict()
+    for intent in intent_checks or list():
+        for name, color in COLORS.items():
+            check = getattr(intent.checks, name)
+            if isinstance(check, dict):
+                rules.setdefault(intent.column, list()).append((color, _compile(check, dict())))
+        if intent.default_color is not None:
+            defaults[intent.column] = max(intent.default_color, defaults.get(intent.column, intent.default_color))
+
+    def color_func(column):
+        column_rules = sorted(rules.get(column, list()), key=lambda r: r[0], reverse=True)
+
+        def color(row):
+            for value, rule in column_rules:
+                if rule(row):
+                    return value
+            return defaults.get(column, None)
+
+        return color
+
+    return {column: color_func(column) for column in set(rules) | set(defaults)}
+
+
+def compile_filter(filters: Optional[dict], intent_checks: Optional[Iterable[Any]] = None) -> Callable[[dict], bool]:
+    """Compiles an IP Fabric filter dictionary into a function returning True if a row matches
+
+    Examples:
+        >>> match = compile_filter({"and": [{"vendor": ["like", "cisco"]}, {"uptime": ["gte", 3600]}]})
+        >>> [row for row in rows if match(row)]
+
+    Supported operators: eq, neq, ieq, nieq, like, notlike, reg, nreg, ireg, nireg, gt, gte, lt, lte, empty,
+    sect and nsect; ["any"|"all", operator, value] for list columns and ["color", operator, value] if the
+    IntentCheck models of the column are provided (the highest matching color or the default color of the Intent).
+
+    Args:
+        filters: Filter dictionary as used by `fetch_all`
+        intent_checks: Optional IntentCheck models used to evaluate color filters
+
+    Returns:
+        Callable: Predicate taking a row dictionary
+    """
+    if not filters:
+        return lambda row: True
+    return _compile(filters, _intent_colors(intent_checks))
+
+
+def _sort_key(column: str):
+    def key(row):
+        value = row.get(column, None)
+        return value is None, value
+
+    return key
+
+
+def sort_rows(rows: List[dict], sort: Optional[dict] = None) -> List[dict]:
+    """Sorts rows like the API `sort` parameter, null values are last in ascending and first in descending order
+
+    Args:
+        rows: List of dictionaries
+        sort: Dictionary to apply sorting: {"order": "desc", "column": "lastChange"}
+
+    Returns:
+        list: Sorted list
+    """
+    if not sort:
+        return rows
+    reverse = sort.get("order", "asc") == "desc"
+    try:
+        return sorted(rows, key=_sort_key(sort["column"]), reverse=reverse)
+    except TypeError:
+        logger.debug(f"Column '{sort['column']}' has values of different types, sorting them as strings.")
+        key = _sort_key(sort["column"])
+        return sorted(rows, key=lambda r: (key(r)[0], str(key(r)[1])), reverse=reverse)
+
+
+def query_rows(
+    rows: Iterable[dict],
+    columns: Optional[List[str]] = None,
+    filters: Optional[dict] = None,
+    sort: Optional[dict] = None,
+    intent_checks: Optional[Iterable[Any]] = None,
+) -> List[dict]:
+    """Filters, sorts and projects rows locally the way the API would
+
+    Args:
+        rows: List of dictionaries, for example the result of `fetch_all`
+        columns: Optional list of columns to return, None will return all
+        filters: Optional filter dictionary
+        sort: Optional dictionary to apply sorting: {"order": "desc", "column": "lastChange"}
+        intent_checks: Optional IntentCheck models used to evaluate color filters
+
+    Returns:
+        list: List of Dictionary objects.
+    """
+    return _select(rows, compile_filter(filters, intent_checks), columns, sort)
+
+
+def _select(rows: Iterable[dict], match: Callable[[dict], bool], columns: Optional[List[str]], sort: Optional[dict]):
+    data = sort_rows([row for row in rows if match(row)], sort)
+    if columns:
+        data = [{c: row.get(c, None) for c in columns} for row in data]
+    return data
+
+
+class LocalTable:
+    """
+    Rows of a table kept in memory which can be queried with the same filters, sort and columns as the API.
+    Compiled filters are cached so many different views of the same data are cheap.
+    """
+
+    def __init__(self, rows: List[dict], intent_checks: Optional[Iterable[Any]] = None):
+        self.rows = rows
+        self.intent_checks = list(intent_checks or list())
+        self._compile = lru_cache(maxsize=256)(self._compile_json)
+
+    def _compile_json(self, filters: str) -> Callable[[dict], bool]:
+        return compile_filter(json.loads(filters), self.intent_checks)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def all(
+        self, columns: Optional[List[str]] = None, filters: Optional[dict] = None, sort: Optional[dict] = None
+    ) -> List[dict]:
+        """Returns the rows matching the filters
+
+        Args:
+            columns: Optional list of columns to return, None will return all
+            filters: Optional filter dictionary
+            sort: Optional dictionary to apply sorting: {"order": "desc", "column": "lastChange"}
+
+        Returns:
+            list: List of Dictionary objects.
+        """
+        return _select(self.rows, self._compile(json.dumps(filters or dict(), sort_keys=True)), columns, sort)
+
+    def count(self, filters: Optional[dict] = None) -> int:
+        """Returns the number of rows matching the filters"""
+        match = self._compile(json.dumps(filters or dict(), sort_keys=True))
+        return sum(1 for row in self.rows if match(row))
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import math
+from threading import Condition
+from time import monotonic
+from typing import Optional, Dict
+
+import httpx
+
+from ipfabric.retry import retry_after_seconds
+
+logger = logging.getLogger("ipfabric")
+
+OVERLOAD_STATUSES = {429, 503}
+DEFAULT_BACKOFF = 1.0
+
+
+class HostLimit:
+    """
+    Concurrency and rate of the requests to one host.
+    The concurrency limit follows AIMD: it grows by one request per `limit` successful responses and is halved when
+    the server is overloaded (429, 503 or a timeout). A 429/503 also pauses all requests to the host for the
+    `Retry-After` seconds. An optional token bucket limits the number of requests per second.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+    ):
+        self.max_concurrency, self.min_concurrency = max_concurrency, min(min_concurrency, max_concurrency)
+        self.limit = float(max_concurrency)
+        self.rate, self.burst = rate, burst or max(1, int(math.ceil(rate or 1)))
+        self.tokens = float(self.burst)
+        self.inflight = 0
+        self.paused_until = 0.0
+        self._refilled = monotonic()
+
+    def _refill(self, now: float):
+        if self.rate:
+            self.tokens = min(float(self.burst), self.tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def wait_time(self, now: float) -> Optional[float]:
+        """Returns 0 if a request can start now, the seconds to wait or None to wait for a running request"""
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.inflight >= int(self.limit):
+            return None
+        self._refill(now)
+        if self.rate and self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+        return 0.0
+
+    def start(self):
+        self.inflight += 1
+        if self.rate:
+            self.tokens -= 1
+
+    def finish(self, now: float, response: Optional[httpx.Response] = None, overloaded: bool = False):
+        """Records the end of a request
+
+        Args:
+            now: monotonic time
+            response: Response of the request, None if it failed
+            overloaded: True if the request failed because the server is overloaded, like a timeout
+        """
+        self.inflight -= 1
+        if response is not None and response.status_code in OVERLOAD_STATUSES:
+            overloaded = True
+            retry_after = retry_after_seconds(response)
+            pause = DEFAULT_BACKOFF if retry_after is None else retry_after
+            self.paused_until = max(self.paused_until, now + pause)
+        if overloaded:
+            previous, self.limit = self.limit, max(float(self.min_concurrency), self.limit / 2)
+            if int(previous) != int(self.limit):
+                logger.warning(f"Server is overloaded, reducing concurrent requests to {int(self.limit)}.")
+        elif response is not None and response.status_code < 500:
+            self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+
+
+class Governor:
+    """Shared by all threads of a client, every request waits for its host to allow it"""
+
+    def __init__(self, max_concurrency: int, rate: Optional[float] = None, limits: Optional[Dict[str, dict]] = None):
+        """
+        Args:
+            max_concurrency: Maximum concurrent requests per host
+            rate: Optional maximum requests per second per host
+            limits: Optional {host: HostLimit keyword arguments} overriding the defaults of a host
+        """
+        self.max_concurrency, self.rate, self.limits = max_concurrency, rate, limits or dict()
+        self.hosts: Dict[str, HostLimit] = dict()
+        self._cond = self._new_condition()
+
+    @staticmethod
+    def _new_condition():
+        return Condition()
+
+    def host(self, host: str) -> HostLimit:
+        if host not in self.hosts:
+            kwargs = dict(dict(max_concurrency=self.max_concurrency, rate=self.rate), **self.limits.get(host, dict()))
+            self.hosts[host] = HostLimit(**kwargs)
+        return self.hosts[host]
+
+    def acquire(self, host: str):
+        with self._cond:
+            limit = self.host(host)
+            while True:
+                wait = limit.wait_time(monotonic())
+                if wait == 0:
+                    limit.start()
+                    return
+                self._cond.wait(wait)
+
+    def release(self, host: str, response: Optional[httpx.Response] = None, overloaded: bool = False):
+        with self._cond:
+            self.host(host).finish(monotonic(), response, overloaded)
+            self._cond.notify_all()
+
+
+class AsyncGovernor(Governor):
+    """Governor of the asyncio client, the condition is created in the running event loop"""
+
+    @staticmethod
+    def _new_condition():
+        return None
+
+    def _condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._cond is None or self._cond[0] is not loop:
+            self._cond = (loop, asyncio.Condition())
+        return self._cond[1]
+
+    async def acquire(self, host: str):
+        cond = self._condition()
+        async with cond:
+            limit = self.host(host)
+            while True:
+                wait = limit.wait_time(monotonic())
+                if wait == 0:
+                    limit.start()
+                    return
+                try:
+                    await asyncio.wait_for(cond.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, host: str, response: Optional[httpx.Response] = None, overloaded: bool = False):
+        cond = self._condition()
+        async with cond:
+            self.host(host).finish(monotonic(), response, overloaded)
+            cond.notify_all()
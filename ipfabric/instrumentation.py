@@ -0,0 +1,396 @@
+import inspect
+import logging
+import math
+import re
+from collections import defaultdict, deque
+from contextvars import ContextVar, copy_context
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Optional, Any, Callable, Dict, List, Union
+
+import httpx
+
+logger = logging.getLogger("ipfabric")
+
+# SDK function which started the current requests and the page being fetched
+CALLER: ContextVar = ContextVar("ipfabric_caller", default=None)
+PAGE: ContextVar = ContextVar("ipfabric_page", default=None)
+API_PREFIX = re.compile(r"^/?(api/)?v\d+(\.\d+)?/")
+PERCENTILES = (50, 95, 99)
+
+
+class RequestEvent:
+    """One request sent to IP Fabric, retries of the request are counted in `retries`"""
+
+    __slots__ = (
+        "method",
+        "endpoint",
+        "status",
+        "latency",
+        "bytes_in",
+        "bytes_out",
+        "rows",
+        "page",
+        "retries",
+        "caller",
+        "error",
+        "_start",
+    )
+
+    def __init__(self, method: str, endpoint: str, caller: Optional[str] = None, page: Optional[int] = None):
+        self.method, self.endpoint, self.caller, self.page = method.upper(), endpoint, caller, page
+        self.status: Optional[int] = None
+        self.latency: Optional[float] = None
+        self.bytes_in: Optional[int] = None
+        self.bytes_out: Optional[int] = None
+        self.rows: Optional[int] = None
+        self.retries = 0
+        self.error: Optional[Exception] = None
+        self._start = perf_counter()
+
+    def dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.__slots__ if not k.startswith("_")}
+
+    def __repr__(self):
+        return f"RequestEvent({self.method} {self.endpoint!r}, status={self.status}, latency={self.latency})"
+
+
+def endpoint_name(url: Union[httpx.URL, str]) -> str:
+    """Returns the endpoint of a URL without the host and API version, like tables/inventory/devices"""
+    path = url.path if isinstance(url, httpx.URL) else httpx.URL(str(url)).path
+    return API_PREFIX.sub("", path).strip("/")
+
+
+def _content_size(message) -> Optional[int]:
+    try:
+        content = message.content
+    except (AttributeError, RuntimeError, httpx.HTTPError):
+        return None
+    return len(content) if isinstance(content, bytes) else None
+
+
+def _request(response: httpx.Response) -> Optional[httpx.Request]:
+    try:
+        return response.request
+    except RuntimeError:
+        return None
+
+
+class _PageScope:
+    """Collects the events of the requests of a page, they are emitted with the number of rows once it is decoded"""
+
+    __slots__ = ("instrumentation", "index", "rows", "events", "_token")
+
+    def __init__(self, instrumentation: "Instrumentation", index: int):
+        self.instrumentation, self.index = instrumentation, index
+        self.rows: Optional[int] = None
+        self.events: List[RequestEvent] = list()
+
+    def __enter__(self):
+        self._token = PAGE.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        PAGE.reset(self._token)
+        if self.events and self.events[-1].error is None and (self.events[-1].status or 0) < 400:
+            self.events[-1].rows = self.rows
+        for event in self.events:
+            self.instrumentation.emit(event)
+
+
+class _NoScope:
+    """Page scope of a disabled Instrumentation, the rows are discarded"""
+
+    rows = property(lambda self: None, lambda self, rows: None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+NO_SCOPE = _NoScope()
+
+
+class Instrumentation:
+    """
+    Calls every hook with a RequestEvent after each request of a client, hooks are callables like `LatencyStats`,
+    `PrometheusExporter` or `OpenTelemetryExporter`. Without hooks nothing is measured.
+    """
+
+    def __init__(self, hooks: Optional[List[Callable[[RequestEvent], Any]]] = None):
+        self.hooks: List[Callable[[RequestEvent], Any]] = list(hooks or list())
+
+    def __bool__(self):
+        return bool(self.hooks)
+
+    def add(self, hook: Callable[[RequestEvent], Any]) -> Callable[[RequestEvent], Any]:
+        self.hooks.append(hook)
+        return hook
+
+    def remove(self, hook: Callable[[RequestEvent], Any]):
+        self.hooks.remove(hook)
+
+    def start(self, method: str, url: Union[httpx.URL, str]) -> RequestEvent:
+        page = PAGE.get()
+        return RequestEvent(method, endpoint_name(url), CALLER.get(), page.index if page else None)
+
+    def finish(self, event: RequestEvent, response: Optional[httpx.Response] = None, error: Optional[Exception] = None):
+        """Completes the event of a request and emits it, events of a page are emitted at the end of the page"""
+        event.latency, event.error = perf_counter() - event._start, error
+        if response is not None:
+            event.status = response.status_code
+            event.bytes_in = _content_size(response)
+            event.bytes_out = _content_size(_request(response))
+        page = PAGE.get()
+        if page is not None and page.instrumentation is self:
+            page.events.append(event)
+        else:
+            self.emit(event)
+
+    def page(self, index: int) -> Union[_PageScope, _NoScope]:
+        """Context manager around the requests of a page, set `rows` of the returned scope once it is decoded"""
+        return _PageScope(self, index) if self.hooks else NO_SCOPE
+
+    def emit(self, event: RequestEvent):
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception as err:
+                logger.warning(f"Instrumentation hook {hook!r} failed: {err!r}")
+
+
+async def _await_as(name: str, coroutine):
+    """Awaits the coroutine with `name` as the caller unless a caller is already set"""
+    token = CALLER.set(name) if CALLER.get() is None else None
+    try:
+        return await coroutine
+    finally:
+        if token is not None:
+            CALLER.reset(token)
+
+
+async def _iterate_as(name: str, iterator):
+    """Iterates the asynchronous generator with `name` as the caller of each step unless a caller is already set"""
+    try:
+        while True:
+            token = CALLER.set(name) if CALLER.get() is None else None
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+            finally:
+                if token is not None:
+                    CALLER.reset(token)
+            yield item
+    finally:
+        await iterator.aclose()
+
+
+def instrumented(func: Callable) -> Callable:
+    """
+    Records the SDK function as the `caller` of the requests it sends, the outermost SDK function is kept.
+    Coroutines and asynchronous generators returned by a synchronous function (like `Table.all` of an
+    `AsyncIPFClient`) keep the caller while they are awaited.
+    """
+    name = func.__qualname__
+
+    if inspect.isasyncgenfunction(func):
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            iterator = _iterate_as(name, func(*args, **kwargs))
+            try:
+                async for item in iterator:
+                    yield item
+            finally:
+                await iterator.aclose()
+
+    elif inspect.isgeneratorfunction(func):
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            iterator = func(*args, **kwargs)
+            try:
+                while True:
+                    token = CALLER.set(name) if CALLER.get() is None else None
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        if token is not None:
+                            CALLER.reset(token)
+                    yield item
+            finally:
+                iterator.close()
+
+    elif inspect.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await _await_as(name, func(*args, **kwargs))
+
+    else:
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if CALLER.get() is not None:
+                return func(*args, **kwargs)
+            token = CALLER.set(name)
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                CALLER.reset(token)
+            if inspect.iscoroutine(result):
+                return _await_as(name, result)
+            if inspect.isasyncgen(result):
+                return _iterate_as(name, result)
+            return result
+
+    return wrapper
+
+
+def carry_context(func: Callable) -> Callable:
+    """Wraps a function submitted to a thread pool so it runs with the caller and page of the submitting thread"""
+    if CALLER.get() is None and PAGE.get() is None:
+        return func
+    context = copy_context()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+
+    return wrapper
+
+
+def percentile(values: List[float], percent: float) -> Optional[float]:
+    """Nearest rank percentile of sorted values"""
+    if not values:
+        return None
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+class _Stats:
+    __slots__ = ("count", "errors", "retries", "rows", "bytes_in", "bytes_out", "latencies")
+
+    def __init__(self, samples: int):
+        self.count = self.errors = self.retries = self.rows = self.bytes_in = self.bytes_out = 0
+        self.latencies: deque = deque(maxlen=samples)
+
+
+class LatencyStats:
+    """
+    In-memory aggregation hook: request count, errors, retries, rows, bytes and p50/p95/p99 latencies per endpoint
+    (or per `caller`). Percentiles are computed over the last `samples` requests of each key.
+    """
+
+    def __init__(self, by: str = "endpoint", samples: int = 10000):
+        if by not in {"endpoint", "caller", "method"}:
+            raise ValueError(f"Cannot aggregate by '{by}', use 'endpoint', 'caller' or 'method'.")
+        self.by, self.samples = by, samples
+        self._stats: Dict[Any, _Stats] = defaultdict(lambda: _Stats(self.samples))
+        self._lock = Lock()
+
+    def __call__(self, event: RequestEvent):
+        with self._lock:
+            stats = self._stats[getattr(event, self.by)]
+            stats.count += 1
+            stats.retries += event.retries
+            stats.rows += event.rows or 0
+            stats.bytes_in += event.bytes_in or 0
+            stats.bytes_out += event.bytes_out or 0
+            if event.error is not None or (event.status or 0) >= 400:
+                stats.errors += 1
+            if event.latency is not None:
+                stats.latencies.append(event.latency)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def summary(self) -> Dict[Any, dict]:
+        """Returns {endpoint: dict(count, errors, retries, rows, bytes_in, bytes_out, p50, p95, p99)} in seconds"""
+        with self._lock:
+            items = [(k, s, sorted(s.latencies)) for k, s in self._stats.items()]
+        summary = dict()
+        for key, stats, latencies in items:
+            summary[key] = {k: getattr(stats, k) for k in _Stats.__slots__ if k != "latencies"}
+            summary[key].update({f"p{p}": percentile(latencies, p) for p in PERCENTILES})
+        return summary
+
+
+def _import(module: str, exporter: str):
+    try:
+        return __import__(module, fromlist=["_"])
+    except ImportError:
+        raise ImportError(f"Package '{module.split('.')[0]}' is required for the {exporter}, please install it.")
+
+
+class PrometheusExporter:
+    """Hook recording requests in prometheus_client metrics, requires `prometheus_client`"""
+
+    def __init__(self, registry=None, prefix: str = "ipfabric"):
+        prometheus = _import("prometheus_client", "PrometheusExporter")
+        kwargs = dict(registry=registry) if registry is not None else dict()
+        labels = ["endpoint", "method", "status", "caller"]
+        self.latency = prometheus.Histogram(
+            f"{prefix}_request_seconds", "Latency of IP Fabric API requests", labels, **kwargs
+        )
+        self.retries = prometheus.Counter(
+            f"{prefix}_request_retries", "Retried IP Fabric API requests", labels, **kwargs
+        )
+        self.rows = prometheus.Counter(f"{prefix}_rows", "Rows returned by IP Fabric API requests", labels, **kwargs)
+        self.bytes = prometheus.Counter(
+            f"{prefix}_bytes", "Bytes sent to and received from IP Fabric", labels + ["direction"], **kwargs
+        )
+
+    def __call__(self, event: RequestEvent):
+        labels = dict(
+            endpoint=event.endpoint,
+            method=event.method,
+            status=str(event.status or type(event.error).__name__),
+            caller=event.caller or "",
+        )
+        self.latency.labels(**labels).observe(event.latency or 0)
+        if event.retries:
+            self.retries.labels(**labels).inc(event.retries)
+        if event.rows:
+            self.rows.labels(**labels).inc(event.rows)
+        if event.bytes_in:
+            self.bytes.labels(direction="in", **labels).inc(event.bytes_in)
+        if event.bytes_out:
+            self.bytes.labels(direction="out", **labels).inc(event.bytes_out)
+
+
+class OpenTelemetryExporter:
+    """Hook recording requests in OpenTelemetry metrics, requires `opentelemetry-api`"""
+
+    def __init__(self, meter=None, prefix: str = "ipfabric"):
+        if meter is None:
+            meter = _import("opentelemetry.metrics", "OpenTelemetryExporter").get_meter("ipfabric")
+        self.latency = meter.create_histogram(
+            f"{prefix}.request.duration", unit="s", description="Latency of IP Fabric API requests"
+        )
+        self.retries = meter.create_counter(f"{prefix}.request.retries", description="Retried IP Fabric API requests")
+        self.rows = meter.create_counter(f"{prefix}.rows", description="Rows returned by IP Fabric API requests")
+        self.bytes = meter.create_counter(f"{prefix}.bytes", unit="By", description="Bytes sent and received")
+
+    def __call__(self, event: RequestEvent):
+        attributes = {
+            "endpoint": event.endpoint,
+            "method": event.method,
+            "status": str(event.status or type(event.error).__name__),
+            "caller": event.caller or "",
+        }
+        self.latency.record(event.latency or 0, attributes)
+        if event.retries:
+            self.retries.add(event.retries, attributes)
+        if event.rows:
+            self.rows.add(event.rows, attributes)
+        if event.bytes_in:
+            self.bytes.add(event.bytes_in, dict(attributes, direction="in"))
+        if event.bytes_out:
+            self.bytes.add(event.bytes_out, dict(attributes, direction="out"))
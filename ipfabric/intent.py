@@ -1,6 +1,8 @@
+import asyncio
 import logging
 from typing import Any, Union, List
 
+from ipfabric.instrumentation import instrumented
 from ipfabric.intent_models import Group
 from .intent_models import IntentCheck
 
@@ -15,6 +17,7 @@ class Intent:
         self.groups: List[Group] = list()
         self.snapshot_id: str = self.client.snapshot_id
 
+    @instrumented
     def get_intent_checks(self, snapshot_id: str = None) -> list:
         """Gets all intent checks and returns a list of them.  You can also:
 
@@ -32,6 +35,8 @@ class Intent:
         snapshot = self.client.snapshots[snapshot_id] if snapshot_id else self.client.snapshot
         if not snapshot.loaded:
             raise ValueError(f"Snapshot {snapshot.snapshot_id} is not loaded; cannot pull Intent Rules.")
+        if snapshot.disabled_intent_verification is None:
+            snapshot.get_assurance_engine_settings(self.client)
         if snapshot.disabled_intent_verification is True:
             raise ValueError(
                 f"Snapshot {snapshot.snapshot_id} has Intent Verification computation disabled; "
@@ -41,6 +46,7 @@ class Intent:
         res.raise_for_status()
         return [IntentCheck(**check) for check in res.json()]
 
+    @instrumented
     def load_intent(self, snapshot_id: str = None):
         """Loads intent checks into the class.
 
@@ -51,6 +57,7 @@ class Intent:
         self.intent_checks = self.get_intent_checks(snapshot_id)
         self.groups = self.get_groups()
 
+    @instrumented
     def get_groups(self) -> list:
         """
 
@@ -61,42 +68,41 @@ class Intent:
         res.raise_for_status()
         return [Group(**group) for group in res.json()]
 
+    def _check_loaded(self, loaded: list):
+        if not loaded:
+            self.load_intent()
+
     @property
     def custom(self):
-        if not self.intent_checks:
-            self.load_intent()
+        self._check_loaded(self.intent_checks)
         return [c for c in self.intent_checks if c.custom]
 
     @property
     def builtin(self):
-        if not self.intent_checks:
-            self.load_intent()
+        self._check_loaded(self.intent_checks)
         return [c for c in self.intent_checks if not c.custom]
 
     @property
     def intent_by_id(self):
-        if not self.intent_checks:
-            self.load_intent()
+        self._check_loaded(self.intent_checks)
         return {c.intent_id: c for c in self.intent_checks}
 
     @property
     def intent_by_name(self):
-        if not self.intent_checks:
-            self.load_intent()
+        self._check_loaded(self.intent_checks)
         return {c.name: c for c in self.intent_checks}
 
     @property
     def group_by_id(self):
-        if not self.groups:
-            self.load_intent()
+        self._check_loaded(self.groups)
         return {g.group_id: g for g in self.groups}
 
     @property
     def group_by_name(self):
-        if not self.groups:
-            self.load_intent()
+        self._check_loaded(self.groups)
         return {g.name: g for g in self.groups}
 
+    @instrumented
     def get_results(self, intent: IntentCheck, color: Union[str, int], snapshot_id: str = None) -> list:
         """Get the outcome of an Intent Check by a specific color
 
@@ -113,6 +119,7 @@ class Intent:
         snapshot_id = snapshot_id or self.snapshot_id
         return self._get_data(intent, snapshot_id, color)
 
+    @instrumented
     def get_all_results(self, intent: IntentCheck, snapshot_id: str = None):
         """set the intent check attributes
 
@@ -137,6 +144,7 @@ class Intent:
             filters={intent.column: ["color", "eq", color]},
         )
 
+    @instrumented
     def compare_snapshot(self, snapshot_id: str, reverse: bool = False) -> list:
         """Compares all intents against another snapshot.
         Current is the snapshot loaded into the class
@@ -157,3 +165,100 @@ class Intent:
                 n = desc if desc != "count" else "total"
                 comparison.append({"name": name, "id": intent.intent_id, "check": n, **value})
         return comparison
+
+
+class AsyncIntent(Intent):
+    """Intent class for the AsyncIPFClient, `await load_intent()` must be called before using the properties"""
+
+    def _check_loaded(self, loaded: list):
+        if not loaded:
+            raise RuntimeError("Intents are not loaded, please `await load_intent()` first.")
+
+    @instrumented
+    async def get_intent_checks(self, snapshot_id: str = None) -> list:
+        """Gets all intent checks and returns a list of them.
+
+        Args:
+        snapshot_id: Optional snapshot ID to get different data
+
+        Returns:
+            list: List of intent checks
+        """
+        snapshot = await self.client.get_snapshot(snapshot_id or self.client.snapshot_id)
+        if snapshot is None:
+            raise ValueError(f"Incorrect Snapshot ID: '{snapshot_id or self.client.snapshot_id}'")
+        if not snapshot.loaded:
+            raise ValueError(f"Snapshot {snapshot.snapshot_id} is not loaded; cannot pull Intent Rules.")
+        if snapshot.disabled_intent_verification is None:
+            await self.client.get_assurance_engine_settings(snapshot)
+        if snapshot.disabled_intent_verification is True:
+            raise ValueError(
+                f"Snapshot {snapshot.snapshot_id} has Intent Verification computation disabled; "
+                f"cannot pull Intent Rules."
+            )
+        res = await self.client.get("reports", params=dict(snapshot=snapshot.snapshot_id))
+        res.raise_for_status()
+        return [IntentCheck(**check) for check in res.json()]
+
+    @instrumented
+    async def load_intent(self, snapshot_id: str = None):
+        """Loads intent checks and groups into the class concurrently.
+
+        Args:
+            snapshot_id: Uses a different Snapshot ID then client
+        """
+        self.snapshot_id = snapshot_id or self.snapshot_id
+        self.intent_checks, self.groups = await asyncio.gather(self.get_intent_checks(snapshot_id), self.get_groups())
+
+    @instrumented
+    async def get_groups(self) -> list:
+        """
+
+        Returns:
+            list: list of groups
+        """
+        res = await self.client.get("reports/groups")
+        res.raise_for_status()
+        return [Group(**group) for group in res.json()]
+
+    @instrumented
+    async def get_all_results(self, intent: IntentCheck, snapshot_id: str = None):
+        """set the intent check attributes, all colors are requested concurrently
+
+        Args:
+            intent: an IntentCheck, please see the Intent Check Model
+            snapshot_id: Uses a different Snapshot ID then client
+
+        Returns:
+            list: List of Dictionary objects.
+        """
+        snapshot_id = snapshot_id or self.snapshot_id
+        colors = [c for c in COLOR_DICT.items() if getattr(intent.result.checks, c[0])]
+        results = await asyncio.gather(*[self._get_data(intent, snapshot_id, color_int) for _, color_int in colors])
+        for (color_str, _), data in zip(colors, results):
+            setattr(intent.result_data, color_str, data)
+        return intent
+
+    @instrumented
+    async def compare_snapshot(self, snapshot_id: str, reverse: bool = False) -> list:
+        """Compares all intents against another snapshot.
+        Current is the snapshot loaded into the class
+        Other is the snapshot specified in this method.  Use reverse=True to flip them.
+
+        Args:
+            snapshot_id: Snapshot ID to compare against this will be the "other" key
+            reverse: Default False, setting to true will flip current and other.
+        Returns:
+            list: List of dictionaries
+        """
+        if not self.intent_checks:
+            await self.load_intent()
+        new_intents = {i.name: i for i in await self.get_intent_checks(snapshot_id)}
+        comparison = list()
+        for name, intent in new_intents.items():
+            old = self.intent_by_name[name].result
+            compare = intent.result.compare(old) if reverse else old.compare(intent.result)
+            for desc, value in compare.items():
+                n = desc if desc != "count" else "total"
+                comparison.append({"name": name, "id": intent.intent_id, "check": n, **value})
+        return comparison
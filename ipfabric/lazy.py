@@ -0,0 +1,36 @@
+import sys
+from importlib import import_module
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def lazy_exports(
+    module: str, exports: Dict[str, str], package: Optional[str] = None
+) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """Module `__getattr__` and `__dir__` (PEP 562) importing each exported name from its module on first access
+
+    Examples:
+        >>> _MODULES = {"Routing": "routing"}
+        >>> __getattr__, __dir__ = lazy_exports(__name__, _MODULES)
+        >>> __all__ = list(_MODULES)
+
+    Args:
+        module: Name of the module exporting the names, `__name__`
+        exports: {name: module defining it relative to `package`}
+        package: Package the modules are relative to, defaults to `module`
+
+    Returns:
+        tuple: (__getattr__, __dir__)
+    """
+    namespace = sys.modules[module].__dict__
+
+    def __getattr__(name: str):
+        if name not in exports:
+            raise AttributeError(f"module '{module}' has no attribute '{name}'")
+        value = getattr(import_module(f".{exports[name]}", package or module), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
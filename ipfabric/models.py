@@ -1,16 +1,26 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from time import sleep
-from typing import Optional, Any, Dict, List, Union
+from typing import Optional, Any, Dict, List, Union, Iterator
 
-import deepdiff
 from pydantic import BaseModel
 
-from ipfabric.technology import *
+from ipfabric.diff import HashEngine, SortOrderError, hash_rows, keyed_diff, merge_diff, history_diff
+from ipfabric.filters import LocalTable
+from ipfabric.instrumentation import carry_context, instrumented
+from ipfabric.lazy import lazy_exports
+from ipfabric import technology
 
 logger = logging.getLogger("ipfabric")
 
+# The technology classes are still importable from models, e.g. `from ipfabric.models import Interfaces`
+__getattr__, __dir__ = lazy_exports(__name__, dict.fromkeys(technology.__all__, "technology"), "ipfabric")
+
 IGNORE_COLUMNS = {"id"}
+COMPARE_MODES = {None, "keyed", "merge"}
+# Table.iter() arguments which can be passed to the keyed and merge compare modes
+STREAM_ARGUMENTS = {"filters", "attr_filters", "reports", "sort", "parallel"}
 
 
 class Table(BaseModel):
@@ -24,6 +34,7 @@ class Table(BaseModel):
     def name(self):
         return self.endpoint.split("/")[-1]
 
+    @instrumented
     def fetch(
         self,
         columns: list = None,
@@ -62,6 +73,7 @@ class Table(BaseModel):
             snapshot=self.snapshot,
         )
 
+    @instrumented
     def all(
         self,
         columns: list = None,
@@ -70,6 +82,10 @@ class Table(BaseModel):
         snapshot_id: Optional[str] = None,
         reports: Optional[str] = None,
         sort: Optional[dict] = None,
+        parallel: bool = False,
+        output: Optional[str] = None,
+        structs: bool = False,
+        resume: bool = False,
     ):
         """Gets all data from corresponding endpoint
 
@@ -79,8 +95,12 @@ class Table(BaseModel):
             snapshot_id: Optional snapshot ID to override class
             reports: String of frontend URL where the reports are displayed
             sort: Dictionary to apply sorting: {"order": "desc", "column": "lastChange"}
+            parallel: Fetch the pages concurrently instead of one after another
+            output: Optional 'arrow', 'pandas' or 'numpy' to return columns instead of a list of rows
+            structs: Decode the rows into msgspec Structs instead of dictionaries, requires msgspec
+            resume: Continue after the rows received by a failed attempt of the same query
         Returns:
-            list: List of Dictionaries
+            list: List of Dictionaries or the columnar `output`
         """
         return self.client.fetch_all(
             self.endpoint,
@@ -91,8 +111,81 @@ class Table(BaseModel):
             reports=reports,
             sort=sort,
             snapshot=self.snapshot,
+            parallel=parallel,
+            output=output,
+            structs=structs,
+            resume=resume,
+        )
+
+    @instrumented
+    def iter(
+        self,
+        columns: list = None,
+        filters: Optional[dict] = None,
+        attr_filters: Optional[Dict[str, List[str]]] = None,
+        snapshot_id: Optional[str] = None,
+        reports: Optional[str] = None,
+        sort: Optional[dict] = None,
+        parallel: bool = False,
+        pages: bool = False,
+    ) -> Iterator:
+        """Streams all data from corresponding endpoint without holding the whole table in memory
+
+        Args:
+            columns: Optional columns to return, default is all
+            filters: Optional filters
+            snapshot_id: Optional snapshot ID to override class
+            reports: String of frontend URL where the reports are displayed
+            sort: Dictionary to apply sorting: {"order": "desc", "column": "lastChange"}
+            parallel: Prefetch pages concurrently instead of a single page
+            pages: Yield a list of rows per page instead of single rows
+        Returns:
+            Iterator: Dictionaries or lists of Dictionaries if pages is True
+        """
+        return self.client.iter_all(
+            self.endpoint,
+            columns=columns,
+            filters=filters,
+            attr_filters=attr_filters,
+            snapshot_id=snapshot_id,
+            reports=reports,
+            sort=sort,
+            snapshot=self.snapshot,
+            parallel=parallel,
+            pages=pages,
+        )
+
+    @instrumented
+    def local(
+        self,
+        columns: list = None,
+        filters: Optional[dict] = None,
+        attr_filters: Optional[Dict[str, List[str]]] = None,
+        snapshot_id: Optional[str] = None,
+        reports: Optional[str] = None,
+        intent_checks: Optional[list] = None,
+    ) -> LocalTable:
+        """Fetches the table once (from the table cache if enabled) to run many filtered views of it locally
+
+        Examples:
+            >>> devices = ipf.inventory.devices.local()
+            >>> devices.all(filters={"vendor": ["like", "cisco"]}, sort={"order": "asc", "column": "hostname"})
+
+        Args:
+            columns: Optional columns to return, default is all
+            filters: Optional filters applied by the API
+            snapshot_id: Optional snapshot ID to override class
+            reports: String of frontend URL where the reports are displayed
+            intent_checks: Optional IntentCheck models of the table used to evaluate color filters locally
+        Returns:
+            LocalTable: Rows which can be queried with `all` and `count`
+        """
+        rows = self.all(
+            columns=columns, filters=filters, attr_filters=attr_filters, snapshot_id=snapshot_id, reports=reports
         )
+        return LocalTable(rows, intent_checks)
 
+    @instrumented
     def count(
         self,
         filters: Optional[dict] = None,
@@ -167,29 +260,18 @@ class Table(BaseModel):
         return list(cols_for_return)
 
     @staticmethod
-    def _hash_data(json_data, unique_keys=None):
+    def _hash_data(json_data, unique_keys=None, hash_engine: Union[str, HashEngine] = None):
         """
-        Hashes data. Turns any data into a string and hashes it, then returns the hash as a key for the data
+        Hashes data. Creates a fingerprint of each row and returns the fingerprint as a key for the data
         Args:
             json_data: list[dict] : List of dictionaries to hash
             unique_keys: list[str] : List of keys to use for hashing
+            hash_engine: str : 'tuple' (default) or 'deephash' for the previous deepdiff.DeepHash fingerprints
 
         Returns:
             dict[str]: dictionary with hash as key and values as the original data
         """
-        # loop over each obj, turn the obj into a string, and hash it
-        return_json = dict()
-        if unique_keys:
-            for dict_obj in json_data:
-                hash_key = {key: dict_obj[key] for key in unique_keys}
-                unique_hash = deepdiff.DeepHash(hash_key)[hash_key]
-                if unique_hash in return_json:
-                    raise KeyError(f"Unique Key(s) {unique_keys} are not unique, please adjust unique_keys input.")
-                return_json[unique_hash] = dict_obj
-        else:
-            for dict_obj in json_data:
-                return_json[deepdiff.DeepHash(dict_obj)[dict_obj]] = dict_obj
-        return return_json
+        return hash_rows(json_data, unique_keys, hash_engine)
 
     @staticmethod
     def _make_set(data: Union[list, set, str] = None):
@@ -200,12 +282,15 @@ class Table(BaseModel):
         else:
             return set(data)
 
+    @instrumented
     def compare(
         self,
         snapshot_id: str = None,
         columns: Union[list, set] = None,
         columns_ignore: Union[list, set, str] = None,
         unique_keys: Union[list, set, str] = None,
+        hash_engine: Union[str, HashEngine] = None,
+        mode: Optional[str] = None,
         **kwargs,
     ):
         """
@@ -215,12 +300,32 @@ class Table(BaseModel):
             columns: list : List of columns to compare. If None, will compare all columns.
             columns_ignore: list : List of columns to ignore. If None, will always ignore 'id' column.
             unique_keys: list : List of columns to use as unique keys. If None, will use all columns as primary key.
-            **kwargs: dict : Optional Table.all() arguments to apply to the table before comparing.
+            hash_engine: str : Row fingerprinting engine, 'tuple' (default) or 'deephash' for the previous behavior.
+            mode: str : 'keyed' matches rows on unique_keys and returns added, removed and changed rows with the
+                        before and after value of each changed column ('id' is only compared if a unique key).
+                        Added and removed rows only contain the unique keys and compared columns. The other
+                        snapshot is indexed as a hash per row and fetched a second time if rows changed or were
+                        removed.
+                        'merge' returns the same result but streams both snapshots sorted by the first unique key
+                        (alphabetically) and merge joins them so memory does not grow with the table size;
+                        falls back to 'keyed' if the server sort order does not match Python ordering.
+            **kwargs: dict : Optional Table.all() arguments to apply to the table before comparing. The keyed and merge
+                             modes stream the rows with Table.iter() and only accept its arguments: filters,
+                             attr_filters, reports, sort (not with merge) and parallel.
 
         Returns:
             dict : dictionary containing the differences between the two snapshots.
                    Possible keys are 'added', 'removed' and 'changed'.
         """
+        if mode not in COMPARE_MODES:
+            raise ValueError(f"Compare mode '{mode}' is not valid, must be one of {COMPARE_MODES}.")
+        if mode and not unique_keys:
+            raise ValueError(f"unique_keys are required for the '{mode}' compare mode.")
+        if mode and set(kwargs) - STREAM_ARGUMENTS:
+            raise ValueError(
+                f"Arguments {sorted(set(kwargs) - STREAM_ARGUMENTS)} can not be used with the '{mode}' compare mode, "
+                f"it accepts {sorted(STREAM_ARGUMENTS)}."
+            )
         return_dict = dict()
 
         # determine which columns to use in query
@@ -229,13 +334,39 @@ class Table(BaseModel):
         unique_keys = self._make_set(unique_keys)
         cols_for_query = self._compare_determine_columns(columns, columns_ignore, unique_keys)
 
+        if mode:
+            value_columns = sorted(c for c in cols_for_query if c not in columns_ignore or c in unique_keys)
+            unique_keys = sorted(unique_keys)
+        if mode == "merge":
+            if "sort" in kwargs:
+                raise ValueError("The 'merge' compare mode sorts by the first unique key, 'sort' can not be used.")
+            sort = dict(order="asc", column=unique_keys[0])
+            try:
+                return merge_diff(
+                    self.iter(snapshot_id=snapshot_id, columns=cols_for_query, sort=sort, **kwargs),
+                    self.iter(columns=cols_for_query, sort=sort, **kwargs),
+                    unique_keys,
+                    value_columns,
+                )
+            except SortOrderError as err:
+                logger.warning(f"{err} Falling back to the 'keyed' compare mode for table {self.name}.")
+        if mode:
+            # Only a hash of the rows of the other snapshot is indexed, it is read again for the changed and removed
+            # rows; the current snapshot is streamed
+            return keyed_diff(
+                lambda: self.iter(snapshot_id=snapshot_id, columns=cols_for_query, **kwargs),
+                self.iter(columns=cols_for_query, **kwargs),
+                unique_keys,
+                value_columns,
+            )
+
         data = self.all(columns=cols_for_query, **kwargs)
         data_compare = self.all(snapshot_id=snapshot_id, columns=cols_for_query, **kwargs)
 
         # since we turned the values into a hash, we can just compare the keys
         if unique_keys:
-            hashed_data_unique = self._hash_data(data, unique_keys)
-            hashed_data_compare_unique = self._hash_data(data_compare, unique_keys)
+            hashed_data_unique = self._hash_data(data, unique_keys, hash_engine)
+            hashed_data_compare_unique = self._hash_data(data_compare, unique_keys, hash_engine)
             changed = [
                 hashed_data_unique[hashed_str]
                 for hashed_str in hashed_data_unique.keys()
@@ -244,8 +375,8 @@ class Table(BaseModel):
             return_dict["changed"] = changed
             return return_dict
         # compare both ways
-        hashed_data = self._hash_data(data)
-        hashed_data_compare = self._hash_data(data_compare)
+        hashed_data = self._hash_data(data, hash_engine=hash_engine)
+        hashed_data_compare = self._hash_data(data_compare, hash_engine=hash_engine)
         added = [
             hashed_data[hashed_str] for hashed_str in hashed_data.keys() if hashed_str not in hashed_data_compare.keys()
         ]
@@ -258,12 +389,66 @@ class Table(BaseModel):
         return_dict["removed"] = removed
         return return_dict
 
+    @instrumented
+    def history(
+        self,
+        snapshots: Optional[List[str]] = None,
+        unique_keys: Union[list, set, str] = None,
+        columns: Union[list, set] = None,
+        columns_ignore: Union[list, set, str] = None,
+        max_workers: Optional[int] = None,
+        **kwargs,
+    ):
+        """
+        Compares a table across many snapshots. Each snapshot is fetched once and concurrently, then consecutive
+        snapshots are diffed like `compare(mode="keyed")`.
+        Args:
+            snapshots: list : Snapshot IDs ordered from the oldest to the newest, defaults to all loaded snapshots.
+            unique_keys: list : List of columns to use as unique keys.
+            columns: list : List of columns to compare. If None, will compare all columns.
+            columns_ignore: list : List of columns to ignore. If None, will always ignore 'id' column.
+            max_workers: int : Number of snapshots fetched at the same time, defaults to the client max_workers.
+            **kwargs: dict : Optional Table.all() arguments to apply to the table before comparing.
+
+        Returns:
+            dict : 'snapshots', 'unique_keys', 'diffs' with the added, removed and changed rows between each pair of
+                   snapshots and 'timeline' with the events of each unique key, see `ipfabric.diff.history_diff`.
+        """
+        if not unique_keys:
+            raise ValueError("unique_keys are required for the history of a table.")
+        if snapshots is None:
+            loaded = {s.snapshot_id: s for s in self.client.loaded_snapshots.values()}
+            snapshots = [s.snapshot_id for s in sorted(loaded.values(), key=lambda s: s.start)]
+        snapshots = list(dict.fromkeys(snapshots))
+
+        columns = self._make_set(columns)
+        columns_ignore = self._make_set(columns_ignore)
+        unique_keys = self._make_set(unique_keys)
+        cols_for_query = self._compare_determine_columns(columns, columns_ignore, unique_keys)
+        value_columns = sorted(c for c in cols_for_query if c not in columns_ignore or c in unique_keys)
+
+        def fetch(snapshot_id):
+            return self.all(snapshot_id=snapshot_id, columns=cols_for_query, **kwargs)
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.client.max_workers) as executor:
+            tables = list(zip(snapshots, executor.map(carry_context(fetch), snapshots)))
+        return history_diff(tables, sorted(unique_keys), value_columns)
+
+
+def _table_properties(obj: BaseModel) -> list:
+    """Returns the values of all properties defined on the class of obj"""
+    return [getattr(obj, name) for name, attr in vars(type(obj)).items() if isinstance(attr, property)]
+
 
 class Inventory(BaseModel):
     """model for inventories"""
 
     client: Any
 
+    def all_tables(self) -> List[Table]:
+        """Returns all Inventory Tables"""
+        return [t for t in _table_properties(self) if isinstance(t, Table)]
+
     @property
     def sites(self):
         return Table(client=self.client, endpoint="/tables/inventory/sites")
@@ -328,97 +513,101 @@ class Inventory(BaseModel):
 class Technology(BaseModel):
     client: Any
 
+    def all_tables(self) -> List[Table]:
+        """Returns the Tables of every Technology"""
+        return [t for tech in _table_properties(self) for t in _table_properties(tech) if isinstance(t, Table)]
+
     @property
     def platforms(self):
-        return Platforms(client=self.client)
+        return technology.Platforms(client=self.client)
 
     @property
     def interfaces(self):
-        return Interfaces(client=self.client)
+        return technology.Interfaces(client=self.client)
 
     @property
     def neighbors(self):
-        return Neighbors(client=self.client)
+        return technology.Neighbors(client=self.client)
 
     @property
     def dhcp(self):
-        return Dhcp(client=self.client)
+        return technology.Dhcp(client=self.client)
 
     @property
     def port_channels(self):
-        return PortChannels(client=self.client)
+        return technology.PortChannels(client=self.client)
 
     @property
     def vlans(self):
-        return Vlans(client=self.client)
+        return technology.Vlans(client=self.client)
 
     @property
     def stp(self):
-        return Stp(client=self.client)
+        return technology.Stp(client=self.client)
 
     @property
     def addressing(self):
-        return Addressing(client=self.client)
+        return technology.Addressing(client=self.client)
 
     @property
     def fhrp(self):
-        return Fhrp(client=self.client)
+        return technology.Fhrp(client=self.client)
 
     @property
     def managed_networks(self):
-        return ManagedNetworks(client=self.client)
+        return technology.ManagedNetworks(client=self.client)
 
     @property
     def mpls(self):
-        return Mpls(client=self.client)
+        return technology.Mpls(client=self.client)
 
     @property
     def multicast(self):
-        return Multicast(client=self.client)
+        return technology.Multicast(client=self.client)
 
     @property
     def cloud(self):
-        return Cloud(client=self.client)
+        return technology.Cloud(client=self.client)
 
     @property
     def management(self):
-        return Management(client=self.client)
+        return technology.Management(client=self.client)
 
     @property
     def ip_telephony(self):
-        return IpTelephony(client=self.client)
+        return technology.IpTelephony(client=self.client)
 
     @property
     def load_balancing(self):
-        return LoadBalancing(client=self.client)
+        return technology.LoadBalancing(client=self.client)
 
     @property
     def oam(self):
-        return Oam(client=self.client)
+        return technology.Oam(client=self.client)
 
     @property
     def qos(self):
-        return Qos(client=self.client)
+        return technology.Qos(client=self.client)
 
     @property
     def routing(self):
-        return Routing(client=self.client)
+        return technology.Routing(client=self.client)
 
     @property
     def sdn(self):
-        return Sdn(client=self.client)
+        return technology.Sdn(client=self.client)
 
     @property
     def sdwan(self):
-        return Sdwan(client=self.client)
+        return technology.Sdwan(client=self.client)
 
     @property
     def security(self):
-        return Security(client=self.client)
+        return technology.Security(client=self.client)
 
     @property
     def wireless(self):
-        return Wireless(client=self.client)
+        return technology.Wireless(client=self.client)
 
 
 class Jobs(BaseModel):
@@ -0,0 +1,129 @@
+import logging
+from threading import Lock
+from typing import Optional, Dict, List, Tuple
+
+import httpx
+
+logger = logging.getLogger("ipfabric")
+
+DEFAULT_PAGE_SIZE = 1000
+MIN_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 10000
+TARGET_LATENCY = 5.0
+TARGET_BYTES = 8 * 1024**2
+
+# Starting page sizes of tables known to be slow with the default page size
+PAGE_HINTS = {
+    "tables/interfaces/transceivers/statistics": 250,
+    "tables/interfaces/transceivers/errors": 250,
+    "tables/interfaces/errors/detailed": 500,
+    "tables/interfaces/drops/detailed": 500,
+    "tables/interfaces/load/detailed": 500,
+}
+
+
+class PageSizer:
+    """
+    Adapts the page size of each endpoint (and number of columns) to the response times of the server.
+    The page size doubles while full pages are returned in less than half of the latency and size targets, it is
+    halved when a page is slower or larger than the targets or when a request times out or fails with a server error.
+    After a failure the page size of the endpoint never grows back to the size which failed.
+    """
+
+    def __init__(
+        self,
+        default: int = DEFAULT_PAGE_SIZE,
+        minimum: int = MIN_PAGE_SIZE,
+        maximum: int = MAX_PAGE_SIZE,
+        target_latency: float = TARGET_LATENCY,
+        target_bytes: int = TARGET_BYTES,
+        hints: Optional[Dict[str, int]] = None,
+    ):
+        self.default, self.minimum, self.maximum = default, minimum, maximum
+        self.target_latency, self.target_bytes = target_latency, target_bytes
+        self.hints = dict(PAGE_HINTS, **(hints or dict()))
+        self.limits: Dict[Tuple[str, int], int] = dict()
+        self.ceilings: Dict[Tuple[str, int], int] = dict()
+        self._lock = Lock()
+
+    @staticmethod
+    def _key(url: str, columns: Optional[List[str]]) -> Tuple[str, int]:
+        return url.strip("/"), len(columns or list())
+
+    def _hint(self, url: str) -> int:
+        return self.hints.get(url.strip("/"), self.default)
+
+    def limit(self, url: str, columns: Optional[List[str]] = None) -> int:
+        """Returns the page size to request for an endpoint"""
+        key = self._key(url, columns)
+        with self._lock:
+            if key not in self.limits:
+                self.limits[key] = max(self.minimum, min(self.maximum, self._hint(url)))
+            return self.limits[key]
+
+    def _set(self, key: Tuple[str, int], limit: int) -> bool:
+        limit = max(self.minimum, min(self.maximum, limit))
+        if limit == self.limits.get(key):
+            return False
+        logger.debug(f"Page size of '{key[0]}' with {key[1]} columns changed from {self.limits.get(key)} to {limit}.")
+        self.limits[key] = limit
+        return True
+
+    def record(self, url: str, columns: Optional[List[str]], limit: int, rows: int, latency: float, size: int):
+        """Adapts the page size of an endpoint after a successful request
+
+        Args:
+            url: Endpoint
+            columns: Columns of the request
+            limit: Page size requested
+            rows: Number of rows returned
+            latency: Seconds the request took
+            size: Bytes of the response
+        """
+        key = self._key(url, columns)
+        with self._lock:
+            current = self.limits.get(key, limit)
+            if latency > self.target_latency or size > self.target_bytes:
+                self._set(key, min(current, limit // 2))
+            elif rows == limit == current and latency < self.target_latency / 2 and size < self.target_bytes / 2:
+                self._set(key, min(limit * 2, self.ceilings.get(key, self.maximum)))
+
+    def capped(self, url: str, columns: Optional[List[str]], rows: int):
+        """Limits the page size of an endpoint to the number of rows the server returns per page
+
+        Args:
+            url: Endpoint
+            columns: Columns of the request
+            rows: Number of rows returned for a larger page which was not the last one
+        """
+        key = self._key(url, columns)
+        with self._lock:
+            self.ceilings[key] = min(self.ceilings.get(key, self.maximum), max(self.minimum, rows))
+            if self._set(key, min(self.limits.get(key, rows), rows)):
+                logger.info(f"Server returned {rows} rows per page for '{key[0]}', limiting the page size.")
+
+    def failed(self, url: str, columns: Optional[List[str]], limit: int, error: Exception) -> bool:
+        """Reduces the page size after a timeout or server error
+
+        Args:
+            url: Endpoint
+            columns: Columns of the request
+            limit: Page size requested
+            error: Exception raised by the request
+
+        Returns:
+            bool: True if the request can be retried with a smaller page size
+        """
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code < 500 or limit <= self.minimum:
+            return False
+        key = self._key(url, columns)
+        with self._lock:
+            self.ceilings[key] = min(self.ceilings.get(key, self.maximum), max(self.minimum, limit // 2))
+            self._set(key, min(self.limits.get(key, limit), limit // 2))
+        logger.warning(f"Page of {limit} rows from '{url}' failed ({error}), retrying with smaller pages.")
+        return True
+
+
+def response_size(response) -> int:
+    content = getattr(response, "content", None)
+    return len(content) if isinstance(content, bytes) else 0
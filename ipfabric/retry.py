@@ -0,0 +1,177 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Any, Dict, List, Union
+from uuid import UUID
+
+import httpx
+
+logger = logging.getLogger("ipfabric")
+
+DEFAULT_RETRIES = 3
+RETRY_STATUSES = {429, 502, 503, 504}
+TRANSIENT_ERRORS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+# POST requests which only read data and can safely be sent again
+IDEMPOTENT_POSTS = re.compile(r"(^|/)(tables|graphs)/")
+MAX_CHECKPOINTS = 8
+MAX_CHECKPOINT_ROWS = 1_000_000
+CHECKPOINT_TTL = 600
+
+
+class RetryPolicy:
+    """
+    Retries idempotent requests (GET and table POST queries) which fail with a timeout, a connection error or a
+    429, 502, 503 or 504 status using exponential backoff with full jitter; `Retry-After` headers are honoured.
+    """
+
+    def __init__(
+        self,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        statuses: Optional[set] = None,
+        jitter: bool = True,
+    ):
+        self.retries, self.backoff, self.max_backoff, self.jitter = retries, backoff, max_backoff, jitter
+        self.statuses = RETRY_STATUSES if statuses is None else set(statuses)
+
+    @staticmethod
+    def idempotent(method: str, url: Union[httpx.URL, str]) -> bool:
+        method = method.upper()
+        return method in IDEMPOTENT_METHODS or (method == "POST" and IDEMPOTENT_POSTS.search(str(url)) is not None)
+
+    def retry_response(self, attempt: int, response: httpx.Response) -> bool:
+        return attempt < self.retries and response.status_code in self.statuses
+
+    def retry_error(self, attempt: int, error: Exception) -> bool:
+        return attempt < self.retries and isinstance(error, TRANSIENT_ERRORS)
+
+    def delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Returns the seconds to wait before the next attempt"""
+        retry_after = retry_after_seconds(response)
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        delay = min(self.max_backoff, self.backoff * 2**attempt)
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+def retry_after_seconds(response: Optional[httpx.Response]) -> Optional[float]:
+    """Returns the seconds of a `Retry-After` header in seconds format, HTTP dates are ignored"""
+    value = response.headers.get("Retry-After", None) if response is not None else None
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def get_retry_policy(retries: Union[int, RetryPolicy, None]) -> Optional[RetryPolicy]:
+    if isinstance(retries, RetryPolicy):
+        return retries
+    return RetryPolicy(retries) if retries else None
+
+
+class PagerCheckpoint:
+    """Rows collected by a pager which failed and the offset to resume from"""
+
+    def __init__(self, start: int, data: Optional[list] = None):
+        self.start = start
+        self.data = data if data is not None else list()
+        self.created = time.monotonic()
+
+    def __repr__(self):
+        return f"PagerCheckpoint(start={self.start}, rows={len(self.data)})"
+
+
+def checkpoint_key(url: str, payload: dict, start: int, typed: bool = False) -> str:
+    query: Dict[str, Any] = {k: v for k, v in payload.items() if k != "pagination"}
+    return json.dumps([url.strip("/"), query, start, typed], sort_keys=True, default=str)
+
+
+def pinned_snapshot(payload: dict) -> bool:
+    """True if the query reads a snapshot by ID, references like $last and snapshot=False tables can change"""
+    try:
+        UUID(str(payload.get("snapshot")))
+        return True
+    except ValueError:
+        return False
+
+
+class Checkpoints:
+    """
+    Checkpoints of failed pagers by query, the same query called with `resume=True` continues from the last page
+    received. Only queries of a snapshot ID are kept, at most `max_checkpoints` with `max_rows` rows in total for
+    `ttl` seconds (the oldest are dropped first).
+    """
+
+    def __init__(
+        self,
+        max_checkpoints: int = MAX_CHECKPOINTS,
+        max_rows: int = MAX_CHECKPOINT_ROWS,
+        ttl: float = CHECKPOINT_TTL,
+    ):
+        self.max_checkpoints, self.max_rows, self.ttl = max_checkpoints, max_rows, ttl
+        self._checkpoints: Dict[str, PagerCheckpoint] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._checkpoints)
+
+    @property
+    def rows(self) -> int:
+        with self._lock:
+            return self._rows()
+
+    def _rows(self) -> int:
+        return sum(len(checkpoint.data) for checkpoint in self._checkpoints.values())
+
+    def expire(self):
+        """Removes the checkpoints older than `ttl`"""
+        with self._lock:
+            self._expire()
+
+    def _expire(self):
+        now = time.monotonic()
+        for key in [k for k, checkpoint in self._checkpoints.items() if now - checkpoint.created > self.ttl]:
+            del self._checkpoints[key]
+
+    def pop(self, key: str, start: int, resume: bool = False) -> PagerCheckpoint:
+        """Returns the checkpoint of the query if resume else a new one, a previous checkpoint is always removed"""
+        with self._lock:
+            self._expire()
+            checkpoint = self._checkpoints.pop(key, None)
+        if checkpoint and resume:
+            logger.info(f"Resuming pager from offset {checkpoint.start} with {len(checkpoint.data)} rows.")
+            return checkpoint
+        return PagerCheckpoint(start)
+
+    def save(self, key: str, payload: dict, checkpoint: PagerCheckpoint, error: Exception):
+        if not checkpoint.data or not pinned_snapshot(payload):
+            return
+        if len(checkpoint.data) > self.max_rows or not self.max_checkpoints:
+            logger.warning(f"Pager failed at offset {checkpoint.start} ({error!r}), the rows received are not kept.")
+            return
+        logger.warning(
+            f"Pager failed at offset {checkpoint.start} ({error!r}), {len(checkpoint.data)} rows are kept for "
+            f"{self.ttl:g}s and the same query with resume=True continues from this offset."
+        )
+        with self._lock:
+            self._expire()
+            self._checkpoints.pop(key, None)
+            self._checkpoints[key] = checkpoint
+            while len(self._checkpoints) > self.max_checkpoints or self._rows() > self.max_rows:
+                self._checkpoints.popitem(last=False)
+
+    def clear(self, url: Optional[str] = None):
+        """Removes all checkpoints or the ones of an endpoint"""
+        with self._lock:
+            if url is None:
+                self._checkpoints.clear()
+                return
+            keys: List[str] = [k for k in self._checkpoints if json.loads(k)[0] == url.strip("/")]
+            for key in keys:
+                del self._checkpoints[key]
@@ -1,41 +1,51 @@
-from .api_tokens import APIToken
-from .attributes import Attributes
-from .authentication import Authentication
-from .seeds import Seeds
-from .site_separation import SiteSeparation
-from .user_mgmt import UserMgmt
-from .vendor_api import VendorAPI
-from .vendor_api_models import (
-    AWS,
-    AWS_REGIONS,
-    Azure,
-    CheckPointApiKey,
-    CheckPointUserAuth,
-    CiscoFMC,
-    Merakiv1,
-    NSXT,
-    SilverPeak,
-    Versa,
-    Viptela,
-)
+from typing import TYPE_CHECKING
 
-__all__ = [
-    "Authentication",
-    "Seeds",
-    "APIToken",
-    "UserMgmt",
-    "Attributes",
-    "VendorAPI",
-    "AWS",
-    "AWS_REGIONS",
-    "Azure",
-    "CheckPointApiKey",
-    "CheckPointUserAuth",
-    "CiscoFMC",
-    "Merakiv1",
-    "NSXT",
-    "SilverPeak",
-    "Versa",
-    "Viptela",
-    "SiteSeparation",
-]
+from ipfabric.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .api_tokens import APIToken
+    from .attributes import Attributes
+    from .authentication import Authentication
+    from .seeds import Seeds
+    from .site_separation import SiteSeparation
+    from .user_mgmt import UserMgmt
+    from .vendor_api import VendorAPI
+    from .vendor_api_models import (
+        AWS,
+        AWS_REGIONS,
+        Azure,
+        CheckPointApiKey,
+        CheckPointUserAuth,
+        CiscoFMC,
+        Merakiv1,
+        NSXT,
+        SilverPeak,
+        Versa,
+        Viptela,
+    )
+
+# Settings modules are imported on first use (PEP 562), the clients only need `user_mgmt.User`
+_MODULES = {
+    "APIToken": "api_tokens",
+    "Attributes": "attributes",
+    "Authentication": "authentication",
+    "Seeds": "seeds",
+    "SiteSeparation": "site_separation",
+    "UserMgmt": "user_mgmt",
+    "VendorAPI": "vendor_api",
+    "AWS": "vendor_api_models",
+    "AWS_REGIONS": "vendor_api_models",
+    "Azure": "vendor_api_models",
+    "CheckPointApiKey": "vendor_api_models",
+    "CheckPointUserAuth": "vendor_api_models",
+    "CiscoFMC": "vendor_api_models",
+    "Merakiv1": "vendor_api_models",
+    "NSXT": "vendor_api_models",
+    "SilverPeak": "vendor_api_models",
+    "Versa": "vendor_api_models",
+    "Viptela": "vendor_api_models",
+}
+
+
+__getattr__, __dir__ = lazy_exports(__name__, _MODULES)
+__all__ = list(_MODULES)
@@ -31,6 +31,13 @@ class Attributes:
     def post_endpoint(self):
         return "tables/snapshot-attributes" if self.snapshot_id else "tables/global-attributes"
 
+    def _invalidate_cache(self):
+        """Removes cached results of the attribute table after a change"""
+        if self.snapshot_id:
+            self.client.invalidate_table_cache([self.snapshot_id], endpoint=self.post_endpoint)
+        else:
+            self.client.invalidate_result_cache(self.post_endpoint)
+
     @staticmethod
     def check_attribute_name(attributes: set):
         invalid = list()
@@ -84,6 +91,7 @@ class Attributes:
         if self.snapshot_id:
             return self.set_attributes_by_sn([attribute])
         resp = self.client.post(self.endpoint, json=attribute)
+        self._invalidate_cache()
         resp.raise_for_status()
         return resp.json()
 
@@ -99,6 +107,7 @@ class Attributes:
         if self.snapshot_id:
             payload["snapshot"] = self.snapshot_id
         resp = self.client.put(self.endpoint, json=payload)
+        self._invalidate_cache()
         resp.raise_for_status()
         return resp.json()
 
@@ -132,6 +141,7 @@ class Attributes:
         if self.snapshot_id:
             payload["snapshot"] = self.snapshot_id
         resp = self.client.request("DELETE", self.endpoint, json=payload)
+        self._invalidate_cache()
         resp.raise_for_status()
         return True
 
@@ -145,6 +155,7 @@ class Attributes:
         if self.snapshot_id:
             payload["snapshot"] = self.snapshot_id
         resp = self.client.request("DELETE", self.endpoint, json=payload)
+        self._invalidate_cache()
         resp.raise_for_status()
         return True
 
@@ -1,7 +1,6 @@
 import logging
 from typing import Any, Optional
 
-import pytz
 from pydantic import Field, BaseModel
 
 logger = logging.getLogger("ipfabric")
@@ -122,6 +121,8 @@ class UserMgmt:
             "password": password,
             "roleIds": roles,
         }
+        import pytz
+
         if timezone not in pytz.all_timezones:
             raise ValueError(
                 f"Timezone {timezone} is not located. This is case sensitive please see pytz.all_timezones."
@@ -118,6 +118,7 @@ class Snapshot(BaseModel):
         ts = int(datetime.now().timestamp() * 1000)
         res = ipf.post("snapshots/unload", json=[dict(jobDetail=ts, id=self.snapshot_id)])
         res.raise_for_status()
+        ipf.invalidate_table_cache([self.snapshot_id])
         if wait_for_unload:
             job = Jobs(client=ipf)
             if not job.check_snapshot_unload_job(self.snapshot_id, ts, retry, timeout):
@@ -236,6 +237,9 @@ class Snapshot(BaseModel):
         if settings is None:
             logger.error(f"Could not get Snapshot {self.snapshot_id} Settings to verify Assurance Engine tasks.")
             return None
+        return self._set_assurance_engine_settings(settings)
+
+    def _set_assurance_engine_settings(self, settings: dict):
         disabled = settings.get("disabledPostDiscoveryActions", list())
         self.disabled_graph_cache = True if "graphCache" in disabled else False
         self.disabled_historical_data = True if "historicalData" in disabled else False
@@ -1,49 +1,59 @@
-from .addressing import Addressing
-from .cloud import Cloud
-from .dhcp import Dhcp
-from .fhrp import Fhrp
-from .interfaces import Interfaces
-from .ip_telephony import IpTelephony
-from .load_balancing import LoadBalancing
-from .managed_networks import ManagedNetworks
-from .management import Management
-from .mpls import Mpls
-from .multicast import Multicast
-from .neighbors import Neighbors
-from .oam import Oam
-from .platforms import Platforms
-from .port_channels import PortChannels
-from .qos import Qos
-from .routing import Routing
-from .sdn import Sdn
-from .sdwan import Sdwan
-from .security import Security
-from .stp import Stp
-from .vlans import Vlans
-from .wireless import Wireless
+from typing import TYPE_CHECKING
 
-__all__ = [
-    "Addressing",
-    "Dhcp",
-    "Fhrp",
-    "Interfaces",
-    "Management",
-    "ManagedNetworks",
-    "Mpls",
-    "Multicast",
-    "Neighbors",
-    "Platforms",
-    "PortChannels",
-    "Routing",
-    "Stp",
-    "Vlans",
-    "Cloud",
-    "IpTelephony",
-    "LoadBalancing",
-    "Oam",
-    "Qos",
-    "Sdn",
-    "Sdwan",
-    "Security",
-    "Wireless",
-]
+from ipfabric.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .addressing import Addressing
+    from .cloud import Cloud
+    from .dhcp import Dhcp
+    from .fhrp import Fhrp
+    from .interfaces import Interfaces
+    from .ip_telephony import IpTelephony
+    from .load_balancing import LoadBalancing
+    from .managed_networks import ManagedNetworks
+    from .management import Management
+    from .mpls import Mpls
+    from .multicast import Multicast
+    from .neighbors import Neighbors
+    from .oam import Oam
+    from .platforms import Platforms
+    from .port_channels import PortChannels
+    from .qos import Qos
+    from .routing import Routing
+    from .sdn import Sdn
+    from .sdwan import Sdwan
+    from .security import Security
+    from .stp import Stp
+    from .vlans import Vlans
+    from .wireless import Wireless
+
+# Technology modules are imported on first use of their class (PEP 562)
+_MODULES = {
+    "Addressing": "addressing",
+    "Cloud": "cloud",
+    "Dhcp": "dhcp",
+    "Fhrp": "fhrp",
+    "Interfaces": "interfaces",
+    "IpTelephony": "ip_telephony",
+    "LoadBalancing": "load_balancing",
+    "ManagedNetworks": "managed_networks",
+    "Management": "management",
+    "Mpls": "mpls",
+    "Multicast": "multicast",
+    "Neighbors": "neighbors",
+    "Oam": "oam",
+    "Platforms": "platforms",
+    "PortChannels": "port_channels",
+    "Qos": "qos",
+    "Routing": "routing",
+    "Sdn": "sdn",
+    "Sdwan": "sdwan",
+    "Security": "security",
+    "Stp": "stp",
+    "Vlans": "vlans",
+    "Wireless": "wireless",
+}
+
+
+__getattr__, __dir__ = lazy_exports(__name__, _MODULES)
+__all__ = list(_MODULES)
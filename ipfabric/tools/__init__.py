@@ -1,15 +1,25 @@
-from .configuration import DeviceConfigs
-from .discovery_history import DiscoveryHistory
-from .restore_intents import RestoreIntents
-from .shared import parse_mac
-from .site_seperation_report import map_devices_to_rules
-from .vulnerabilities import Vulnerabilities
-
-__all__ = [
-    "DeviceConfigs",
-    "Vulnerabilities",
-    "RestoreIntents",
-    "DiscoveryHistory",
-    "map_devices_to_rules",
-    "parse_mac",
-]
+from typing import TYPE_CHECKING
+
+from ipfabric.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .configuration import DeviceConfigs
+    from .discovery_history import DiscoveryHistory
+    from .restore_intents import RestoreIntents
+    from .shared import parse_mac
+    from .site_seperation_report import map_devices_to_rules
+    from .vulnerabilities import Vulnerabilities
+
+# Tools are imported on first use (PEP 562) so `DeviceConfigs` does not load the factory default intents
+_MODULES = {
+    "DeviceConfigs": "configuration",
+    "DiscoveryHistory": "discovery_history",
+    "RestoreIntents": "restore_intents",
+    "parse_mac": "shared",
+    "map_devices_to_rules": "site_seperation_report",
+    "Vulnerabilities": "vulnerabilities",
+}
+
+
+__getattr__, __dir__ = lazy_exports(__name__, _MODULES)
+__all__ = list(_MODULES)
@@ -7,6 +7,7 @@ from typing import Any, Union, Optional
 from pydantic import BaseModel, Field
 from pydantic.dataclasses import dataclass
 
+from ipfabric.instrumentation import instrumented
 from ipfabric.tools.shared import date_parser
 
 logger = logging.getLogger("ipfabric")
@@ -27,6 +28,7 @@ class Config(BaseModel):
 class DeviceConfigs:
     ipf: Any
 
+    @instrumented
     def get_all_configurations(self, device: Optional[str] = None, sn: Optional[str] = None) -> dict:
         """Get all configurations in IP Fabric
 
@@ -97,6 +99,7 @@ class DeviceConfigs:
             logger.warning(f"Could not find a matching IP for '{ip}'.")
         return {"hostname": None, "sn": None}
 
+    @instrumented
     def get_configuration(
         self, device: str = None, sn: str = None, sanitized: bool = True, date: Union[str, tuple] = "$last"
     ) -> str:
@@ -128,6 +131,7 @@ class DeviceConfigs:
             logger.error(f"Could not find a configuration with date {date}")
             return None
 
+    @instrumented
     def get_text_config(self, cfg: Config, sanitized: bool = True) -> str:
         """gets a devices config
         Args:
@@ -180,6 +184,7 @@ class DeviceConfigs:
             logger.warning(f"Found multiple devices matching '{device}'.")
         return {"hostname": None, "sn": None}
 
+    @instrumented
     def get_log(self, device: str, snapshot_id: str = None):
         device = self._validate_device(device, snapshot_id=snapshot_id, log=True)
         if not device["sn"]:
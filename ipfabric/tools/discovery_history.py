@@ -105,6 +105,7 @@ class DiscoveryHistory:
             history_id = [history_id]
 
         resp = self.ipf.request("DELETE", "discovery/history", json=history_id)
+        self.ipf.invalidate_result_cache("tables/inventory/discovery-history")
         resp.raise_for_status()
         logger.debug("Deleted the following discovery history IDs:")
         logger.debug(f"{history_id}")
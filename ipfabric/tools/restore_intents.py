@@ -1,10 +1,14 @@
 import importlib.resources
 import json
 import logging
+import zlib
 from collections import OrderedDict
+from collections.abc import Mapping
 from datetime import datetime
+from functools import lru_cache
 from os import path
-from typing import Any, Union
+from pathlib import Path
+from typing import Any, Union, Optional
 
 from pydantic.dataclasses import dataclass
 
@@ -13,28 +17,77 @@ logger = logging.getLogger("ipfabric")
 INTENTS = "intents.json"
 GROUPS = "groups.json"
 DASHBOARD = "dashboard.json"
+COMPACT = "defaults.json.gz"
 
 V4_4_PATH = "ipfabric.tools.factory_defaults.v4.4"
 V5_0_PATH = "ipfabric.tools.factory_defaults.v5.0"
 V6_0_PATH = "ipfabric.tools.factory_defaults.v6.0"
+DEFAULT_PATHS = {"v4.4": V4_4_PATH, "v5.0": V5_0_PATH, "v6.0": V6_0_PATH}
 
-DEFAULT_SETUP = {
-    "v4.4": {
-        "intents": json.loads(importlib.resources.read_text(V4_4_PATH, INTENTS)),
-        "groups": json.loads(importlib.resources.read_text(V4_4_PATH, GROUPS)),
-        "dashboard": json.loads(importlib.resources.read_text(V4_4_PATH, DASHBOARD), object_pairs_hook=OrderedDict),
-    },
-    "v5.0": {
-        "intents": json.loads(importlib.resources.read_text(V5_0_PATH, INTENTS)),
-        "groups": json.loads(importlib.resources.read_text(V5_0_PATH, GROUPS)),
-        "dashboard": json.loads(importlib.resources.read_text(V5_0_PATH, DASHBOARD), object_pairs_hook=OrderedDict),
-    },
-    "v6.0": {
-        "intents": json.loads(importlib.resources.read_text(V6_0_PATH, INTENTS)),
-        "groups": json.loads(importlib.resources.read_text(V6_0_PATH, GROUPS)),
-        "dashboard": json.loads(importlib.resources.read_text(V6_0_PATH, DASHBOARD), object_pairs_hook=OrderedDict),
-    },
-}
+
+@lru_cache(maxsize=None)
+def load_defaults(version: str) -> dict:
+    """Reads the factory default intents, groups and dashboard of a version once, from the compact form if compiled
+
+    Args:
+        version: Version in DEFAULT_PATHS like 'v6.0'
+
+    Returns:
+        dict: {"intents": list, "groups": list, "dashboard": OrderedDict}
+    """
+    package = DEFAULT_PATHS[version]
+    if importlib.resources.is_resource(package, COMPACT):
+        lines = zlib.decompress(importlib.resources.read_binary(package, COMPACT), 31).split(b"\n")
+    else:
+        lines = [importlib.resources.read_binary(package, f) for f in (INTENTS, GROUPS, DASHBOARD)]
+    return {
+        "intents": json.loads(lines[0]),
+        "groups": json.loads(lines[1]),
+        "dashboard": json.loads(lines[2], object_pairs_hook=OrderedDict),
+    }
+
+
+def compile_defaults(version: str, directory: Optional[Union[str, Path]] = None) -> Path:
+    """Writes the defaults of a version as minified JSON lines compressed with gzip (about 6 times smaller) which
+    `load_defaults` reads instead of the JSON files when the file is in the package directory of the version
+
+    Args:
+        version: Version in DEFAULT_PATHS like 'v6.0'
+        directory: Output directory, defaults to the package directory of the version
+
+    Returns:
+        Path: Compiled file
+    """
+    package_dir = Path(__file__).parent.joinpath(*DEFAULT_PATHS[version].split(".")[2:])
+    defaults = load_defaults(version)
+    data = b"\n".join(
+        json.dumps(defaults[k], separators=(",", ":")).encode() for k in ("intents", "groups", "dashboard")
+    )
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+    filename = Path(directory or package_dir, COMPACT)
+    filename.write_bytes(compressor.compress(data) + compressor.flush())
+    return filename
+
+
+class DefaultSetup(Mapping):
+    """{version: defaults} loading the defaults of a version on first access"""
+
+    def __getitem__(self, version: str) -> dict:
+        if version not in DEFAULT_PATHS:
+            raise KeyError(version)
+        return load_defaults(version)
+
+    def __contains__(self, version) -> bool:
+        return version in DEFAULT_PATHS
+
+    def __iter__(self):
+        return iter(DEFAULT_PATHS)
+
+    def __len__(self):
+        return len(DEFAULT_PATHS)
+
+
+DEFAULT_SETUP = DefaultSetup()
 
 
 @dataclass
@@ -60,7 +113,7 @@ class RestoreIntents:
         self._restore(intents, groups, dashboard)
 
     def restore_default(self, version=None):
-        v = version.lower() or "v" + str(self.ipf.os_version)[0:3]
+        v = version.lower() if version else "v" + str(self.ipf.os_version)[0:3]
         if v not in DEFAULT_SETUP:
             logger.critical(f"Version {v} not in Defaults {list(DEFAULT_SETUP)}.")
             exit()
@@ -107,7 +160,8 @@ class RestoreIntents:
         intent_mapping = {i["id"]: None for i in intents}
         logger.info("Creating Intent Verification Rules.")
         for i in intents:
-            i["groups"] = []
+            # Copies, the defaults are shared by every restore of the same version
+            i = dict(i, groups=[])
             i.pop("custom", None)
             src_id = i.pop("id", None)
             res = self.ipf.post("reports", json=i)
@@ -118,8 +172,7 @@ class RestoreIntents:
         group_mapping = {g["id"]: None for g in groups}
         logger.info("Creating Intent Groups.")
         for g in groups:
-            for c in g["children"]:
-                c["id"] = intent_mapping[c["id"]]
+            g = dict(g, children=[dict(c, id=intent_mapping[c["id"]]) for c in g["children"]])
             src_id = g.pop("id", None)
             g.pop("custom", None)
             res = self.ipf.post("reports/groups", json=g)
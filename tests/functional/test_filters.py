@@ -0,0 +1,40 @@
+import os
+import unittest
+
+from ipfabric import IPFClient
+from ipfabric.filters import query_rows
+
+os.environ["IPF_VERIFY"] = "false"
+
+condition = False if os.getenv("IPF_TOKEN", None) and os.getenv("IPF_URL", None) else True
+
+COLUMNS = ["sn", "hostname", "siteName", "vendor", "platform", "uptime", "loginIp", "memoryUtilization"]
+FILTERS = [
+    {"vendor": ["eq", "cisco"]},
+    {"vendor": ["neq", "cisco"]},
+    {"hostname": ["like", "L"]},
+    {"hostname": ["notlike", "L"]},
+    {"hostname": ["ieq", "l1r1"]},
+    {"hostname": ["reg", "^L[0-9]"]},
+    {"hostname": ["ireg", "^l[0-9]"]},
+    {"uptime": ["gte", 86400]},
+    {"uptime": ["lt", 86400]},
+    {"memoryUtilization": ["empty", True]},
+    {"loginIp": ["sect", "10.0.0.0/8"]},
+    {"or": [{"vendor": ["eq", "arista"]}, {"and": [{"vendor": ["eq", "cisco"]}, {"uptime": ["gt", 3600]}]}]},
+]
+
+
+@unittest.skipIf(condition, "IPF_URL and IPF_TOKEN not set")
+class Conformance(unittest.TestCase):
+    def test_filters(self):
+        ipf = IPFClient(timeout=15)
+        rows = ipf.inventory.devices.all(columns=COLUMNS)
+        sort = {"order": "asc", "column": "sn"}
+        for filters in FILTERS:
+            server = ipf.inventory.devices.all(columns=COLUMNS, filters=filters, sort=sort)
+            self.assertEqual(query_rows(rows, filters=filters, sort=sort), server, msg=filters)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,6 +16,14 @@ class TestAttributes(unittest.TestCase):
         ipf_attr = Attributes(ipf, snapshot_id='$last')
         self.assertEqual(ipf_attr.snapshot_id, 'TEST')
 
+    def test_invalidate_cache(self):
+        self.ipf_attr.delete_attribute_by_sn('a23ffc0')
+        self.ipf_attr.client.invalidate_result_cache.assert_called_once_with('tables/global-attributes')
+        ipf_attr = Attributes(MagicMock(), snapshot_id=None)
+        ipf_attr.snapshot_id = 'TEST'
+        ipf_attr.set_attributes_by_sn([dict(sn='a23ffc0', name='siteName', value='HQ')])
+        ipf_attr.client.invalidate_table_cache.assert_called_once_with(['TEST'], endpoint='tables/snapshot-attributes')
+
     def test_check_attribute_name_fail(self):
         with self.assertRaises(NameError) as err:
             self.ipf_attr.check_attribute_name({'_BAD-NAME'})
@@ -0,0 +1,153 @@
+import asyncio
+import unittest
+from importlib.util import find_spec
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from ipfabric import AsyncIPFClient
+from ipfabric.intent import AsyncIntent
+from ipfabric.settings.user_mgmt import User
+from ipfabric.snapshot_models import Snapshot
+
+SNAPSHOT = {
+    "name": None,
+    "locked": False,
+    "status": "done",
+    "totalDevCount": 642,
+    "licensedDevCount": 600,
+    "tsEnd": 1637156346509,
+    "tsStart": 1637154608164,
+    "id": "631ac652-1f72-417f-813f-b8a8c8730157",
+    "version": "4.1.1",
+    "initialVersion": "3.8.0",
+    "sites": ["BRANCH"],
+    "errors": [],
+    "loadedSize": 10,
+    "unloadedSize": 0,
+    "fromArchive": True,
+    "loading": False,
+    "finishStatus": "done",
+    "userCount": 10,
+    "interfaceActiveCount": 10,
+    "interfaceCount": 10,
+    "interfaceEdgeCount": 10,
+    "deviceAddedCount": 10,
+    "deviceRemovedCount": 10,
+}
+
+
+def page_response(rows, cap=None):
+    async def post(url, json):
+        resp = MagicMock()
+        if "pagination" in json:
+            start, limit = json["pagination"]["start"], min(json["pagination"]["limit"], cap or len(rows) + 1)
+            resp.json.return_value = {"data": rows[start : start + limit], "_meta": {"count": len(rows)}}
+        return resp
+
+    return post
+
+
+class AsyncClient(unittest.TestCase):
+    @patch("ipfabric.AsyncIPFClient.get_snapshots", new_callable=AsyncMock)
+    @patch("ipfabric.AsyncIPFClient.get_user", new_callable=AsyncMock)
+    @patch("ipfabric.AsyncIPFClient.check_version", new_callable=AsyncMock)
+    def setUp(self, check_version, get_user, snaps):
+        snap = Snapshot(**SNAPSHOT)
+        snaps.return_value = {"$last": snap, snap.snapshot_id: snap}
+        check_version.return_value = ("v5", "5.0.1")
+        get_user.return_value = User(username="admin", id="admin", roleIds=["admin"], timezone="UTC")
+        self.ipf = AsyncIPFClient(base_url="https://demo.ipfabric.io", token="token")
+        asyncio.run(self.ipf.connect())
+
+    def test_connect(self):
+        self.assertEqual(self.ipf.snapshot_id, SNAPSHOT["id"])
+        self.assertEqual(self.ipf.intent.snapshot_id, SNAPSHOT["id"])
+        self.assertIsInstance(self.ipf.intent, AsyncIntent)
+
+    @patch("httpx.AsyncClient.post")
+    @patch("ipfabric.AsyncIPFClient.get_snapshots", new_callable=AsyncMock)
+    @patch("ipfabric.AsyncIPFClient.get_user", new_callable=AsyncMock)
+    @patch("ipfabric.AsyncIPFClient.check_version", new_callable=AsyncMock)
+    def test_lazy_snapshots(self, check_version, get_user, snaps, post):
+        check_version.return_value = ("v5", "5.0.1")
+        get_user.return_value = User(username="admin", id="admin", roleIds=["admin"], timezone="UTC")
+        post.side_effect = page_response([{"id": SNAPSHOT["id"]}])
+        ipf = AsyncIPFClient(base_url="https://demo.ipfabric.io", token="token", lazy_snapshots=True)
+        asyncio.run(ipf.connect())
+        snaps.assert_not_called()
+        self.assertEqual((ipf.snapshot_id, ipf.intent.snapshot_id), (SNAPSHOT["id"], SNAPSHOT["id"]))
+        self.assertEqual(post.call_args[1]["json"]["pagination"], {"start": 0, "limit": 1})
+        with self.assertRaises(RuntimeError):
+            ipf.snapshots
+        snaps.return_value = self.ipf.snapshots
+        self.assertEqual(asyncio.run(ipf.get_snapshot(SNAPSHOT["id"])), self.ipf.snapshots[SNAPSHOT["id"]])
+        snaps.assert_called_once_with(ae_settings=False)
+        self.assertEqual(ipf.snapshot, self.ipf.snapshot)
+
+    @patch("httpx.AsyncClient.post")
+    def test_fetch_all(self, post):
+        rows = [dict(id=i) for i in range(7)]
+        post.side_effect = page_response(rows)
+        self.assertEqual(asyncio.run(self.ipf.fetch_all("test", columns=["id"])), rows)
+        self.assertEqual(asyncio.run(self.ipf.fetch_all("test", columns=["id"], parallel=True)), rows)
+
+    @patch("httpx.AsyncClient.post")
+    def test_fetch_all_capped(self, post):
+        rows = [dict(id=i) for i in range(2500)]
+        post.side_effect = page_response(rows, cap=300)
+        self.assertEqual(asyncio.run(self.ipf.fetch_all("test", columns=["id"])), rows)
+        self.assertEqual(self.ipf.page_sizer.limit("test", ["id"]), 300)
+        self.assertEqual(asyncio.run(self.ipf.fetch_all("test", columns=["id"], parallel=True)), rows)
+
+    @patch("httpx.AsyncClient.post")
+    def test_table_all(self, post):
+        rows = [dict(sn=i) for i in range(3)]
+        post.side_effect = page_response(rows)
+        self.assertEqual(asyncio.run(self.ipf.inventory.devices.all(columns=["sn"])), rows)
+
+    @unittest.skipUnless(find_spec("numpy"), "numpy is not installed")
+    @patch("httpx.AsyncClient.post")
+    def test_fetch_all_output(self, post):
+        post.side_effect = page_response([dict(sn=str(i)) for i in range(3)])
+        data = asyncio.run(self.ipf.fetch_all("test", columns=["sn"], output="numpy"))
+        self.assertEqual(list(data["sn"]), ["0", "1", "2"])
+        with self.assertRaises(ValueError):
+            asyncio.run(self.ipf.fetch_all("test", columns=["sn"], output="csv"))
+
+    @patch("httpx.AsyncClient.post")
+    def test_iter_all(self, post):
+        rows = [dict(id=i) for i in range(3)]
+        post.side_effect = page_response(rows)
+
+        async def collect():
+            return [r async for r in self.ipf.iter_all("test", columns=["id"])]
+
+        self.assertEqual(asyncio.run(collect()), rows)
+
+    @patch("httpx.AsyncClient.post")
+    def test_get_count(self, post):
+        post.side_effect = page_response([dict(id=1), dict(id=2)])
+        self.assertEqual(asyncio.run(self.ipf.get_count("test")), 2)
+
+    @patch("httpx.AsyncClient.post")
+    def test_get_counts(self, post):
+        post.side_effect = page_response([dict(id=1), dict(id=2)])
+        counts = asyncio.run(self.ipf.get_counts(["/tables/a", "tables/b"], filters={"tables/a": '{"id": ["eq", 1]}'}))
+        self.assertEqual(counts, {"tables/a": 2, "tables/b": 2})
+        self.assertEqual(post.call_args_list[0][1]["json"]["filters"], {"id": ["eq", 1]})
+
+    def test_gather_limit(self):
+        running, peak = [0], [0]
+
+        async def task(i):
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.01)
+            running[0] -= 1
+            return i
+
+        self.assertEqual(asyncio.run(self.ipf.gather(*[task(i) for i in range(6)], limit=2)), list(range(6)))
+        self.assertEqual(peak[0], 2)
+
+    def test_intent_not_loaded(self):
+        with self.assertRaises(RuntimeError):
+            self.ipf.intent.custom
@@ -0,0 +1,118 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+from ipfabric import IPFClient
+from ipfabric.bulk import BulkFetcher, TableReport, bulk_tables
+from ipfabric.models import Table
+
+ROWS = {
+    "tables/a": [dict(id=i) for i in range(5)],
+    "tables/b": [dict(id=i) for i in range(3)],
+    "tables/c": [],
+}
+
+
+class Bulk(unittest.TestCase):
+    @patch("httpx.Client.__init__", return_value=None)
+    @patch("httpx.Client.headers")
+    @patch("ipfabric.IPFClient.get_user")
+    @patch("ipfabric.IPFClient.check_version")
+    @patch("ipfabric.IPFClient.get_snapshots")
+    @patch("ipfabric.models.Inventory")
+    def setUp(self, inventory, snaps, check_version, get_user, headers, mock_client):
+        mock_client._headers = dict()
+        check_version.return_value = ("v5", "v5.0.1")
+        self.ipf = IPFClient(base_url="https://demo.ipfabric.io", token="token")
+        self.ipf.page_size = 2
+        self.ipf._cached_columns = MagicMock(return_value=None)
+        self.requests, self.inflight, self.max_inflight = list(), 0, 0
+        self.lock = threading.Lock()
+
+    def page(self, url, json):
+        with self.lock:
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+            self.requests.append((url, json["pagination"]["start"]))
+        start, limit = json["pagination"]["start"], json["pagination"]["limit"]
+        resp = MagicMock()
+        if url == "tables/error":
+            error = httpx.HTTPStatusError("error", request=MagicMock(), response=MagicMock(status_code=400))
+            resp.raise_for_status.side_effect = error
+        resp.json.return_value = {"data": ROWS.get(url, [])[start : start + limit], "_meta": {"count": len(ROWS[url])}}
+        with self.lock:
+            self.inflight -= 1
+        return resp
+
+    @patch("httpx.Client.post")
+    def test_fetch_many(self, post):
+        post.side_effect = self.page
+        self.ipf.get_columns = MagicMock(return_value=["id"])
+        tables = [Table(client=self.ipf, endpoint="/tables/a"), "tables/b", "tables/c", "tables/a"]
+        result = self.ipf.fetch_many(tables, snapshot_id="12345", filters={"tables/b": '{"id": ["eq", 1]}'})
+        self.assertEqual(list(result.data), ["tables/a", "tables/b", "tables/c"])
+        self.assertEqual(result.data["tables/a"], ROWS["tables/a"])
+        self.assertEqual(result.data["tables/b"], ROWS["tables/b"])
+        self.assertEqual(result.data["tables/c"], [])
+        self.assertEqual(post.call_args_list[0][1]["json"]["snapshot"], "12345")
+        self.assertTrue(any(c[1]["json"].get("filters") == {"id": ["eq", 1]} for c in post.call_args_list))
+        report = result.report["tables/a"]
+        self.assertEqual((report.rows, report.pages, report.requests), (5, 3, 4))
+        self.assertIsNotNone(report.seconds)
+        self.assertEqual(result.errors, {})
+        self.assertEqual(result.summary()[1]["rows"], 3)
+        self.assertEqual(self.ipf.get_columns.call_count, 3)
+
+    @patch("httpx.Client.post")
+    def test_fetch_many_interleaved(self, post):
+        post.side_effect = self.page
+        columns = {t: ["id"] for t in ROWS}
+        BulkFetcher(self.ipf, max_workers=1).run(bulk_tables(self.ipf, ROWS, columns=columns))
+        self.assertEqual([r[0] for r in self.requests[:3]], ["tables/a", "tables/b", "tables/c"])
+        self.assertEqual(self.max_inflight, 1)
+
+    @patch("httpx.Client.post")
+    def test_fetch_many_sink(self, post):
+        post.side_effect = self.page
+        pages = list()
+        result = self.ipf.fetch_many(
+            list(ROWS), columns={t: ["id"] for t in ROWS}, sink=lambda table, rows: pages.append((table, rows))
+        )
+        self.assertEqual(result.data, dict())
+        self.assertEqual([r for t, p in pages if t == "tables/a" for r in p], ROWS["tables/a"])
+        self.assertEqual(result.report["tables/a"].rows, 5)
+
+    @patch("httpx.Client.post")
+    def test_fetch_many_errors(self, post):
+        post.side_effect = self.page
+        ROWS["tables/error"] = list()
+        self.addCleanup(ROWS.pop, "tables/error")
+        columns = {t: ["id"] for t in ROWS}
+        result = self.ipf.fetch_many(["tables/error", "tables/b"], columns=columns)
+        self.assertEqual(list(result.data), ["tables/b"])
+        self.assertIsInstance(result.errors["tables/error"], httpx.HTTPStatusError)
+        with self.assertRaises(httpx.HTTPStatusError):
+            self.ipf.fetch_many(["tables/error", "tables/b"], columns=columns, raise_errors=True)
+
+    @patch("httpx.Client.post")
+    def test_fetch_many_count_missing(self, post):
+        def page(url, json):
+            resp = self.page(url, json)
+            resp.json.return_value.pop("_meta")
+            return resp
+
+        post.side_effect = page
+        result = self.ipf.fetch_many(["tables/a"], columns={"tables/a": ["id"]})
+        self.assertEqual(result.data["tables/a"], ROWS["tables/a"])
+        self.assertEqual(result.report["tables/a"].requests, 3)
+
+    @patch("ipfabric.bulk.perf_counter")
+    def test_report_seconds(self, perf_counter):
+        perf_counter.side_effect = [10.0, 12.5]
+        report = TableReport("tables/a")
+        report.start()
+        report.start()
+        report.done()
+        self.assertEqual(report.seconds, 2.5)
@@ -0,0 +1,186 @@
+import hashlib
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from ipfabric.cache import ColumnCache, CountCache, HandshakeCache, TableCache, ResultCache
+
+
+class Columns(unittest.TestCase):
+    def test_memory(self):
+        cache = ColumnCache()
+        self.assertIsNone(cache.get("demo", "6.0.1", "tables/inventory/devices"))
+        cache.set("demo", "6.0.1", "/tables/inventory/devices", ["id", "sn"])
+        self.assertEqual(cache.get("demo", "6.0.1", "tables/inventory/devices"), ["id", "sn"])
+        self.assertIsNone(cache.get("demo", "6.0.2", "tables/inventory/devices"))
+
+    def test_disk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ColumnCache(tmp).set("demo", "6.0.1", "tables/inventory/devices", ["id", "sn"])
+            self.assertEqual(ColumnCache(tmp).get("demo", "6.0.1", "tables/inventory/devices"), ["id", "sn"])
+
+    def test_invalidate(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ColumnCache(tmp)
+            cache.set("demo", "6.0.1", "tables/inventory/devices", ["id", "sn"])
+            cache.set("other", "6.0.1", "tables/inventory/devices", ["id"])
+            cache.invalidate("demo", "6.0.2")
+            self.assertIsNone(ColumnCache(tmp).get("demo", "6.0.1", "tables/inventory/devices"))
+            self.assertEqual(ColumnCache(tmp).get("other", "6.0.1", "tables/inventory/devices"), ["id"])
+
+
+class Tables(unittest.TestCase):
+    def test_memory(self):
+        cache = TableCache()
+        self.assertIsNone(cache.get("demo", "snap", "tables/inventory/devices", dict(columns=["sn"])))
+        cache.set("demo", "snap", "/tables/inventory/devices", dict(columns=["sn"]), [dict(sn="a")])
+        self.assertEqual(cache.get("demo", "snap", "tables/inventory/devices", dict(columns=["sn"])), [dict(sn="a")])
+        self.assertIsNone(cache.get("demo", "snap", "tables/inventory/devices", dict(columns=["id"])))
+
+    def test_disk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = TableCache(tmp)
+            cache.set("demo", "snap", "tables/inventory/devices", dict(), [dict(sn="a")])
+            cache.close()
+            cache = TableCache(tmp)
+            self.assertEqual(cache.get("demo", "snap", "tables/inventory/devices", dict()), [dict(sn="a")])
+            cache.close()
+
+    def test_lru_eviction(self):
+        cache = TableCache(max_size=110)
+        cache.set("demo", "snap", "a", dict(), [1])
+        cache.set("demo", "snap", "b", dict(), [2])
+        cache.get("demo", "snap", "a", dict())
+        cache.set("demo", "snap", "c", dict(), [str(i) for i in range(40)])
+        self.assertIsNotNone(cache.get("demo", "snap", "a", dict()))
+        self.assertIsNone(cache.get("demo", "snap", "b", dict()))
+        self.assertLessEqual(cache.size, 110)
+        cache.set("demo", "snap", "d", dict(), [str(i) for i in range(1000)])
+        self.assertIsNone(cache.get("demo", "snap", "d", dict()))
+
+    def test_invalidate(self):
+        cache = TableCache()
+        [cache.set(server, snap, "a", dict(), [1]) for server in ["demo", "other"] for snap in ["s1", "s2", "s3"]]
+        cache.invalidate("demo", ["s1"])
+        self.assertIsNone(cache.get("demo", "s1", "a", dict()))
+        cache.invalidate("demo", keep=["s2"])
+        self.assertIsNotNone(cache.get("demo", "s2", "a", dict()))
+        self.assertIsNone(cache.get("demo", "s3", "a", dict()))
+        self.assertIsNotNone(cache.get("other", "s1", "a", dict()))
+
+
+class Results(unittest.TestCase):
+    def test_policies(self):
+        cache = ResultCache(dict(jobs=10))
+        cache.set("tables/jobs", dict(), [dict(a=1)])
+        self.assertIsNone(cache.get("tables/jobs", dict()))
+        cache.set("jobs", dict(), [dict(a=1)])
+        self.assertEqual(cache.get("/jobs", dict()), [dict(a=1)])
+        self.assertIsNone(cache.get("jobs", dict(columns=["a"])))
+
+    def test_copy(self):
+        cache = ResultCache(dict(jobs=10))
+        data = [dict(a=1)]
+        cache.set("jobs", dict(), data)
+        data[0]["a"] = 2
+        cache.get("jobs", dict())[0]["a"] = 3
+        self.assertEqual(cache.get("jobs", dict()), [dict(a=1)])
+
+    @patch("ipfabric.cache.monotonic")
+    def test_ttl(self, monotonic):
+        monotonic.return_value = 100
+        cache = ResultCache(dict(jobs=10))
+        cache.set("jobs", dict(), [1])
+        monotonic.return_value = 109
+        self.assertEqual(cache.get("jobs", dict()), [1])
+        monotonic.return_value = 111
+        self.assertIsNone(cache.get("jobs", dict()))
+
+    def test_lru(self):
+        cache = ResultCache(dict(jobs=10), max_rows=4)
+        cache.set("jobs", dict(a=1), [1, 2])
+        cache.set("jobs", dict(a=2), [1, 2])
+        cache.get("jobs", dict(a=1))
+        cache.set("jobs", dict(a=3), [1])
+        self.assertIsNotNone(cache.get("jobs", dict(a=1)))
+        self.assertIsNone(cache.get("jobs", dict(a=2)))
+        cache.set("jobs", dict(a=4), [1, 2, 3, 4, 5])
+        self.assertIsNone(cache.get("jobs", dict(a=4)))
+
+    def test_invalidate(self):
+        cache = ResultCache(dict(jobs=10, configs=10))
+        cache.set("jobs", dict(), [1])
+        cache.set("configs", dict(), [1])
+        cache.invalidate("/jobs")
+        self.assertIsNone(cache.get("jobs", dict()))
+        self.assertEqual(cache.get("configs", dict()), [1])
+        cache.invalidate()
+        self.assertIsNone(cache.get("configs", dict()))
+
+
+class Counts(unittest.TestCase):
+    def test_lru(self):
+        cache = CountCache(max_entries=2)
+        cache.set("server", "snap1", "/tables/a", dict(filters=None), 10)
+        cache.set("server", "snap1", "tables/b", dict(filters=None), 20)
+        self.assertEqual(cache.get("server", "snap1", "tables/a", dict(filters=None)), 10)
+        self.assertIsNone(cache.get("server", "snap1", "tables/a", dict(filters=dict(a=1))))
+        cache.set("server", "snap1", "tables/c", dict(filters=None), 0)
+        self.assertEqual(cache.get("server", "snap1", "tables/c", dict(filters=None)), 0)
+        self.assertIsNone(cache.get("server", "snap1", "tables/b", dict(filters=None)))
+
+    def test_invalidate(self):
+        cache = CountCache()
+        for snapshot_id in ["snap1", "snap2"]:
+            for endpoint in ["tables/a", "tables/b"]:
+                cache.set("server", snapshot_id, endpoint, dict(), 1)
+        cache.invalidate("server", endpoint="/tables/a")
+        self.assertEqual(len(cache), 2)
+        cache.invalidate("server", keep=["snap2"])
+        self.assertEqual(cache.get("server", "snap2", "tables/b", dict()), 1)
+        cache.invalidate("other")
+        self.assertEqual(len(cache), 1)
+        cache.invalidate("server", snapshot_ids=["snap2"])
+        self.assertEqual(len(cache), 0)
+
+
+class Handshakes(unittest.TestCase):
+    @patch("ipfabric.cache.time")
+    def test_ttl(self, time):
+        with tempfile.TemporaryDirectory() as tmp:
+            time.return_value = 100
+            key = HandshakeCache(tmp).key("https://demo", "token")
+            self.assertNotEqual(key, HandshakeCache(tmp).key("https://demo", "other"))
+            HandshakeCache(tmp, ttl=10).set(key, dict(os_version="6.0.1"))
+            time.return_value = 109
+            self.assertEqual(HandshakeCache(tmp, ttl=10).get(key), dict(os_version="6.0.1", time=100))
+            time.return_value = 111
+            self.assertIsNone(HandshakeCache(tmp, ttl=10).get(key))
+            HandshakeCache(tmp, ttl=10).set("other", dict())
+            self.assertNotIn(key, HandshakeCache(tmp)._load())
+
+    def test_key(self):
+        with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as other:
+            cache = HandshakeCache(tmp)
+            key = cache.key("https://demo", "admin:password")
+            self.assertEqual(key, HandshakeCache(tmp).key("https://demo", "admin:password"))
+            self.assertNotEqual(key, HandshakeCache(other).key("https://demo", "admin:password"))
+            self.assertNotEqual(key, hashlib.sha256("https://demo\0admin:password".encode()).hexdigest())
+            cache.set(key, dict())
+            for name in ["handshake.json", "handshake.key"]:
+                self.assertEqual(stat.S_IMODE(os.stat(os.path.join(tmp, name)).st_mode), 0o600)
+            self.assertNotIn("password", Path(tmp, "handshake.json").read_text())
+
+    def test_invalidate(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = HandshakeCache(tmp)
+            cache.set("a", dict())
+            cache.set("b", dict())
+            cache.invalidate("a")
+            self.assertIsNone(cache.get("a"))
+            self.assertIsNotNone(cache.get("b"))
+            cache.invalidate()
+            self.assertIsNone(cache.get("b"))
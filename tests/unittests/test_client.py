@@ -1,10 +1,14 @@
 import os
+import tempfile
 import unittest
-from unittest.mock import patch
+from importlib.util import find_spec
+from unittest.mock import MagicMock, patch
 
+import httpx
 from packaging.version import parse
 
 from ipfabric import IPFClient
+from ipfabric.cache import TableCache, ResultCache
 from ipfabric.client import check_format
 from ipfabric.settings.user_mgmt import User
 from ipfabric.snapshot_models import Snapshot
@@ -255,6 +259,57 @@ class Client(unittest.TestCase):
         self.assertEqual(self.ipf.get_snapshots()["$lastLocked"].snapshot_id, "631ac652-1f72-417f-813f-b8a8c8730159")
         self.assertEqual(self.ipf.get_snapshots()["$prev"].snapshot_id, "631ac652-1f72-417f-813f-b8a8c8730159")
 
+    @patch("httpx.Client.post")
+    @patch("ipfabric.IPFClient.get_snapshots")
+    @patch("ipfabric.IPFClient.get_user")
+    @patch("ipfabric.IPFClient.check_version")
+    def test_lazy_snapshots(self, check_version, get_user, snaps, post):
+        check_version.return_value = ("v5", "v5.0.1")
+        post().json.return_value = {"data": [{"id": "631ac652-1f72-417f-813f-b8a8c8730157"}]}
+        ipf = IPFClient(base_url="https://demo.ipfabric.io", token="token", lazy_snapshots=True)
+        snaps.assert_not_called()
+        self.assertEqual(ipf.snapshot_id, "631ac652-1f72-417f-813f-b8a8c8730157")
+        self.assertEqual(post.call_args.kwargs["json"]["pagination"], {"start": 0, "limit": 1})
+        last = self.ipf.snapshots["$last"]
+        snaps.return_value = {"$last": last, last.snapshot_id: last}
+        self.assertEqual(ipf.snapshot, last)
+        snaps.assert_called_once_with(ae_settings=False)
+
+    @patch("httpx.Client.request")
+    @patch("ipfabric.IPFClient.get_snapshots")
+    @patch("ipfabric.IPFClient.get_user")
+    @patch("ipfabric.IPFClient.check_version")
+    def test_fast_start(self, check_version, get_user, snaps, request):
+        check_version.return_value = ("v5.0", "5.0.1")
+        get_user.return_value = User(username="admin", id="1", roleIds=["admin"], timezone="UTC")
+        snaps.return_value = self.ipf.snapshots
+        with tempfile.TemporaryDirectory() as tmp:
+            IPFClient(base_url="https://demo.ipfabric.io", token="token", cache_dir=tmp, fast_start=True)
+            ipf = IPFClient(base_url="https://demo.ipfabric.io", token="token", cache_dir=tmp, fast_start=60)
+            self.assertEqual((check_version.call_count, get_user.call_count, snaps.call_count), (1, 1, 1))
+            self.assertEqual((ipf.api_version, ipf.os_version, ipf.user.username), ("v5.0", "5.0.1", "admin"))
+            self.assertEqual(ipf.snapshots["$last"], self.ipf.snapshots["$last"])
+            self.assertEqual(str(ipf.base_url), "https://demo.ipfabric.io/api/v5.0/")
+            IPFClient(base_url="https://demo.ipfabric.io", token="other", cache_dir=tmp, fast_start=True)
+            self.assertEqual(get_user.call_count, 2)
+            request.return_value = httpx.Response(401)
+            ipf.governor = None
+            self.assertEqual(ipf.get("users/me").status_code, 401)
+            IPFClient(base_url="https://demo.ipfabric.io", token="token", cache_dir=tmp, fast_start=True)
+            self.assertEqual(get_user.call_count, 3)
+
+    def test_resolve_snapshot_payload(self):
+        self.assertEqual(self.ipf._resolve_snapshot_payload("$prev")["pagination"], {"start": 1, "limit": 1})
+        self.assertIn({"locked": ["eq", True]}, self.ipf._resolve_snapshot_payload("$lastLocked")["filters"]["and"])
+        self.assertIn({"id": ["eq", "abc"]}, self.ipf._resolve_snapshot_payload("abc")["filters"]["and"])
+
+    @patch("ipfabric.snapshot_models.Snapshot.get_assurance_engine_settings")
+    def test_hydrate_snapshots(self, ae_settings):
+        timings = self.ipf.hydrate_snapshots(max_workers=2)
+        ae_settings.assert_called_once_with(self.ipf)
+        self.assertEqual(list(timings), ["631ac652-1f72-417f-813f-b8a8c8730157"])
+        self.assertIn("/snapshots/631ac652-1f72-417f-813f-b8a8c8730157/settings", self.ipf.snapshot_timings)
+
     def test_bad_snapshot(self):
         with self.assertRaises(ValueError) as err:
             self.ipf.snapshot_id = "bad"
@@ -269,6 +324,51 @@ class Client(unittest.TestCase):
         pager.return_value = list()
         self.assertEqual(self.ipf.fetch_all("a", columns=["*"], filters=dict(a="b"), reports="1", sort=dict(a="b")), [])
 
+    @patch("ipfabric.IPFClient._ipf_pager")
+    def test_fetch_all_table_cache(self, pager):
+        last = self.ipf.snapshots["$last"]
+        self.ipf.snapshots = {"$last": last, last.snapshot_id: last}
+        self.ipf.table_cache = TableCache()
+        pager.return_value = [dict(a=1)]
+        for snapshot_id in [None, None, "$last"]:
+            self.assertEqual(self.ipf.fetch_all("tables/a", columns=["a"], snapshot_id=snapshot_id), [dict(a=1)])
+        pager.assert_called_once()
+        self.ipf.fetch_all("tables/a", columns=["a"], snapshot=False)
+        self.ipf.fetch_all("tables/a", columns=["b"])
+        self.ipf.fetch_all("tables/a", columns=["a"], snapshot_id="$prev")
+        self.assertEqual(pager.call_count, 4)
+        self.ipf.invalidate_table_cache([last.snapshot_id])
+        self.ipf.fetch_all("tables/a", columns=["a"])
+        self.assertEqual(pager.call_count, 5)
+
+    @patch("ipfabric.IPFClient._ipf_page_iter")
+    @patch("ipfabric.client.to_columnar")
+    def test_fetch_all_output(self, to_columnar, page_iter):
+        page_iter.return_value = iter([[dict(a=1)]])
+        self.assertEqual(self.ipf.fetch_all("tables/a", columns=["a"], output="arrow"), to_columnar.return_value)
+        self.assertEqual(to_columnar.call_args[0][1:], (["a"], "arrow"))
+        self.assertEqual(list(to_columnar.call_args[0][0]), [[dict(a=1)]])
+
+    @unittest.skipUnless(find_spec("msgspec"), "msgspec is not installed")
+    @patch("ipfabric.IPFClient._ipf_pager")
+    def test_fetch_all_structs(self, pager):
+        self.ipf.table_cache = TableCache()
+        self.assertEqual(self.ipf.fetch_all("tables/addressing/mac", columns=["vlan"], structs=True), pager.return_value)
+        self.assertIsNotNone(pager.call_args[1]["decoder"])
+        self.assertEqual(self.ipf.table_cache.size, 0)
+
+    @patch("ipfabric.IPFClient._ipf_pager")
+    def test_fetch_all_result_cache(self, pager):
+        self.ipf.result_cache = ResultCache()
+        pager.return_value = [dict(id=1)]
+        for _ in range(2):
+            self.assertEqual(self.ipf.fetch_all("tables/jobs", columns=["id"], snapshot=False), [dict(id=1)])
+        self.ipf.fetch_all("tables/management/snapshots", columns=["id"], snapshot=False)
+        self.assertEqual(pager.call_count, 2)
+        self.ipf.invalidate_result_cache("tables/jobs")
+        self.ipf.fetch_all("tables/jobs", columns=["id"], snapshot=False)
+        self.assertEqual(pager.call_count, 3)
+
     @patch("httpx.Client.post")
     def test_query(self, post):
         post().json.return_value = {"data": list()}
@@ -285,6 +385,64 @@ class Client(unittest.TestCase):
         post().json.return_value = {"errors": [{"message": '"hello" [name, id]'}]}
         self.assertEqual(self.ipf.get_columns("test"), ["name", "id"])
 
+    @patch("httpx.Client.post")
+    def test_get_columns_cached(self, post):
+        post().status_code = 422
+        post().json.return_value = {"errors": [{"message": '"hello" [name, id]'}]}
+        post.reset_mock()
+        self.assertEqual(self.ipf.get_columns("/test"), ["name", "id"])
+        self.assertEqual(self.ipf.get_columns("test"), ["name", "id"])
+        self.assertEqual(post.call_count, 1)
+        self.ipf.get_columns("test", cache=False)
+        self.assertEqual(post.call_count, 2)
+
+    @patch("httpx.Client.post")
+    def test_get_counts(self, post):
+        counts = {"tables/a": 10, "tables/b": 20}
+
+        def count(url, json):
+            resp = MagicMock()
+            if url not in counts:
+                error = httpx.HTTPStatusError("error", request=MagicMock(), response=MagicMock(status_code=404))
+                resp.raise_for_status.side_effect = error
+            resp.json.return_value = {"data": [], "_meta": {"count": counts.get(url)}}
+            return resp
+
+        post.side_effect = count
+        result = self.ipf.get_counts(
+            ["/tables/a", "tables/b", "tables/c"],
+            filters={"tables/a": '{"id": ["eq", 1]}'},
+            attr_filters={"tables/b": {"siteName": ["L1"]}},
+            snapshot_id="$last",
+        )
+        self.assertEqual(result, {"tables/a": 10, "tables/b": 20, "tables/c": None})
+        payloads = {c[0][0]: c[1]["json"] for c in post.call_args_list}
+        self.assertEqual(payloads["tables/a"]["filters"], {"id": ["eq", 1]})
+        self.assertEqual(payloads["tables/b"]["attributeFilters"], {"siteName": ["L1"]})
+        self.assertEqual(len(self.ipf.count_cache), 2)
+        # The count of tables/a without filters is not cached yet
+        attr_filters = {"tables/b": {"siteName": ["L1"]}}
+        self.assertEqual(self.ipf.get_counts(["tables/a", "tables/b"], None, attr_filters, "$last"), counts)
+        self.assertEqual(post.call_count, 4)
+        self.ipf.get_counts(["tables/b"], None, attr_filters, "$last", cache=False)
+        self.assertEqual(post.call_count, 5)
+        self.ipf.invalidate_table_cache()
+        self.assertEqual(len(self.ipf.count_cache), 0)
+
+    @patch("httpx.Client.post")
+    def test_warm_column_cache(self, post):
+        post().status_code = 422
+        post().json.return_value = {"errors": [{"message": '"hello" [name, id]'}]}
+        columns = self.ipf.warm_column_cache(["tables/a", "/tables/a", "tables/b"])
+        self.assertEqual(columns, {"tables/a": ["name", "id"], "tables/b": ["name", "id"]})
+        self.assertEqual(self.ipf.get_columns("tables/b"), ["name", "id"])
+
+    @patch("httpx.Client.post")
+    def test_get_columns_not_cached(self, post):
+        post().status_code = 200
+        self.assertIsNone(self.ipf.get_columns("test"))
+        self.assertIsNone(self.ipf._cached_columns("test"))
+
     @patch("httpx.Client.post")
     def test_get_columns_failed(self, post):
         post().status_code = 400
@@ -297,6 +455,146 @@ class Client(unittest.TestCase):
         post().json.return_value = {"data": ["hello", "world"], "_meta": {"count": 2}}
         self.assertEqual(self.ipf._ipf_pager("test", dict(), limit=3), ["hello", "world"])
 
+    @patch("httpx.Client.post")
+    def test_ipf_pager_parallel(self, post):
+        rows = list(range(10))
+
+        def page(url, json):
+            start, limit = json["pagination"]["start"], json["pagination"]["limit"]
+            resp = MagicMock()
+            resp.json.return_value = {"data": rows[start : start + limit], "_meta": {"count": len(rows)}}
+            return resp
+
+        post.side_effect = page
+        self.assertEqual(self.ipf._ipf_pager("test", dict(), limit=3, parallel=True), rows)
+        self.assertEqual(self.ipf._ipf_pager("test", dict(), limit=5, parallel=True), rows)
+        self.assertEqual(post.call_count, 4 + 3)
+
+    @patch("httpx.Client.post")
+    def test_ipf_pager_adaptive(self, post):
+        rows, requests = list(range(2500)), list()
+
+        def page(url, json):
+            start, limit = json["pagination"]["start"], json["pagination"]["limit"]
+            requests.append((start, limit))
+            resp = MagicMock()
+            if limit > 800:
+                error = httpx.HTTPStatusError("timeout", request=MagicMock(), response=MagicMock(status_code=504))
+                resp.raise_for_status.side_effect = error
+            resp.json.return_value = {"data": rows[start : start + limit], "_meta": {"count": len(rows)}}
+            return resp
+
+        post.side_effect = page
+        columns = ["a"] * 10
+        self.assertEqual(self.ipf._ipf_pager("test", dict(columns=columns)), rows)
+        self.assertEqual(requests[:4], [(0, 1000), (0, 500), (500, 500), (1000, 500)])
+        self.assertEqual(self.ipf.page_sizer.limit("test", columns), 500)
+        requests.clear()
+        self.assertEqual(self.ipf._ipf_pager("test", dict(columns=columns), parallel=True), rows)
+        self.assertTrue(all(limit <= 1000 for _, limit in requests))
+        self.ipf.page_size = 2000
+        with self.assertRaises(httpx.HTTPStatusError):
+            self.ipf._ipf_pager("test", dict(columns=columns))
+
+    @patch("httpx.Client.post")
+    def test_ipf_pager_capped(self, post):
+        rows, meta = list(range(2500)), True
+
+        def page(url, json):
+            start, limit = json["pagination"]["start"], min(json["pagination"]["limit"], 300)
+            resp = MagicMock()
+            resp.json.return_value = {"data": rows[start : start + limit]}
+            if meta:
+                resp.json.return_value["_meta"] = {"count": len(rows)}
+            return resp
+
+        post.side_effect = page
+        self.assertEqual(self.ipf._ipf_pager("test", dict(columns=["id"])), rows)
+        self.assertEqual(self.ipf.page_sizer.limit("test", ["id"]), 300)
+        for parallel in [False, True]:
+            self.assertEqual(self.ipf._ipf_pager("test", dict(columns=["id"]), limit=1000, parallel=parallel), rows)
+            pages = list(self.ipf._ipf_page_iter("test", dict(), limit=1000, parallel=parallel))
+            self.assertEqual([len(p) for p in pages], [1000, 1000, 500])
+        meta = False
+        self.assertEqual(self.ipf._ipf_pager("test", dict(columns=["id"]), limit=1000), rows[:300])
+
+    @patch("ipfabric.api.sleep")
+    @patch("httpx.Client.request")
+    def test_request_retry(self, request, sleep):
+        self.ipf.governor = None
+        request.side_effect = [httpx.ReadTimeout("timeout"), httpx.Response(503), httpx.Response(200)]
+        self.assertEqual(self.ipf.request("POST", "tables/a").status_code, 200)
+        self.assertEqual(sleep.call_count, 2)
+        request.side_effect = [httpx.Response(503)] * 4
+        self.assertEqual(self.ipf.request("GET", "snapshots").status_code, 503)
+        self.assertEqual(request.call_count, 3 + 4)
+        request.side_effect = [httpx.Response(503), httpx.Response(200)]
+        self.assertEqual(self.ipf.request("POST", "snapshots/load").status_code, 503)
+        request.side_effect = [httpx.ConnectError("reset")]
+        self.ipf.retry = None
+        with self.assertRaises(httpx.ConnectError):
+            self.ipf.request("GET", "snapshots")
+
+    @patch("httpx.Client.request")
+    def test_request_governor(self, request):
+        self.ipf.retry = None
+        request.side_effect = [httpx.Response(429, headers={"Retry-After": "0"}), httpx.ReadTimeout("timeout")]
+        self.assertEqual(self.ipf.request("GET", "snapshots").status_code, 429)
+        with self.assertRaises(httpx.ReadTimeout):
+            self.ipf.request("GET", "https://other.ipfabric.io/api/v5.0/snapshots")
+        hosts = self.ipf.governor.hosts
+        self.assertEqual((hosts["demo.ipfabric.io"].inflight, hosts["demo.ipfabric.io"].limit), (0, 4))
+        self.assertEqual((hosts["other.ipfabric.io"].inflight, hosts["other.ipfabric.io"].limit), (0, 4))
+
+    @patch("httpx.Client.post")
+    def test_ipf_pager_resume(self, post):
+        rows, requests, fail = list(range(25)), list(), set()
+
+        def page(url, json):
+            start, limit = json["pagination"]["start"], json["pagination"]["limit"]
+            requests.append(start)
+            if start in fail:
+                fail.discard(start)
+                raise httpx.ConnectError("reset")
+            resp = MagicMock()
+            resp.json.return_value = {"data": rows[start : start + limit], "_meta": {"count": len(rows)}}
+            return resp
+
+        post.side_effect = page
+        payload = dict(columns=["id"], snapshot="a3b8e3b5-3a34-4d4e-8d0e-b7a7a6b4bd3a")
+        for parallel in [False, True]:
+            fail.add(20)
+            requests.clear()
+            with self.assertRaises(httpx.ConnectError):
+                self.ipf._ipf_pager("test", payload, limit=5, parallel=parallel)
+            self.assertEqual(len(self.ipf.checkpoints), 1)
+            self.assertEqual(self.ipf._ipf_pager("test", payload, limit=5, parallel=parallel, resume=True), rows)
+            self.assertEqual(requests.count(0), 1)
+            self.assertEqual(len(self.ipf.checkpoints), 0)
+        for snapshot in ["$last", None]:
+            fail.add(20)
+            requests.clear()
+            with self.assertRaises(httpx.ConnectError):
+                self.ipf._ipf_pager("test", dict(columns=["id"], snapshot=snapshot), limit=5)
+            self.assertEqual(len(self.ipf.checkpoints), 0)
+            self.assertEqual(self.ipf._ipf_pager("test", dict(columns=["id"], snapshot=snapshot), limit=5), rows)
+            self.assertEqual(requests.count(0), 2)
+
+    @patch("httpx.Client.post")
+    def test_iter_all(self, post):
+        rows = [dict(id=i) for i in range(7)]
+
+        def page(url, json):
+            start, limit = json["pagination"]["start"], json["pagination"]["limit"]
+            resp = MagicMock()
+            resp.json.return_value = {"data": rows[start : start + limit], "_meta": {"count": len(rows)}}
+            return resp
+
+        post.side_effect = page
+        self.assertEqual(list(self.ipf.iter_all("test", columns=["id"])), rows)
+        self.assertEqual(list(self.ipf.iter_all("test", columns=["id"], parallel=True)), rows)
+        self.assertEqual(list(self.ipf._ipf_page_iter("test", dict(), limit=3)), [rows[0:3], rows[3:6], rows[6:]])
+
     @patch("ipfabric.IPFClient.get_snapshots")
     def test_update(self, snap):
         self.ipf.get_snapshots.return_value = 1
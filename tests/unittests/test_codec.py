@@ -0,0 +1,64 @@
+import json
+import unittest
+from importlib.util import find_spec
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+from ipfabric.api import IPFabricBase
+from ipfabric.codec import JSONCodec, decode, get_codec, page_decoder, row_struct
+
+PAGE = {"data": [{"id": "1", "vlan": 10, "hostname": "a"}], "_meta": {"count": 1}}
+
+
+class CodecClient(IPFabricBase, httpx.Client):
+    def __init__(self, codec):
+        self.codec = codec
+        super().__init__(transport=httpx.MockTransport(self.handler), base_url="https://ipf")
+        self.requests = list()
+
+    def handler(self, request):
+        self.requests.append(request)
+        return httpx.Response(200, content=json.dumps(PAGE).encode())
+
+
+class Codec(unittest.TestCase):
+    def test_get_codec(self):
+        self.assertIsInstance(get_codec("json"), JSONCodec)
+        if find_spec("orjson"):
+            self.assertEqual(get_codec().name, "orjson")
+        with self.assertRaises(ValueError):
+            get_codec("ujson")
+
+    @patch("ipfabric.codec.CODECS", {"orjson": (JSONCodec, None), "json": (JSONCodec, json)})
+    def test_get_codec_missing(self):
+        self.assertEqual(get_codec().name, "json")
+        with self.assertRaises(ImportError):
+            get_codec("orjson")
+
+    def test_request(self):
+        for name in ["json", None]:
+            ipf = CodecClient(get_codec(name))
+            res = ipf.post("tables/addressing/mac", json=dict(columns=["id"], snapshot="$last"))
+            self.assertEqual(json.loads(ipf.requests[0].content), dict(columns=["id"], snapshot="$last"))
+            self.assertEqual(ipf.requests[0].headers["Content-Type"], "application/json")
+            self.assertEqual(ipf._decode(res), PAGE)
+
+    def test_decode_fallback(self):
+        response = MagicMock()
+        response.json.return_value = PAGE
+        self.assertEqual(decode(response, get_codec()), PAGE)
+        content, headers = '{"a": "é"}'.encode("latin-1"), {"Content-Type": "charset=latin-1"}
+        latin = httpx.Response(200, content=content, headers=headers)
+        self.assertEqual(decode(latin, get_codec()), {"a": "é"})
+
+    @unittest.skipUnless(find_spec("msgspec"), "msgspec is not installed")
+    def test_structs(self):
+        row = row_struct("/tables/addressing/mac", ["id", "vlan", "hostname", "siteName"])
+        response = httpx.Response(200, content=json.dumps(PAGE).encode())
+        page = decode(response, get_codec(), page_decoder(row))
+        self.assertEqual(page["_meta"], {"count": 1})
+        self.assertEqual(page["data"], [row(id="1", vlan=10, hostname="a", siteName=None)])
+        response = httpx.Response(200, content=b'{"data": [{"vlan": "ten"}]}')
+        with self.assertRaises(ValueError):
+            decode(response, get_codec(), page_decoder(row))
@@ -0,0 +1,56 @@
+import unittest
+from importlib.util import find_spec
+
+from ipfabric.columnar import ColumnarBuilder, to_columnar
+
+PAGES = [
+    [dict(hostname="a", siteName="s1", uptime=1), dict(hostname=None, siteName="s2", uptime=2)],
+    [dict(hostname="c", siteName="s1", uptime=None), dict(hostname="a", siteName="s1", uptime=4)],
+]
+COLUMNS = ["hostname", "siteName", "uptime"]
+
+
+class Columnar(unittest.TestCase):
+    def test_builder(self):
+        builder = ColumnarBuilder(COLUMNS).add_pages(PAGES)
+        self.assertEqual(builder.length, 4)
+        self.assertTrue(builder.is_dictionary("siteName"))
+        self.assertEqual(builder.categories("siteName"), ["s1", "s2"])
+        self.assertEqual(list(builder.codes("siteName")), [0, 1, 0, 0])
+        self.assertEqual(list(builder.codes("hostname")), [0, -1, 1, 0])
+        self.assertEqual(builder.values("hostname"), ["a", None, "c", "a"])
+        self.assertFalse(builder.is_dictionary("uptime"))
+        self.assertEqual(builder.values("uptime"), [1, 2, None, 4])
+
+    def test_builder_demote(self):
+        builder = ColumnarBuilder(["a"]).add_pages([[dict(a="x"), dict(a=None)], [dict(a=["x"])]])
+        self.assertFalse(builder.is_dictionary("a"))
+        self.assertEqual(builder.values("a"), ["x", None, ["x"]])
+
+    def test_invalid_output(self):
+        with self.assertRaises(ValueError):
+            to_columnar(PAGES, COLUMNS, "polars")
+
+    @unittest.skipUnless(find_spec("pyarrow"), "pyarrow is not installed")
+    def test_arrow(self):
+        import pyarrow as pa
+
+        table = to_columnar(PAGES, COLUMNS, "arrow")
+        self.assertEqual(table.num_rows, 4)
+        self.assertTrue(pa.types.is_dictionary(table.schema.field("hostname").type))
+        self.assertEqual(table.column("hostname").to_pylist(), ["a", None, "c", "a"])
+        self.assertEqual(table.column("uptime").to_pylist(), [1, 2, None, 4])
+
+    @unittest.skipUnless(find_spec("pandas"), "pandas is not installed")
+    def test_pandas(self):
+        df = to_columnar(PAGES, COLUMNS, "pandas")
+        self.assertEqual(str(df["siteName"].dtype), "category")
+        self.assertEqual(df["hostname"].tolist()[2:], ["c", "a"])
+        self.assertTrue(df["hostname"].isna().tolist()[1])
+        self.assertEqual(len(to_columnar([], COLUMNS, "pandas")), 0)
+
+    @unittest.skipUnless(find_spec("numpy"), "numpy is not installed")
+    def test_numpy(self):
+        data = to_columnar(PAGES + [[dict(hostname="d", siteName="s3", uptime=[1])]], COLUMNS, "numpy")
+        self.assertEqual(data["hostname"].tolist(), ["a", None, "c", "a", "d"])
+        self.assertEqual(data["uptime"].tolist(), [1, 2, None, 4, [1]])
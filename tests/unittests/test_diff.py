@@ -0,0 +1,121 @@
+import unittest
+
+from ipfabric import diff
+
+
+class Diff(unittest.TestCase):
+    def test_tuple_fingerprint_canonical(self):
+        engine = diff.TupleHash()
+        a = dict(hostname="a", ip=["1.1.1.1", "2.2.2.2"], attrs=dict(x=1, y=[1, 2]))
+        b = dict(attrs=dict(y=[1, 2], x=1), ip=["1.1.1.1", "2.2.2.2"], hostname="a")
+        self.assertEqual(engine.fingerprint(a), engine.fingerprint(b))
+        self.assertNotEqual(engine.fingerprint(a), engine.fingerprint(dict(a, ip=["2.2.2.2", "1.1.1.1"])))
+        self.assertEqual(engine.fingerprint(a, ["hostname"]), engine.fingerprint(dict(hostname="a"), ["hostname"]))
+
+    def test_tuple_fingerprints_mixed_columns(self):
+        fingerprints = list(diff.TupleHash().fingerprints([dict(a=1), dict(b=1), dict(b=1), dict()]))
+        self.assertNotEqual(fingerprints[0], fingerprints[1])
+        self.assertEqual(fingerprints[1], fingerprints[2])
+        self.assertEqual(fingerprints[3], (tuple(), tuple()))
+
+    def test_deephash(self):
+        engine = diff.get_hash_engine("deephash")
+        self.assertIsInstance(engine, diff.DeepHash)
+        self.assertEqual(engine.fingerprint(dict(a=1, b=2), ["a"]), engine.fingerprint(dict(a=1)))
+
+    def test_get_hash_engine(self):
+        engine = diff.TupleHash()
+        self.assertIs(diff.get_hash_engine(engine), engine)
+        self.assertIsInstance(diff.get_hash_engine(), diff.TupleHash)
+        with self.assertRaises(ValueError):
+            diff.get_hash_engine("md5")
+
+    def test_hash_rows(self):
+        rows = [dict(a=1, b=1), dict(a=2, b=1)]
+        for engine in diff.HASH_ENGINES:
+            self.assertEqual(list(diff.hash_rows(rows, engine=engine).values()), rows)
+            self.assertEqual(list(diff.hash_rows(iter(rows), ["a"], engine=engine).values()), rows)
+            with self.assertRaises(KeyError):
+                diff.hash_rows(rows, ["b"], engine=engine)
+
+    def test_keyed_diff(self):
+        before = [dict(id=1, sn="a", host="r1", ip=["1.1.1.1"]), dict(id=2, sn="b", host="r2", ip=[])]
+        after = iter([dict(id=5, sn="a", host="r1", ip=["2.2.2.2"]), dict(id=6, sn="c", host="r3", ip=[])])
+        comp = diff.keyed_diff(before, after, ["sn"], ["host", "ip", "sn"])
+        self.assertEqual(comp["added"], [dict(sn="c", host="r3", ip=[])])
+        self.assertEqual(comp["removed"], [dict(sn="b", host="r2", ip=[])])
+        self.assertEqual(
+            comp["changed"], [dict(key=dict(sn="a"), changes=dict(ip=dict(before=["1.1.1.1"], after=["2.2.2.2"])))]
+        )
+
+    def test_keyed_diff_digest(self):
+        before = [dict(id=1, sn="a", host="r1", ip=["1.1.1.1"]), dict(id=2, sn="b", host="r2", ip=[])]
+        after = [dict(id=5, sn="a", host="r1", ip=["2.2.2.2"]), dict(id=6, sn="c", host="r3", ip=[])]
+        reads = list()
+
+        def rows(table):
+            reads.append(len(table))
+            return iter(table)
+
+        columns = ["host", "ip", "sn"]
+        comp = diff.keyed_diff(lambda: rows(before), iter(after), ["sn"], columns)
+        self.assertEqual(comp, diff.keyed_diff(before, after, ["sn"], columns))
+        self.assertEqual(len(reads), 2)
+        reads.clear()
+        comp = diff.keyed_diff(lambda: rows(before), iter(before), ["sn"], columns)
+        self.assertEqual(comp, dict(added=[], removed=[], changed=[]))
+        self.assertEqual(len(reads), 1)
+
+    def test_diff_row_shape(self):
+        before = [dict(id="1", sn="a", v=1), dict(id="2", sn="b", v=2)]
+        after = [dict(id="1", sn="a", v=1), dict(id="3", sn="c", v=3)]
+        for comp in (diff.keyed_diff(before, after, ["sn"], ["v"]), diff.merge_diff(before, after, ["sn"], ["v"])):
+            self.assertEqual(comp["added"], [dict(sn="c", v=3)])
+            self.assertEqual(comp["removed"], [dict(sn="b", v=2)])
+
+    def test_keyed_diff_not_unique(self):
+        with self.assertRaises(KeyError):
+            diff.keyed_diff([dict(sn="a"), dict(sn="a")], [], ["sn"], [])
+        with self.assertRaises(KeyError):
+            diff.keyed_diff([dict(sn="a")], [dict(sn="a"), dict(sn="a")], ["sn"], [])
+
+    def test_merge_diff(self):
+        before = [dict(sn="a", host="r1"), dict(sn="b", host="r2"), dict(sn="d", host="r4"), dict(sn=None, host="x")]
+        after = [dict(sn="a", host="R1"), dict(sn="c", host="r3"), dict(sn="d", host="r4"), dict(sn=None, host="x")]
+        comp = diff.merge_diff(iter(before), iter(after), ["sn"], ["host"])
+        self.assertEqual(comp, diff.keyed_diff(before, after, ["sn"], ["host"]))
+        self.assertEqual(comp["added"], [dict(sn="c", host="r3")])
+        self.assertEqual(comp["removed"], [dict(sn="b", host="r2")])
+        self.assertEqual(comp["changed"], [dict(key=dict(sn="a"), changes=dict(host=dict(before="r1", after="R1")))])
+
+    def test_merge_diff_multiple_keys(self):
+        before = [dict(host="a", port="1", up=True), dict(host="a", port="2", up=True)]
+        after = [dict(host="a", port="2", up=False), dict(host="a", port="3", up=True)]
+        comp = diff.merge_diff(before, after, ["host", "port"], ["up"])
+        self.assertEqual(comp, diff.keyed_diff(before, after, ["host", "port"], ["up"]))
+
+    def test_merge_diff_unsorted(self):
+        with self.assertRaises(diff.SortOrderError):
+            diff.merge_diff([dict(sn="b"), dict(sn="a")], [], ["sn"], [])
+        with self.assertRaises(diff.SortOrderError):
+            diff.merge_diff([dict(sn="a")], [dict(sn=1)], ["sn"], [])
+
+    def test_history_diff(self):
+        tables = [
+            ("s1", [dict(sn="a", host="r1"), dict(sn="b", host="r2")]),
+            ("s2", [dict(sn="a", host="R1"), dict(sn="b", host="r2")]),
+            ("s3", [dict(sn="a", host="R1"), dict(sn="c", host="r3")]),
+        ]
+        history = diff.history_diff(tables, ["sn"], ["host"])
+        self.assertEqual(history["snapshots"], ["s1", "s2", "s3"])
+        self.assertEqual([(d["before"], d["after"]) for d in history["diffs"]], [("s1", "s2"), ("s2", "s3")])
+        self.assertEqual(history["diffs"][1]["removed"], [dict(sn="b", host="r2")])
+        self.assertEqual(
+            history["timeline"][("a",)],
+            [
+                dict(snapshot="s1", event="present"),
+                dict(snapshot="s2", event="changed", changes=dict(host=dict(before="r1", after="R1"))),
+            ],
+        )
+        self.assertEqual([e["event"] for e in history["timeline"][("b",)]], ["present", "removed"])
+        self.assertEqual(history["timeline"][("c",)], [dict(snapshot="s3", event="added")])
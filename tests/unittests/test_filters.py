@@ -0,0 +1,95 @@
+import unittest
+
+from ipfabric import filters
+from ipfabric.intent_models import IntentCheck
+
+ROWS = [
+    dict(id=1, hostname="Core-1", vendor="cisco", uptime=100, loginIp="10.0.0.1", ip=["10.0.0.1"], site=None),
+    dict(id=2, hostname="core-2", vendor="arista", uptime=200, loginIp="10.0.1.1", ip=[], site="HQ"),
+    dict(id=3, hostname="access-1", vendor="Cisco", uptime=None, loginIp="192.168.1.1", ip=["10.1.0.1"], site=""),
+    dict(id=4, hostname="fw-1", vendor="paloalto", uptime=50, loginIp=None, ip=["10.0.0.9", "1.1.1.1"], site="DC"),
+]
+
+# (filter, ids of the matching rows)
+CONFORMANCE = [
+    ({"vendor": ["eq", "cisco"]}, [1]),
+    ({"vendor": ["neq", "cisco"]}, [2, 3, 4]),
+    ({"vendor": ["ieq", "CISCO"]}, [1, 3]),
+    ({"vendor": ["nieq", "cisco"]}, [2, 4]),
+    ({"hostname": ["like", "CORE"]}, [1, 2]),
+    ({"hostname": ["notlike", "core"]}, [3, 4]),
+    ({"hostname": ["reg", "^core"]}, [2]),
+    ({"hostname": ["nreg", "^core"]}, [1, 3, 4]),
+    ({"hostname": ["ireg", "^core-\\d$"]}, [1, 2]),
+    ({"hostname": ["nireg", "^core"]}, [3, 4]),
+    ({"uptime": ["gt", 100]}, [2]),
+    ({"uptime": ["gte", 100]}, [1, 2]),
+    ({"uptime": ["lt", 100]}, [4]),
+    ({"uptime": ["lte", 100]}, [1, 4]),
+    ({"site": ["empty", True]}, [1, 3]),
+    ({"site": ["empty", False]}, [2, 4]),
+    ({"ip": ["empty", True]}, [2]),
+    ({"loginIp": ["sect", "10.0.0.0/16"]}, [1, 2]),
+    ({"loginIp": ["nsect", "10.0.0.0/16"]}, [3, 4]),
+    ({"ip": ["any", "sect", "10.0.0.0/24"]}, [1, 4]),
+    ({"ip": ["all", "like", "10."]}, [1, 2, 3]),
+    ({"vendor": ["like", "cisco"], "uptime": ["gte", 100]}, [1]),
+    ({"and": [{"vendor": ["like", "cisco"]}, {"uptime": ["gte", 100]}]}, [1]),
+    ({"or": [{"vendor": ["eq", "arista"]}, {"hostname": ["eq", "fw-1"]}]}, [2, 4]),
+    ({"or": [{"and": [{"vendor": ["ieq", "cisco"]}, {"site": ["empty", True]}]}, {"uptime": ["eq", 200]}]}, [1, 2, 3]),
+    ({}, [1, 2, 3, 4]),
+]
+
+
+class Filters(unittest.TestCase):
+    def test_conformance(self):
+        for filter_dict, expected in CONFORMANCE:
+            match = filters.compile_filter(filter_dict)
+            self.assertEqual([r["id"] for r in ROWS if match(r)], expected, msg=filter_dict)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            filters.compile_filter({"vendor": ["bad", "cisco"]})
+        with self.assertRaises(ValueError):
+            filters.compile_filter({"vendor": "cisco"})
+        with self.assertRaises(ValueError):
+            filters.compile_filter({"vendor": ["color", "eq", 0]})
+
+    def test_color(self):
+        intent = IntentCheck(
+            groups=[],
+            checks={"0": {"uptime": ["gte", 100]}, "30": {"uptime": ["lt", 100]}},
+            column="uptime",
+            custom=True,
+            descriptions=dict(general=None),
+            name="uptime",
+            status=1,
+            result=dict(count=None),
+            apiEndpoint="/tables/inventory/devices",
+            defaultColor=10,
+            webEndpoint="/inventory/devices",
+            id="1",
+        )
+        match = filters.compile_filter({"uptime": ["color", "eq", 30]}, [intent])
+        self.assertEqual([r["id"] for r in ROWS if match(r)], [4])
+        match = filters.compile_filter({"uptime": ["color", "eq", 10]}, [intent])
+        self.assertEqual([r["id"] for r in ROWS if match(r)], [3])
+
+    def test_sort(self):
+        self.assertEqual([r["id"] for r in filters.sort_rows(ROWS, dict(order="asc", column="uptime"))], [4, 1, 2, 3])
+        self.assertEqual([r["id"] for r in filters.sort_rows(ROWS, dict(order="desc", column="uptime"))], [3, 2, 1, 4])
+        self.assertEqual([r["id"] for r in filters.sort_rows(ROWS, dict(order="asc", column="ip"))], [2, 1, 4, 3])
+        self.assertEqual(filters.sort_rows(ROWS, None), ROWS)
+
+    def test_query_rows(self):
+        result = filters.query_rows(
+            ROWS, columns=["hostname"], filters={"vendor": ["like", "cisco"]}, sort=dict(order="desc", column="id")
+        )
+        self.assertEqual(result, [dict(hostname="access-1"), dict(hostname="Core-1")])
+
+    def test_local_table(self):
+        table = filters.LocalTable(ROWS)
+        self.assertEqual(len(table), 4)
+        self.assertEqual(table.count({"vendor": ["like", "cisco"]}), 2)
+        self.assertEqual(table.all(columns=["id"], filters={"vendor": ["like", "cisco"]}), [dict(id=1), dict(id=3)])
+        self.assertEqual(table._compile.cache_info().hits, 1)
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import unittest
+from time import sleep
+
+import httpx
+
+from ipfabric.governor import AsyncGovernor, Governor, HostLimit
+
+
+class Limits(unittest.TestCase):
+    def test_aimd(self):
+        limit = HostLimit(max_concurrency=8, min_concurrency=2)
+        for _ in range(3):
+            limit.start()
+        limit.finish(100, httpx.Response(429, headers={"Retry-After": "5"}))
+        self.assertEqual((limit.inflight, limit.limit, limit.paused_until), (2, 4, 105))
+        self.assertEqual(limit.wait_time(101), 4)
+        limit.finish(101, None, overloaded=True)
+        limit.finish(101, None, overloaded=True)
+        self.assertEqual(limit.limit, 2)
+        self.assertEqual(limit.wait_time(106), 0)
+        limit.finish(106, httpx.Response(500))
+        self.assertEqual(limit.limit, 2)
+        for _ in range(4):
+            limit.finish(106, httpx.Response(200))
+        self.assertEqual(int(limit.limit), 3)
+        limit.finish(106, httpx.Response(503))
+        self.assertEqual(limit.paused_until, 107)
+
+    def test_concurrency(self):
+        limit = HostLimit(max_concurrency=2)
+        limit.start()
+        self.assertEqual(limit.wait_time(0), 0)
+        limit.start()
+        self.assertIsNone(limit.wait_time(0))
+
+    def test_rate(self):
+        limit = HostLimit(max_concurrency=10, rate=2)
+        now = limit._refilled
+        for _ in range(2):
+            self.assertEqual(limit.wait_time(now), 0)
+            limit.start()
+        self.assertAlmostEqual(limit.wait_time(now), 0.5)
+        self.assertEqual(limit.wait_time(now + 0.5), 0)
+
+
+class Governors(unittest.TestCase):
+    def test_governor(self):
+        governor, running, peak, lock = Governor(3, limits={"b": dict(max_concurrency=1)}), [0], [0], threading.Lock()
+
+        def request():
+            governor.acquire("a")
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            sleep(0.01)
+            with lock:
+                running[0] -= 1
+            governor.release("a", httpx.Response(200))
+
+        threads = [threading.Thread(target=request) for _ in range(12)]
+        [t.start() for t in threads]
+        [t.join() for t in threads]
+        self.assertEqual(peak[0], 3)
+        self.assertEqual(governor.hosts["a"].inflight, 0)
+        self.assertEqual(governor.host("b").max_concurrency, 1)
+
+    def test_async_governor(self):
+        governor, running, peak = AsyncGovernor(2), [0], [0]
+
+        async def request():
+            await governor.acquire("a")
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.01)
+            running[0] -= 1
+            await governor.release("a", httpx.Response(200))
+
+        async def main():
+            await asyncio.gather(*[request() for _ in range(6)])
+
+        asyncio.run(main())
+        asyncio.run(main())
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(governor.hosts["a"].inflight, 0)
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+import unittest
+
+LAZY = ["ipfabric.technology.routing", "ipfabric.settings.vendor_api", "ipfabric.tools", "deepdiff", "dotenv"]
+
+
+def loaded(statement: str) -> list:
+    """Modules of LAZY imported by the statement in a new interpreter"""
+    code = f"import sys; {statement}; print(','.join(m for m in {LAZY} if m in sys.modules))"
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+
+
+class LazyImports(unittest.TestCase):
+    def test_import(self):
+        self.assertEqual(loaded("import ipfabric"), list())
+        self.assertEqual(loaded("from ipfabric.tools import DeviceConfigs"), ["ipfabric.tools"])
+
+    def test_attributes(self):
+        from ipfabric import technology, settings, tools
+
+        self.assertEqual(technology.Routing.__module__, "ipfabric.technology.routing")
+        self.assertEqual(settings.AWS.__module__, "ipfabric.settings.vendor_api_models")
+        self.assertIn("DeviceConfigs", dir(tools))
+        with self.assertRaises(AttributeError):
+            technology.Missing
+
+    def test_models_technology(self):
+        from ipfabric import models, technology
+
+        self.assertIs(models.Interfaces, technology.Interfaces)
+        self.assertIn("Routing", dir(models))
+        self.assertEqual(technology.__all__[0], "Addressing")
+        self.assertEqual(loaded("from ipfabric.models import Routing"), ["ipfabric.technology.routing"])
@@ -0,0 +1,217 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+from ipfabric import IPFClient
+from ipfabric.instrumentation import (
+    CALLER,
+    Instrumentation,
+    LatencyStats,
+    OpenTelemetryExporter,
+    PrometheusExporter,
+    RequestEvent,
+    carry_context,
+    endpoint_name,
+    instrumented,
+    percentile,
+)
+
+
+def event(endpoint="tables/a", latency=0.1, **kwargs):
+    e = RequestEvent("post", endpoint)
+    e.latency, e.status = latency, 200
+    for k, v in kwargs.items():
+        setattr(e, k, v)
+    return e
+
+
+class Caller:
+    @instrumented
+    def outer(self):
+        return self.inner()
+
+    @instrumented
+    def inner(self):
+        return CALLER.get()
+
+    @instrumented
+    def pages(self):
+        yield CALLER.get()
+        yield self.inner()
+
+    @instrumented
+    async def coroutine(self):
+        return self.inner()
+
+    @instrumented
+    async def async_pages(self):
+        yield CALLER.get()
+
+    @instrumented
+    def deferred(self):
+        async def coroutine():
+            return CALLER.get()
+
+        return coroutine()
+
+    @instrumented
+    def deferred_pages(self):
+        async def pages():
+            yield CALLER.get()
+
+        return pages()
+
+
+class Hooks(unittest.TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual([percentile(values, p) for p in (50, 95, 99, 100)], [50, 95, 99, 100])
+        self.assertEqual(percentile([3], 99), 3)
+        self.assertIsNone(percentile([], 50))
+
+    def test_endpoint_name(self):
+        self.assertEqual(
+            endpoint_name("https://demo.ipfabric.io/api/v6.0/tables/inventory/devices"), "tables/inventory/devices"
+        )
+        self.assertEqual(endpoint_name(httpx.URL("/tables/a/")), "tables/a")
+        self.assertEqual(endpoint_name("https://demo.ipfabric.io/api/version"), "api/version")
+
+    def test_latency_stats(self):
+        stats = LatencyStats()
+        for i in range(1, 101):
+            stats(event(latency=i / 100, rows=10, bytes_in=100))
+        stats(event("tables/b", status=500, retries=2))
+        stats(event("tables/b", error=httpx.ReadTimeout("timeout"), latency=None))
+        summary = stats.summary()
+        self.assertEqual(summary["tables/a"]["count"], 100)
+        self.assertEqual(summary["tables/a"]["rows"], 1000)
+        self.assertEqual((summary["tables/a"]["p50"], summary["tables/a"]["p99"]), (0.5, 0.99))
+        self.assertEqual((summary["tables/b"]["errors"], summary["tables/b"]["retries"]), (2, 2))
+        self.assertEqual(LatencyStats(by="caller").summary(), dict())
+        with self.assertRaises(ValueError):
+            LatencyStats(by="status")
+        stats.reset()
+        self.assertEqual(stats.summary(), dict())
+
+    def test_page_scope(self):
+        events = list()
+        instrumentation = Instrumentation([events.append])
+        with instrumentation.page(3) as scope:
+            e = instrumentation.start("POST", "tables/a")
+            instrumentation.finish(e, httpx.Response(200, content=b"{}", request=httpx.Request("POST", "https://a/b")))
+            self.assertEqual(events, list())
+            scope.rows = 10
+        self.assertEqual((e.page, e.rows, e.status, e.bytes_in, e.bytes_out), (3, 10, 200, 2, 0))
+        self.assertEqual(events, [e])
+        self.assertFalse(Instrumentation())
+        with Instrumentation().page(1) as scope:
+            scope.rows = 10
+            self.assertIsNone(scope.rows)
+
+    def test_failing_hook(self):
+        def fail(e):
+            raise ValueError("hook")
+
+        events = list()
+        instrumentation = Instrumentation([fail, events.append])
+        with self.assertLogs("ipfabric", level="WARNING"):
+            instrumentation.finish(instrumentation.start("GET", "users/me"), error=httpx.ConnectError("error"))
+        self.assertIsInstance(events[0].error, httpx.ConnectError)
+
+    def test_caller(self):
+        caller = Caller()
+        self.assertEqual(caller.outer(), "Caller.outer")
+        self.assertEqual(caller.inner(), "Caller.inner")
+        self.assertEqual(list(caller.pages()), ["Caller.pages", "Caller.pages"])
+        self.assertEqual(asyncio.run(caller.coroutine()), "Caller.coroutine")
+
+        async def collect():
+            return [c async for c in caller.async_pages()]
+
+        self.assertEqual(asyncio.run(collect()), ["Caller.async_pages"])
+        self.assertEqual(asyncio.run(caller.deferred()), "Caller.deferred")
+
+        async def collect_deferred():
+            return [c async for c in caller.deferred_pages()]
+
+        self.assertEqual(asyncio.run(collect_deferred()), ["Caller.deferred_pages"])
+        self.assertIsNone(CALLER.get())
+
+    def test_carry_context(self):
+        caller = Caller()
+
+        @instrumented
+        def submit():
+            with ThreadPoolExecutor(2) as executor:
+                return list(executor.map(carry_context(lambda i: caller.inner()), [1, 2]))
+
+        self.assertEqual(submit(), [submit.__qualname__] * 2)
+        self.assertIs(carry_context(submit), submit)
+
+    def test_opentelemetry(self):
+        meter = MagicMock()
+        meter.create_counter.side_effect = lambda *args, **kwargs: MagicMock()
+        exporter = OpenTelemetryExporter(meter)
+        exporter(event(rows=5, bytes_in=10, retries=1, caller="IPFClient.fetch_all"))
+        attributes = dict(endpoint="tables/a", method="POST", status="200", caller="IPFClient.fetch_all")
+        exporter.latency.record.assert_called_with(0.1, attributes)
+        exporter.rows.add.assert_called_with(5, attributes)
+        exporter.bytes.add.assert_called_once_with(10, dict(attributes, direction="in"))
+
+    @unittest.skipUnless(find_spec("prometheus_client"), "prometheus_client is not installed")
+    def test_prometheus(self):
+        import prometheus_client
+
+        registry = prometheus_client.CollectorRegistry()
+        exporter = PrometheusExporter(registry)
+        exporter(event(rows=5))
+        labels = dict(endpoint="tables/a", method="POST", status="200", caller="")
+        self.assertEqual(registry.get_sample_value("ipfabric_rows_total", labels), 5)
+
+    @unittest.skipIf(find_spec("prometheus_client"), "prometheus_client is installed")
+    def test_prometheus_missing(self):
+        with self.assertRaises(ImportError):
+            PrometheusExporter()
+
+
+class ClientInstrumentation(unittest.TestCase):
+    @patch("httpx.Client.__init__", return_value=None)
+    @patch("httpx.Client.headers")
+    @patch("ipfabric.IPFClient.get_user")
+    @patch("ipfabric.IPFClient.check_version")
+    @patch("ipfabric.IPFClient.get_snapshots")
+    @patch("ipfabric.models.Inventory")
+    def setUp(self, inventory, snaps, check_version, get_user, headers, mock_client):
+        mock_client._headers = dict()
+        check_version.return_value = ("v5", "v5.0.1")
+        self.stats, self.events = LatencyStats(), list()
+        self.ipf = IPFClient(
+            base_url="https://demo.ipfabric.io", token="token", instrumentation=[self.stats, self.events.append]
+        )
+        self.ipf.page_size, self.ipf.governor = 2, None
+
+    @patch("ipfabric.api.sleep")
+    @patch("httpx.Client.request")
+    def test_fetch_all(self, request, sleep):
+        rows = [dict(id=i) for i in range(5)]
+
+        def page(method, url, **kwargs):
+            if len(request.call_args_list) == 2:
+                return httpx.Response(503)
+            start, limit = kwargs["json"]["pagination"]["start"], kwargs["json"]["pagination"]["limit"]
+            data = {"data": rows[start : start + limit], "_meta": {"count": len(rows)}}
+            return httpx.Response(200, json=data, request=httpx.Request(method, f"https://demo/{url}"))
+
+        request.side_effect = page
+        self.assertEqual(self.ipf.fetch_all("tables/a", columns=["id"], snapshot=False), rows)
+        self.assertEqual([(e.page, e.rows, e.retries) for e in self.events], [(0, 2, 0), (1, 2, 1), (2, 1, 0)])
+        self.assertTrue(all(e.caller == "IPFClient.fetch_all" and e.bytes_in for e in self.events))
+        self.assertEqual(self.stats.summary()["tables/a"]["rows"], 5)
+        self.events.clear()
+        self.ipf.instrumentation.hooks.clear()
+        self.ipf.fetch_all("tables/a", columns=["id"], snapshot=False)
+        self.assertEqual(self.events, list())
@@ -15,6 +15,12 @@ class Models(unittest.TestCase):
         MockClient.fetch_all.return_value = list()
         self.assertEqual(table.all(), list())
 
+    @patch("ipfabric.IPFClient")
+    def test_table_iter(self, MockClient):
+        table = models.Table(client=MockClient, endpoint="/network/ip")
+        MockClient.iter_all.return_value = iter([dict(a=1)])
+        self.assertEqual(list(table.iter()), [dict(a=1)])
+
     @patch("ipfabric.IPFClient")
     def test_table_fetch(self, MockClient):
         table = models.Table(client=MockClient, endpoint="/network/ip")
@@ -27,6 +33,90 @@ class Models(unittest.TestCase):
         MockClient.get_count.return_value = 1
         self.assertEqual(table.count(), 1)
 
+    def test_table_compare(self):
+        client = MagicMock()
+        client.get_columns.return_value = ["id", "hostname", "ip"]
+        client.fetch_all.side_effect = [
+            [dict(id=1, hostname="a", ip=["1.1.1.1"]), dict(id=2, hostname="b", ip=[])],
+            [dict(id=1, hostname="a", ip=["1.1.1.1"]), dict(id=3, hostname="c", ip=[])],
+        ] * 2
+        table = models.Table(client=client, endpoint="/tables/inventory/devices")
+        for engine in ["tuple", "deephash"]:
+            comp = table.compare("$prev", columns_ignore="id", hash_engine=engine)
+            self.assertEqual([r["hostname"] for r in comp["added"]], ["b"])
+            self.assertEqual([r["hostname"] for r in comp["removed"]], ["c"])
+
+    def test_table_compare_keyed(self):
+        client = MagicMock()
+        client.get_columns.return_value = ["id", "hostname", "sn"]
+        snapshots = {
+            "$prev": [dict(id=1, hostname="a", sn="1"), dict(id=2, hostname="b", sn="2")],
+            None: [dict(id=3, hostname="A", sn="1"), dict(id=4, hostname="c", sn="3")],
+        }
+        client.iter_all.side_effect = lambda *args, **kwargs: iter(snapshots[kwargs["snapshot_id"]])
+        table = models.Table(client=client, endpoint="/tables/inventory/devices")
+        comp = table.compare("$prev", unique_keys="sn", mode="keyed")
+        self.assertEqual([c[1]["snapshot_id"] for c in client.iter_all.call_args_list], [None, "$prev", "$prev"])
+        self.assertEqual(comp["added"], [dict(hostname="c", sn="3")])
+        self.assertEqual(comp["removed"], [dict(hostname="b", sn="2")])
+        self.assertEqual(comp["changed"], [dict(key=dict(sn="1"), changes=dict(hostname=dict(before="a", after="A")))])
+        with self.assertRaises(ValueError):
+            table.compare("$prev", mode="keyed")
+        with self.assertRaises(ValueError):
+            table.compare("$prev", unique_keys="sn", mode="fast")
+        with self.assertRaises(ValueError):
+            table.compare("$prev", unique_keys="sn", mode="keyed", output="pandas")
+
+    def test_table_compare_merge(self):
+        client = MagicMock()
+        client.get_columns.return_value = ["id", "hostname", "sn"]
+        client.iter_all.side_effect = [
+            iter([dict(id=1, hostname="a", sn="1"), dict(id=2, hostname="b", sn="2")]),
+            iter([dict(id=3, hostname="A", sn="1"), dict(id=4, hostname="c", sn="3")]),
+        ]
+        table = models.Table(client=client, endpoint="/tables/inventory/devices")
+        comp = table.compare("$prev", unique_keys="sn", mode="merge")
+        self.assertEqual(client.iter_all.call_args_list[0][1]["sort"], dict(order="asc", column="sn"))
+        self.assertEqual([r["sn"] for r in comp["added"]], ["3"])
+        self.assertEqual([r["sn"] for r in comp["removed"]], ["2"])
+        with self.assertRaises(ValueError):
+            table.compare("$prev", unique_keys="sn", mode="merge", sort=dict(order="asc", column="id"))
+
+    def test_table_compare_merge_fallback(self):
+        client = MagicMock()
+        client.get_columns.return_value = ["id", "hostname"]
+        client.iter_all.side_effect = lambda *args, **kwargs: iter([dict(id=1, hostname="b"), dict(id=2, hostname="A")])
+        table = models.Table(client=client, endpoint="/tables/inventory/devices")
+        comp = table.compare("$prev", unique_keys="hostname", mode="merge")
+        self.assertEqual(comp, dict(added=list(), removed=list(), changed=list()))
+        self.assertEqual(client.iter_all.call_count, 4)
+        self.assertIsNone(client.iter_all.call_args_list[-1][1]["sort"])
+
+    def test_table_history(self):
+        client = MagicMock()
+        client.max_workers = 2
+        client.get_columns.return_value = ["id", "hostname", "sn"]
+        client.loaded_snapshots = {
+            "$last": MagicMock(snapshot_id="s2", start=2),
+            "s2": MagicMock(snapshot_id="s2", start=2),
+            "s1": MagicMock(snapshot_id="s1", start=1),
+        }
+        data = dict(s1=[dict(id=1, hostname="a", sn="1")], s2=[dict(id=2, hostname="b", sn="1")])
+        client.fetch_all.side_effect = lambda *args, **kwargs: data[kwargs["snapshot_id"]]
+        table = models.Table(client=client, endpoint="/tables/inventory/devices")
+        history = table.history(unique_keys="sn")
+        self.assertEqual(client.fetch_all.call_count, 2)
+        self.assertEqual(history["snapshots"], ["s1", "s2"])
+        self.assertEqual(history["diffs"][0]["changed"][0]["changes"], dict(hostname=dict(before="a", after="b")))
+        with self.assertRaises(ValueError):
+            table.history()
+
+    @patch("ipfabric.IPFClient")
+    def test_table_local(self, MockClient):
+        table = models.Table(client=MockClient, endpoint="/network/ip")
+        MockClient.fetch_all.return_value = [dict(a=1), dict(a=2)]
+        self.assertEqual(table.local().all(filters={"a": ["gt", 1]}), [dict(a=2)])
+
     def test_inventory(self):
         i = models.Inventory(client=MagicMock())
         self.assertIsInstance(i.vendors, models.Table)
@@ -38,8 +128,16 @@ class Models(unittest.TestCase):
         self.assertIsInstance(i.interfaces, models.Table)
         self.assertIsInstance(i.models, models.Table)
 
+    def test_all_tables(self):
+        tables = models.Technology(client=MagicMock()).all_tables()
+        self.assertTrue(all(isinstance(t, models.Table) for t in tables))
+        self.assertIn("tables/addressing/mac", [t.endpoint for t in tables])
+        self.assertIn(
+            "/tables/inventory/devices", [t.endpoint for t in models.Inventory(client=MagicMock()).all_tables()]
+        )
+
     @patch("ipfabric.IPFClient")
     def test_compare(self, MockClient):
         c = models.Table(client=MockClient, endpoint="/network/ip")
         MockClient.compare.return_value = dict(added=list(), removed=list())
-        self.assertEqual(c.compare(), dict(added=list(), removed=list()))
\ No newline at end of file
+        self.assertEqual(c.compare(), dict(added=list(), removed=list()))
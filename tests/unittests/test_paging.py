@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import MagicMock
+
+import httpx
+
+from ipfabric.paging import PageSizer, response_size
+
+
+def status_error(status: int) -> httpx.HTTPStatusError:
+    return httpx.HTTPStatusError("error", request=MagicMock(), response=MagicMock(status_code=status))
+
+
+class Paging(unittest.TestCase):
+    def setUp(self):
+        self.sizer = PageSizer(hints={"tables/wide": 300})
+
+    def test_limit(self):
+        self.assertEqual(self.sizer.limit("tables/a", ["a"] * 10), 1000)
+        self.assertEqual(self.sizer.limit("/tables/a/", ["a"] * 3), 1000)
+        self.assertEqual(self.sizer.limit("tables/wide", ["a"]), 300)
+        self.assertEqual(self.sizer.limit("tables/interfaces/transceivers/statistics", ["a"] * 20), 250)
+        self.assertEqual(PageSizer(maximum=500).limit("tables/a", ["a"]), 500)
+
+    def test_record(self):
+        columns = ["a"] * 10
+        self.sizer.record("tables/a", columns, 1000, 1000, 0.5, 1024)
+        self.assertEqual(self.sizer.limit("tables/a", columns), 2000)
+        self.sizer.record("tables/a", columns, 2000, 150, 0.1, 1024)
+        self.assertEqual(self.sizer.limit("tables/a", columns), 2000)
+        self.sizer.record("tables/a", columns, 2000, 2000, 3.0, 1024)
+        self.assertEqual(self.sizer.limit("tables/a", columns), 2000)
+        self.sizer.record("tables/a", columns, 2000, 2000, 6.0, 1024)
+        self.assertEqual(self.sizer.limit("tables/a", columns), 1000)
+        self.sizer.record("tables/a", columns, 1000, 1000, 0.1, 10 * 1024**2)
+        self.assertEqual(self.sizer.limit("tables/a", columns), 500)
+        for _ in range(10):
+            limit = self.sizer.limit("tables/a", columns)
+            self.sizer.record("tables/a", columns, limit, limit, 0.1, 0)
+        self.assertEqual(self.sizer.limit("tables/a", columns), 10000)
+        self.assertEqual(self.sizer.limit("tables/a", ["a"] * 11), 1000)
+
+    def test_failed(self):
+        self.assertTrue(self.sizer.failed("tables/a", None, 1000, status_error(503)))
+        self.assertEqual(self.sizer.limit("tables/a"), 500)
+        self.assertTrue(self.sizer.failed("tables/a", None, 500, httpx.ReadTimeout("timeout")))
+        self.assertEqual(self.sizer.limit("tables/a"), 250)
+        self.assertFalse(self.sizer.failed("tables/a", None, 250, status_error(422)))
+        self.assertFalse(self.sizer.failed("tables/a", None, 100, status_error(500)))
+        self.assertEqual(self.sizer.limit("tables/a"), 250)
+        for _ in range(3):
+            self.sizer.record("tables/a", None, self.sizer.limit("tables/a"), self.sizer.limit("tables/a"), 0.1, 0)
+        self.assertEqual(self.sizer.limit("tables/a"), 250)
+
+    def test_capped(self):
+        self.sizer.capped("tables/a", ["a"], 500)
+        self.assertEqual(self.sizer.limit("tables/a", ["a"]), 500)
+        self.sizer.record("tables/a", ["a"], 500, 500, 0.1, 0)
+        self.assertEqual(self.sizer.limit("tables/a", ["a"]), 500)
+        self.sizer.capped("tables/a", ["a"], 10)
+        self.assertEqual(self.sizer.limit("tables/a", ["a"]), 100)
+
+    def test_response_size(self):
+        self.assertEqual(response_size(httpx.Response(200, content=b"1234")), 4)
+        self.assertEqual(response_size(MagicMock()), 0)
@@ -0,0 +1,91 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from uuid import uuid4
+
+import httpx
+
+from ipfabric.retry import Checkpoints, PagerCheckpoint, RetryPolicy, checkpoint_key, get_retry_policy
+
+
+class Retry(unittest.TestCase):
+    def test_idempotent(self):
+        self.assertTrue(RetryPolicy.idempotent("get", "snapshots"))
+        self.assertTrue(RetryPolicy.idempotent("POST", "tables/inventory/devices"))
+        self.assertTrue(RetryPolicy.idempotent("POST", httpx.URL("https://ipf/api/v6.0/tables/inventory/devices")))
+        self.assertFalse(RetryPolicy.idempotent("POST", "snapshots/load"))
+        self.assertFalse(RetryPolicy.idempotent("DELETE", "tables/users"))
+
+    def test_retry(self):
+        policy = RetryPolicy(retries=2)
+        self.assertTrue(policy.retry_response(1, httpx.Response(503)))
+        self.assertFalse(policy.retry_response(2, httpx.Response(503)))
+        self.assertFalse(policy.retry_response(0, httpx.Response(500)))
+        self.assertTrue(policy.retry_error(0, httpx.ReadTimeout("timeout")))
+        self.assertTrue(policy.retry_error(0, httpx.ConnectError("reset")))
+        self.assertFalse(policy.retry_error(0, ValueError()))
+
+    def test_delay(self):
+        policy = RetryPolicy(backoff=1, max_backoff=5)
+        for attempt in range(5):
+            self.assertTrue(0 <= policy.delay(attempt) <= min(5, 2**attempt))
+        self.assertEqual(RetryPolicy(backoff=1, max_backoff=5, jitter=False).delay(2), 4)
+        self.assertEqual(RetryPolicy(backoff=1, max_backoff=5, jitter=False).delay(3), 5)
+        self.assertEqual(policy.delay(0, httpx.Response(429, headers={"Retry-After": "3"})), 3)
+        self.assertEqual(policy.delay(0, httpx.Response(429, headers={"Retry-After": "60"})), 5)
+        with patch("random.uniform", return_value=0.25):
+            self.assertEqual(policy.delay(0, httpx.Response(503, headers={"Retry-After": "Wed, 21 Oct"})), 0.25)
+
+    def test_get_retry_policy(self):
+        self.assertIsNone(get_retry_policy(0))
+        self.assertEqual(get_retry_policy(5).retries, 5)
+        policy = RetryPolicy()
+        self.assertIs(get_retry_policy(policy), policy)
+
+    def test_checkpoints(self):
+        checkpoints, snapshot = Checkpoints(), "a3b8e3b5-3a34-4d4e-8d0e-b7a7a6b4bd3a"
+        payload = dict(columns=["id"], snapshot=snapshot)
+        key = checkpoint_key("/tables/a", dict(payload, pagination=dict(start=1000)), 0)
+        self.assertEqual(key, checkpoint_key("tables/a", payload, 0))
+        checkpoints.save(key, payload, PagerCheckpoint(2, [1, 2]), ValueError())
+        checkpoints.save(checkpoint_key("tables/b", payload, 0), payload, PagerCheckpoint(1, [1]), ValueError())
+        self.assertEqual(checkpoints.pop(key, 0, resume=True).data, [1, 2])
+        self.assertEqual(checkpoints.pop(key, 0, resume=True).start, 0)
+        checkpoints.save(key, payload, PagerCheckpoint(2, [1, 2]), ValueError())
+        self.assertEqual(checkpoints.pop(key, 0).data, [])
+        self.assertEqual(len(checkpoints), 1)
+        checkpoints.save(key, payload, PagerCheckpoint(2, [1, 2]), ValueError())
+        checkpoints.clear("tables/a")
+        self.assertEqual(len(checkpoints), 1)
+        checkpoints.clear()
+        self.assertEqual(len(checkpoints), 0)
+
+    def test_checkpoints_threads(self):
+        checkpoints, payload = Checkpoints(max_checkpoints=4, ttl=0), dict(snapshot=str(uuid4()))
+
+        def use(i):
+            for j in range(200):
+                checkpoints.save(f"{i}-{j}", payload, PagerCheckpoint(1, [j]), ValueError())
+                checkpoints.pop(f"{i}-{j - 1}", 0, resume=True)
+            return checkpoints.rows
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            self.assertEqual(len(list(executor.map(use, range(8)))), 8)
+        self.assertLessEqual(len(checkpoints), 4)
+
+    def test_checkpoints_limits(self):
+        checkpoints, payload = Checkpoints(max_checkpoints=2, max_rows=5, ttl=60), dict(snapshot=str(uuid4()))
+        for snapshot in ["$last", None]:
+            checkpoints.save("unpinned", dict(snapshot=snapshot), PagerCheckpoint(1, [1]), ValueError())
+        checkpoints.save("large", payload, PagerCheckpoint(6, list(range(6))), ValueError())
+        self.assertEqual(len(checkpoints), 0)
+        for key in ["a", "b", "c"]:
+            checkpoints.save(key, payload, PagerCheckpoint(2, [1, 2]), ValueError())
+        self.assertEqual((len(checkpoints), checkpoints.rows), (2, 4))
+        self.assertEqual(checkpoints.pop("a", 0, resume=True).data, [])
+        checkpoints.save("d", payload, PagerCheckpoint(3, [1, 2, 3]), ValueError())
+        self.assertEqual((len(checkpoints), checkpoints.rows), (2, 5))
+        self.assertEqual(checkpoints.pop("b", 0, resume=True).data, [])
+        with patch("ipfabric.retry.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertEqual(checkpoints.pop("d", 0, resume=True).data, [])
@@ -79,3 +79,4 @@ class Discovery(unittest.TestCase):
         self.dh.ipf.fetch_all.return_value = self.example
         history = self.dh.delete_history_prior_to_ts('2022-09-30')
         self.assertEqual(history, self.example)
+        self.dh.ipf.invalidate_result_cache.assert_called_once_with('tables/inventory/discovery-history')
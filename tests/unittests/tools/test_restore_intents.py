@@ -0,0 +1,46 @@
+import tempfile
+import unittest
+from collections import OrderedDict
+from unittest.mock import MagicMock, patch
+
+from ipfabric.tools import restore_intents
+
+
+class Defaults(unittest.TestCase):
+    def setUp(self) -> None:
+        restore_intents.load_defaults.cache_clear()
+
+    def test_lazy(self):
+        self.assertIn("v6.0", restore_intents.DEFAULT_SETUP)
+        self.assertEqual(list(restore_intents.DEFAULT_SETUP), ["v4.4", "v5.0", "v6.0"])
+        self.assertEqual(restore_intents.load_defaults.cache_info().currsize, 0)
+        defaults = restore_intents.DEFAULT_SETUP["v6.0"]
+        self.assertIs(restore_intents.DEFAULT_SETUP["v6.0"], defaults)
+        self.assertEqual(restore_intents.load_defaults.cache_info().currsize, 1)
+        self.assertIsInstance(defaults["dashboard"], OrderedDict)
+        with self.assertRaises(KeyError):
+            restore_intents.DEFAULT_SETUP["v3.8"]
+
+    def test_compact(self):
+        defaults = restore_intents.load_defaults("v5.0")
+        with tempfile.TemporaryDirectory() as tmp:
+            compact = restore_intents.compile_defaults("v5.0", tmp).read_bytes()
+        restore_intents.load_defaults.cache_clear()
+        with patch("importlib.resources.is_resource", return_value=True), patch(
+            "importlib.resources.read_binary", return_value=compact
+        ):
+            self.assertEqual(restore_intents.load_defaults("v5.0"), defaults)
+        self.assertIsInstance(restore_intents.load_defaults("v5.0")["dashboard"], OrderedDict)
+
+    @patch("builtins.input", return_value="y")
+    @patch("ipfabric.tools.restore_intents.RestoreIntents._save_to_file")
+    def test_restore_default(self, save, user_input):
+        ipf = MagicMock()
+        ipf.get().json.return_value = list()
+        ipf.get().text = "{}"
+        ipf.post().json.return_value = {"id": "new"}
+        defaults = restore_intents.DEFAULT_SETUP["v6.0"]
+        intent = dict(defaults["intents"][0])
+        restore_intents.RestoreIntents(ipf).restore_default("v6.0")
+        self.assertEqual(defaults["intents"][0], intent)
+        self.assertEqual(ipf.post.call_args_list[1][1]["json"]["groups"], list())